@@ -0,0 +1,17 @@
+"""
+Python client for the Aesthetic Lens scoring API.
+
+This package provides synchronous and asyncio clients with connection
+pooling, client-side batching and retries for overloaded servers.
+
+Example:
+    from aesthetic_lens_client import AestheticLensClient
+
+    with AestheticLensClient("http://localhost:5000") as client:
+        results = client.score_many(["a.jpg", "b.jpg"])
+"""
+
+from aesthetic_lens_client.client import AestheticLensClient, ScoringError
+from aesthetic_lens_client.async_client import AsyncAestheticLensClient
+
+__all__ = ["AestheticLensClient", "AsyncAestheticLensClient", "ScoringError"]
@@ -0,0 +1,105 @@
+"""
+Asyncio client for the Aesthetic Lens scoring API.
+
+This module wraps the synchronous client so asyncio services can score
+images without blocking the event loop. Requests run on a small thread pool
+that shares the client's pooled keep-alive session, and batches are sent
+concurrently.
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from aesthetic_lens_client.client import AestheticLensClient, _chunks
+
+
+class AsyncAestheticLensClient:
+    """
+    Asyncio interface to the Aesthetic Lens scoring API.
+
+    Accepts the same arguments as AestheticLensClient. At most
+    `pool_maxsize` requests are in flight at once.
+    """
+
+    def __init__(self, base_url, pool_maxsize=10, **kwargs):
+        """
+        Initialize the client.
+
+        Args:
+            base_url (str): Server URL, e.g. "http://localhost:5000"
+            pool_maxsize (int): Maximum concurrent requests and pooled connections
+            **kwargs: Other AestheticLensClient arguments
+        """
+        self.client = AestheticLensClient(base_url, pool_maxsize=pool_maxsize, **kwargs)
+        self.executor = ThreadPoolExecutor(max_workers=pool_maxsize, thread_name_prefix="aesthetic-lens")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """
+        Close the pooled connections and stop the worker threads.
+        """
+        self.executor.shutdown(wait=True)
+        self.client.close()
+
+    async def score(self, image):
+        """
+        Score a single image with /api/score.
+
+        Args:
+            image: Path to an image file, or a (filename, bytes) tuple
+
+        Returns:
+            dict: Response with "filename", "score" and "feedback"
+        """
+        return await self._run(self.client.score, image)
+
+    async def score_many(self, images):
+        """
+        Score many images, sending /api/score/batch requests concurrently.
+
+        Args:
+            images (iterable): Paths to image files or (filename, bytes) tuples
+
+        Returns:
+            list: One result dict per image, in input order
+        """
+        batches = _chunks(list(images), self.client.batch_size)
+        batch_results = await asyncio.gather(
+            *(self._run(self.client.score_batch, batch) for batch in batches)
+        )
+        return [result for results in batch_results for result in results]
+
+    async def score_frames(self, frames):
+        """
+        Score pre-resized uint8 frames with /api/score/raw.
+
+        Args:
+            frames (numpy.ndarray): uint8 array of shape (n, 224, 224, 3)
+
+        Returns:
+            list: One result dict per frame with "score" and "feedback"
+        """
+        return await self._run(self.client.score_frames, frames)
+
+    async def _run(self, func, *args):
+        """
+        Run a blocking client call on the worker pool.
+
+        Args:
+            func (callable): Client method to call
+            *args: Arguments for the method
+
+        Returns:
+            The method's return value
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
@@ -0,0 +1,251 @@
+"""
+Synchronous client for the Aesthetic Lens scoring API.
+
+This module provides a client that keeps a pooled keep-alive HTTP session,
+groups images into batch requests, and retries overloaded or unavailable
+responses with exponential backoff.
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import os
+import time
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Responses that mean "try again later" rather than "this request is wrong"
+RETRY_STATUSES = (429, 503)
+
+
+class ScoringError(Exception):
+    """
+    Raised when the scoring API returns an error response.
+
+    Attributes:
+        status_code (int): HTTP status code of the response
+    """
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class AestheticLensClient:
+    """
+    Client for the Aesthetic Lens scoring API.
+
+    A single client should be shared by a service: its session keeps
+    connections to the server alive between calls.
+    """
+
+    def __init__(self, base_url, batch_size=16, pool_maxsize=10, max_retries=5,
+                 backoff_factor=0.25, max_backoff=30.0, timeout=30, session=None):
+        """
+        Initialize the client.
+
+        Args:
+            base_url (str): Server URL, e.g. "http://localhost:5000"
+            batch_size (int): Maximum images per /api/score/batch request
+            pool_maxsize (int): Maximum pooled connections to the server
+            max_retries (int): Retries for 429/503 responses and connection errors
+            backoff_factor (float): Base delay in seconds; doubles on each retry
+            max_backoff (float): Longest delay in seconds between retries, also
+                for a longer Retry-After from the server
+            timeout (float): Per-request timeout in seconds
+            session (requests.Session): Session to use instead of a new pooled one
+        """
+        self.base_url = base_url.rstrip("/")
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Close the pooled connections.
+        """
+        self.session.close()
+
+    def score(self, image):
+        """
+        Score a single image with /api/score.
+
+        Args:
+            image: Path to an image file, or a (filename, bytes) tuple
+
+        Returns:
+            dict: Response with "filename", "score" and "feedback"
+
+        Raises:
+            ScoringError: If the server returns an error
+        """
+        filename, content = _read_image(image)
+        return self._post("/api/score", files={"file": (filename, content)})
+
+    def score_many(self, images):
+        """
+        Score many images, grouping them into /api/score/batch requests.
+
+        Args:
+            images (iterable): Paths to image files or (filename, bytes) tuples
+
+        Returns:
+            list: One result dict per image, in input order. Images the server
+                could not read have an "error" key instead of a "score".
+
+        Raises:
+            ScoringError: If a batch request fails as a whole
+        """
+        results = []
+        for batch in _chunks(list(images), self.batch_size):
+            results.extend(self.score_batch(batch))
+        return results
+
+    def score_batch(self, images):
+        """
+        Score up to `batch_size` images in a single /api/score/batch request.
+
+        Args:
+            images (list): Paths to image files or (filename, bytes) tuples
+
+        Returns:
+            list: One result dict per image, in input order
+
+        Raises:
+            ScoringError: If the request fails
+        """
+        files = [("files", _read_image(image)) for image in images]
+        return self._post("/api/score/batch", files=files)["results"]
+
+    def score_frames(self, frames):
+        """
+        Score pre-resized uint8 frames with /api/score/raw.
+
+        Args:
+            frames (numpy.ndarray): uint8 array of shape (n, 224, 224, 3)
+
+        Returns:
+            list: One result dict per frame with "score" and "feedback"
+
+        Raises:
+            ScoringError: If the request fails
+        """
+        # Imported lazily: only raw-frame callers need numpy
+        from aesthetic_lens_client.frames import encode_raw_frames
+
+        return self._post(
+            "/api/score/raw",
+            data=encode_raw_frames(frames),
+            headers={"Content-Type": "application/octet-stream"}
+        )["results"]
+
+    def _post(self, path, **kwargs):
+        """
+        POST to the API, retrying 429/503 responses and connection errors.
+
+        Args:
+            path (str): API path
+            **kwargs: Arguments passed to requests.Session.post
+
+        Returns:
+            dict: Decoded JSON response
+
+        Raises:
+            ScoringError: If the request fails after all retries
+        """
+        url = self.base_url + path
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(url, timeout=self.timeout, **kwargs)
+            except requests.ConnectionError as e:
+                if attempt == self.max_retries:
+                    raise ScoringError(f"Connection failed: {str(e)}")
+                time.sleep(self._backoff(attempt))
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                delay = self._backoff(attempt, response.headers.get("Retry-After"))
+                logger.debug(f"{path} returned {response.status_code}; retrying in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+
+            break
+
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = {}
+
+        if response.status_code != 200:
+            message = payload.get("error", f"HTTP {response.status_code}")
+            raise ScoringError(message, status_code=response.status_code)
+
+        return payload
+
+    def _backoff(self, attempt, retry_after=None):
+        """
+        Compute the delay before the next retry.
+
+        Args:
+            attempt (int): Zero-based attempt number
+            retry_after (str): Value of the Retry-After header, if any
+
+        Returns:
+            float: Delay in seconds, at most `max_backoff`
+        """
+        if retry_after:
+            try:
+                return min(max(float(retry_after), 0.0), self.max_backoff)
+            except ValueError:
+                pass
+        return min(self.backoff_factor * (2 ** attempt), self.max_backoff)
+
+
+def _read_image(image):
+    """
+    Normalize an image argument to a (filename, bytes) tuple.
+
+    Args:
+        image: Path to an image file, or a (filename, bytes) tuple
+
+    Returns:
+        tuple: (filename, bytes)
+    """
+    if isinstance(image, tuple):
+        return image
+    with open(image, "rb") as f:
+        return os.path.basename(image), f.read()
+
+
+def _chunks(items, size):
+    """
+    Split a list into consecutive chunks of at most `size` items.
+
+    Args:
+        items (list): Items to split
+        size (int): Maximum chunk size
+
+    Returns:
+        list: List of chunks
+    """
+    return [items[i:i + size] for i in range(0, len(items), size)]
@@ -0,0 +1,47 @@
+"""
+Raw frame payloads for the /api/score/raw endpoint.
+
+This module packs pre-resized uint8 frames into the binary format the
+server decodes without copying: a 16-byte little-endian header (magic
+"ALRW", version, channels, height, width, reserved, frame count) followed by
+the frames as uint8 pixels in (n, height, width, channels) order. It only
+needs numpy, so clients do not depend on the server's model package.
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import struct
+
+import numpy as np
+
+# magic, version, channels, height, width, reserved, frame count
+RAW_FRAME_MAGIC = b"ALRW"
+RAW_FRAME_VERSION = 1
+RAW_FRAME_HEADER = struct.Struct("<4sBBHHHI")
+
+
+def encode_raw_frames(frames):
+    """
+    Encode uint8 frames into the raw payload accepted by /api/score/raw.
+
+    Args:
+        frames (numpy.ndarray): uint8 array of shape (n, height, width, channels)
+            or a single frame of shape (height, width, channels)
+
+    Returns:
+        bytes: Header followed by the frame bytes in C order
+
+    Raises:
+        ValueError: If the frames are not a uint8 array of the right rank
+    """
+    frames = np.asarray(frames)
+    if frames.ndim == 3:
+        frames = frames[np.newaxis]
+    if frames.ndim != 4 or frames.dtype != np.uint8:
+        raise ValueError(f"Expected uint8 frames of rank 4, got {frames.dtype} with shape {frames.shape}")
+
+    count, height, width, channels = frames.shape
+    header = RAW_FRAME_HEADER.pack(RAW_FRAME_MAGIC, RAW_FRAME_VERSION, channels, height, width, 0, count)
+    return header + np.ascontiguousarray(frames).tobytes()
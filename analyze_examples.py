@@ -10,20 +10,95 @@ https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scori
 """
 
 import os
-import json
+import queue
 import shutil
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
-from PIL import Image, ImageTk
-import datetime
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PIL import ImageTk
 import sys
 import numpy as np
 
 # Import the scoring model and utilities from the main application
 sys.path.append('.')
+from config import EXAMPLES_DIR
+from examples_catalog import open_catalog
+from duplicates import DuplicateIndex
+from previews import load_preview
 from model.nima_model import NimaModel
 from model.utils import preprocess_image
 
+# Images loaded and scored ahead of the one being reviewed
+PREFETCH_DEPTH = 3
+
+# Images scored per model call by "Save All Remaining"
+SAVE_ALL_BATCH_SIZE = 8
+
+# Milliseconds between checks for results from the background worker
+POLL_INTERVAL_MS = 30
+
+
+class ImagePrefetcher:
+    """
+    Loads, resizes and scores images on a background thread.
+    
+    One worker thread runs all model calls, so they never overlap. Results
+    are kept for the images around the current one; `notify` is called from
+    the worker thread with the filename whenever one is ready.
+    """
+    
+    def __init__(self, model, directory, notify, display_size=(800, 400), depth=PREFETCH_DEPTH):
+        self.model = model
+        self.directory = directory
+        self.notify = notify
+        self.display_size = display_size
+        self.depth = depth
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analyzer")
+        self._futures = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def prefetch(self, filenames):
+        """Queue the current image and the next ones, dropping results no longer needed."""
+        wanted = filenames[:self.depth + 1]
+        with self._lock:
+            for filename in list(self._futures):
+                if filename not in wanted:
+                    self._futures.pop(filename).cancel()
+            for filename in wanted:
+                if filename not in self._futures:
+                    future = self.executor.submit(self._load, filename)
+                    future.add_done_callback(lambda f, name=filename: f.cancelled() or self.notify(name))
+                    self._futures[filename] = future
+    
+    def get(self, filename):
+        """Get the result for an image if it is ready, else None."""
+        with self._lock:
+            future = self._futures.get(filename)
+        if future is None or not future.done() or future.cancelled():
+            return None
+        return future.result()
+    
+    def shutdown(self):
+        """Stop the worker, abandoning queued images."""
+        with self._lock:
+            for future in self._futures.values():
+                future.cancel()
+        self.executor.shutdown(wait=False)
+    
+    def _load(self, filename):
+        """Load a display-sized copy of an image and score it. Runs on the worker."""
+        file_path = os.path.join(self.directory, filename)
+        result = {"image": None, "score": None, "error": None}
+        try:
+            result["image"] = load_preview(file_path, self.display_size)
+            result["score"] = self.model.predict(preprocess_image(file_path))
+        except Exception as e:
+            result["error"] = str(e)
+        return result
+
+
 class ExampleAnalyzerApp:
     def __init__(self, root):
         self.root = root
@@ -31,8 +106,7 @@ class ExampleAnalyzerApp:
         self.root.geometry("900x700")
         
         # Set up paths
-        self.examples_dir = os.path.join("static", "images", "examples")
-        self.metadata_file = os.path.join(self.examples_dir, "examples_metadata.json")
+        self.examples_dir = EXAMPLES_DIR
         
         # Load the NIMA model
         self.status_var = tk.StringVar(value="Loading NIMA model...")
@@ -48,14 +122,9 @@ class ExampleAnalyzerApp:
             self.root.quit()
             return
         
-        # Load existing metadata if available
-        self.metadata = {}
-        if os.path.exists(self.metadata_file):
-            try:
-                with open(self.metadata_file, "r") as f:
-                    self.metadata = json.load(f)
-            except json.JSONDecodeError:
-                self.metadata = {}
+        # Open the examples catalog
+        self.catalog = open_catalog()
+        self.duplicates = DuplicateIndex(self.catalog, self.examples_dir)
         
         # Get list of image files
         self.image_files = self.get_image_files()
@@ -64,6 +133,18 @@ class ExampleAnalyzerApp:
         # Set up the UI
         self.setup_ui()
         
+        # Load and score images in the background; the worker hands results
+        # to the Tk thread through this queue
+        self.events = queue.Queue()
+        self.prefetcher = ImagePrefetcher(
+            self.model, self.examples_dir,
+            notify=lambda filename: self.events.put(lambda: self.on_image_ready(filename))
+        )
+        self.score = None
+        self.displayed = None
+        self.saving_all = False
+        self.root.after(POLL_INTERVAL_MS, self.process_events)
+        
         # Load the first image if available
         if self.image_files:
             self.load_current_image()
@@ -149,10 +230,24 @@ class ExampleAnalyzerApp:
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(fill=tk.X, pady=10)
         
-        ttk.Button(button_frame, text="Previous", command=self.previous_image).grid(row=0, column=0, padx=5)
-        ttk.Button(button_frame, text="Next", command=self.next_image).grid(row=0, column=1, padx=5)
-        ttk.Button(button_frame, text="Save and Next", command=self.save_and_next).grid(row=0, column=2, padx=5)
-        ttk.Button(button_frame, text="Save All Remaining", command=self.save_all_remaining).grid(row=0, column=3, padx=5)
+        self.buttons = [
+            ttk.Button(button_frame, text="Previous", command=self.previous_image),
+            ttk.Button(button_frame, text="Next", command=self.next_image),
+            ttk.Button(button_frame, text="Save and Next", command=self.save_and_next),
+            ttk.Button(button_frame, text="Save All Remaining", command=self.save_all_remaining),
+        ]
+        for column, button in enumerate(self.buttons):
+            button.grid(row=0, column=column, padx=5)
+    
+    def process_events(self):
+        """Run callbacks queued by background threads on the Tk thread."""
+        while True:
+            try:
+                callback = self.events.get_nowait()
+            except queue.Empty:
+                break
+            callback()
+        self.root.after(POLL_INTERVAL_MS, self.process_events)
     
     def update_override_score_label(self, *args):
         """Update the override score label when the slider changes."""
@@ -181,7 +276,7 @@ class ExampleAnalyzerApp:
         self.category_label.config(text=self.category.capitalize())
     
     def load_current_image(self):
-        """Load and display the current image."""
+        """Show the current image, using its prefetched result if it is ready."""
         if not self.image_files:
             return
         
@@ -191,56 +286,51 @@ class ExampleAnalyzerApp:
             self.current_index = len(self.image_files) - 1
         
         filename = self.image_files[self.current_index]
-        file_path = os.path.join(self.examples_dir, filename)
         
         # Update file info
         self.file_label.config(text=filename)
-        
-        # Load and resize image
-        try:
-            img = Image.open(file_path)
-            
-            # Calculate new dimensions to fit in the window
-            max_width = 800
-            max_height = 400
-            img_width, img_height = img.size
-            
-            # Calculate scaling factor
-            scale = min(max_width / img_width, max_height / img_height)
-            new_width = int(img_width * scale)
-            new_height = int(img_height * scale)
-            
-            # Resize image
-            img_resized = img.resize((new_width, new_height), Image.LANCZOS)
-            
-            # Convert to PhotoImage and display
-            photo = ImageTk.PhotoImage(img_resized)
-            self.image_label.config(image=photo)
-            self.image_label.image = photo  # Keep a reference
-            
-            # Analyze the image
+        self.displayed = None
+        self.score = None
+        self.score_label.config(text="...")
+        self.category_label.config(text="")
+        
+        # Queue this image and the next few; results arrive via on_image_ready
+        self.prefetcher.prefetch(self.image_files[self.current_index:])
+        if self.prefetcher.get(filename) is not None:
+            self.on_image_ready(filename)
+        else:
             self.status_var.set(f"Analyzing image {self.current_index + 1} of {len(self.image_files)}: {filename}")
-            self.root.update()
-            
-            # Use the NIMA model to get the score
-            try:
-                # Preprocess the image for the model
-                preprocessed_image = preprocess_image(file_path)
-                
-                # Get the predicted score
-                self.score = self.model.predict(preprocessed_image)
-                self.update_score_display()
-                
-                # Update status
-                self.status_var.set(f"Viewing image {self.current_index + 1} of {len(self.image_files)}: {filename} (Score: {self.score:.1f})")
-            except Exception as e:
-                self.status_var.set(f"Error analyzing image: {str(e)}")
-                messagebox.showerror("Analysis Error", f"Failed to analyze image: {str(e)}")
-                self.score = 5.0  # Default score
-                self.update_score_display()
-            
-        except Exception as e:
-            self.status_var.set(f"Error loading image: {str(e)}")
+    
+    def on_image_ready(self, filename):
+        """Display an image and its score once the background worker has them."""
+        if self.saving_all or not self.image_files or self.image_files[self.current_index] != filename:
+            return
+        result = self.prefetcher.get(filename)
+        if result is None or self.displayed == filename:
+            return
+        self.displayed = filename
+        
+        if result["image"] is None:
+            self.status_var.set(f"Error loading image: {result['error']}")
+            return
+        
+        # Convert to PhotoImage and display
+        photo = ImageTk.PhotoImage(result["image"])
+        self.image_label.config(image=photo)
+        self.image_label.image = photo  # Keep a reference
+        
+        if result["error"] is not None:
+            self.status_var.set(f"Error analyzing image: {result['error']}")
+            messagebox.showerror("Analysis Error", f"Failed to analyze image: {result['error']}")
+            score = 5.0  # Default score
+        else:
+            score = result["score"]
+            self.status_var.set(f"Viewing image {self.current_index + 1} of {len(self.image_files)}: {filename} (Score: {score:.1f})")
+        
+        # A manual override applied while the image was being scored wins
+        if self.score is None:
+            self.score = score
+            self.update_score_display()
     
     def previous_image(self):
         """Go to the previous image."""
@@ -267,6 +357,9 @@ class ExampleAnalyzerApp:
         """Save metadata for the current image and rename it."""
         if not self.image_files:
             return False
+        if self.score is None:
+            messagebox.showinfo("Please Wait", "The image is still being analyzed.")
+            return False
         
         try:
             # Get form data
@@ -278,30 +371,22 @@ class ExampleAnalyzerApp:
             old_filename = self.image_files[self.current_index]
             old_path = os.path.join(self.examples_dir, old_filename)
             
-            # Count existing examples in this category
-            existing_files = [f for f in os.listdir(self.examples_dir) 
-                             if f.startswith(f"{category}_score_") and f.endswith((".jpg", ".jpeg", ".png"))]
-            next_number = len(existing_files) + 1
+            # Refuse near-duplicates of existing examples
+            phash, matches = self.duplicates.check(old_path)
+            if matches:
+                messagebox.showwarning("Duplicate", f"{old_filename} is a near-duplicate of {matches[0][1]}.")
+                return False
             
-            # Create new filename
+            # Reserve a new filename in this category
             file_ext = os.path.splitext(old_filename)[1].lower()
-            new_filename = f"{category}_score_{next_number}{file_ext}"
+            new_filename = self.catalog.allocate_filename(category, file_ext, self.examples_dir)
             new_path = os.path.join(self.examples_dir, new_filename)
             
             # Rename the file
             shutil.copy2(old_path, new_path)
             
             # Add metadata
-            self.metadata[new_filename] = {
-                "score": self.score,
-                "contributor": contributor,
-                "description": description,
-                "date_added": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            
-            # Save metadata
-            with open(self.metadata_file, "w") as f:
-                json.dump(self.metadata, f, indent=4)
+            self.catalog.add(new_filename, category, self.score, contributor, description, phash=phash)
             
             # Update status
             self.status_var.set(f"Saved {old_filename} as {new_filename}")
@@ -334,71 +419,91 @@ class ExampleAnalyzerApp:
                 self.root.quit()
     
     def save_all_remaining(self):
-        """Save all remaining images with current settings."""
-        if not self.image_files:
+        """Save all remaining images with current settings in the background."""
+        if not self.image_files or self.saving_all:
             return
         
         # Get form data for all remaining images
         description = self.description_text.get("1.0", tk.END).strip()
         contributor = self.contributor_var.get()
+        remaining = self.image_files[self.current_index:]
+        
+        # Keep the window responsive but stop further edits while saving
+        self.saving_all = True
+        for button in self.buttons:
+            button.state(["disabled"])
+        self.prefetcher.prefetch([])
+        self.prefetcher.executor.submit(self.save_all_worker, remaining, description, contributor)
+    
+    def save_all_worker(self, remaining, description, contributor):
+        """Score and save images in batches. Runs on the prefetcher's worker thread."""
+        processed, errors = [], []
+        
+        def report(text):
+            self.events.put(lambda: self.status_var.set(text))
         
-        # Process each remaining image
-        processed = 0
-        while self.current_index < len(self.image_files):
-            # Analyze the current image
-            filename = self.image_files[self.current_index]
-            file_path = os.path.join(self.examples_dir, filename)
+        for start in range(0, len(remaining), SAVE_ALL_BATCH_SIZE):
+            batch, images, hashes = [], [], []
+            for filename in remaining[start:start + SAVE_ALL_BATCH_SIZE]:
+                file_path = os.path.join(self.examples_dir, filename)
+                try:
+                    # Skip near-duplicates of existing examples before scoring them
+                    phash, matches = self.duplicates.check(file_path)
+                    if matches:
+                        print(f"Skipping {filename}: near-duplicate of {matches[0][1]}")
+                        continue
+                    images.append(preprocess_image(file_path))
+                    batch.append(filename)
+                    hashes.append(phash)
+                except Exception as e:
+                    errors.append(f"{filename}: {str(e)}")
+            
+            if not batch:
+                continue
+            report(f"Analyzing images {start + 1}-{start + len(batch)} of {len(remaining)}...")
             
             try:
-                # Update status
-                self.status_var.set(f"Analyzing image {processed+1} of {len(self.image_files)}: {filename}")
-                self.root.update()
-                
-                # Use the NIMA model to get the score
-                preprocessed_image = preprocess_image(file_path)
-                score = self.model.predict(preprocessed_image)
-                category = self.get_category_from_score(score)
-                
-                # Count existing examples in this category
-                existing_files = [f for f in os.listdir(self.examples_dir) 
-                                 if f.startswith(f"{category}_score_") and f.endswith((".jpg", ".jpeg", ".png"))]
-                next_number = len(existing_files) + 1
-                
-                # Create new filename
-                file_ext = os.path.splitext(filename)[1].lower()
-                new_filename = f"{category}_score_{next_number}{file_ext}"
-                new_path = os.path.join(self.examples_dir, new_filename)
-                
-                # Rename the file
-                shutil.copy2(file_path, new_path)
-                
-                # Add metadata
-                self.metadata[new_filename] = {
-                    "score": score,
-                    "contributor": contributor,
-                    "description": description,
-                    "date_added": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                }
-                
-                # Delete the original file
+                # Use the NIMA model to score the whole batch in one call
+                scores = self.model.predict_batch(np.stack(images))
+            except Exception as e:
+                errors.extend(f"{filename}: {str(e)}" for filename in batch)
+                continue
+            
+            for filename, score, phash in zip(batch, scores, hashes):
+                file_path = os.path.join(self.examples_dir, filename)
                 try:
-                    os.remove(file_path)
+                    category = self.get_category_from_score(score)
+                    
+                    # Reserve a new filename in this category
+                    file_ext = os.path.splitext(filename)[1].lower()
+                    new_filename = self.catalog.allocate_filename(category, file_ext, self.examples_dir)
+                    new_path = os.path.join(self.examples_dir, new_filename)
+                    
+                    # Rename the file
+                    shutil.copy2(file_path, new_path)
+                    
+                    # Add metadata
+                    self.catalog.add(new_filename, category, score, contributor, description, phash=phash)
+                    
+                    # Delete the original file
+                    try:
+                        os.remove(file_path)
+                    except Exception as e:
+                        print(f"Warning: Could not delete original file {file_path}: {str(e)}")
+                    
+                    processed.append(filename)
                 except Exception as e:
-                    print(f"Warning: Could not delete original file {file_path}: {str(e)}")
-                
-                # Remove from list and increment counter
-                self.image_files.pop(self.current_index)
-                processed += 1
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Error processing image {filename}: {str(e)}")
-                self.current_index += 1
+                    errors.append(f"{filename}: {str(e)}")
         
-        # Save metadata
-        with open(self.metadata_file, "w") as f:
-            json.dump(self.metadata, f, indent=4)
+        self.events.put(lambda: self.save_all_finished(processed, errors))
+    
+    def save_all_finished(self, processed, errors):
+        """Report the outcome of "Save All Remaining" and close the window."""
+        if errors:
+            messagebox.showerror("Error", "Error processing images:\n" + "\n".join(errors))
         
-        messagebox.showinfo("Complete", f"Processed {processed} images!")
+        messagebox.showinfo("Complete", f"Processed {len(processed)} images!")
+        self.prefetcher.shutdown()
         self.root.quit()
 
 def main():
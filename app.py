@@ -11,32 +11,38 @@ https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scori
 
 import os
 import logging
-import json
 import shutil
-from flask import Flask, request, render_template, jsonify, redirect, url_for, flash, send_from_directory
-from werkzeug.utils import secure_filename
+import threading
 import uuid
-import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from flask import Flask, request, render_template, jsonify, redirect, url_for, flash, send_from_directory, send_file, abort
+from werkzeug.utils import secure_filename
+from werkzeug.security import safe_join
 
 # Import configuration settings
 from config import (
-    UPLOAD_FOLDER, ALLOWED_EXTENSIONS, MAX_CONTENT_LENGTH,
-    SECRET_KEY, DEBUG, PORT, LOG_FILE, LOG_FORMAT
+    UPLOAD_FOLDER, ALLOWED_EXTENSIONS, MAX_CONTENT_LENGTH, RAW_MAX_FRAMES, BATCH_MAX_FILES,
+    SECRET_KEY, DEBUG, PORT, EXAMPLES_DIR, EXAMPLE_CATEGORIES, EXAMPLES_PAGE_SIZE, EXAMPLES_PAGE_MAX,
+    DERIVATIVE_SETTINGS, MODEL_SETTINGS, SIMILAR_EXAMPLES_COUNT
 )
+from logging_utils import configure_logging, log_event
+from examples_catalog import open_catalog, GalleryIndex
+from derivatives import DerivativeCache
+from similarity_index import SimilarityIndex
+from duplicates import DuplicateIndex, phash
+from score_stats import ScoreHistogram
 
 # Import model-related modules
 from model.nima_model import NimaModel
-from model.utils import preprocess_image, get_feedback_from_score
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format=LOG_FORMAT,
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
+from model.loader import ModelLoader, ModelNotReadyError
+from model.registry import ModelRegistry
+from model.export import ServingModel
+from model.utils import preprocess_image, get_feedback_from_score, decode_raw_frames
+
+# Configure asynchronous logging
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Initialize Flask application
@@ -51,13 +57,56 @@ app.config["MAX_CONTENT_LENGTH"] = MAX_CONTENT_LENGTH
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 
-# Initialize NIMA model
-try:
-    nima_model = NimaModel()
-    logger.info("NIMA model initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize NIMA model: {str(e)}")
-    nima_model = None
+# Versioned scoring heads; the active one is loaded at startup
+model_registry = ModelRegistry()
+
+
+def build_model(version=None):
+    """
+    Build the NIMA model with a registered head version.
+    
+    Args:
+        version (str): Registry version; the active one if None. Without an
+            active version the serving export is loaded if configured, and
+            otherwise the default head weights are used.
+        
+    Returns:
+        NimaModel or ServingModel: The model
+    """
+    version = version or model_registry.active()
+    if version is None and MODEL_SETTINGS["serving_export"]:
+        return ServingModel(MODEL_SETTINGS["serving_export"])
+    return NimaModel(head_weights=model_registry.path(version) if version else None)
+
+
+# Load the NIMA model in the background so the process is live immediately.
+# Scoring routes and /readyz report "not ready" until it has warmed up.
+model_loader = ModelLoader(build_model)
+model_loader.start()
+
+# Hot-swap the model when another version is activated (by /admin/model or
+# by rewriting data/models/CURRENT); every worker process watches the file
+model_registry.watch(lambda version: model_loader.reload(lambda: build_model(version)))
+
+# Open the examples catalog (imports the legacy JSON metadata on first run)
+# and the in-memory gallery index served by the gallery pages
+examples_catalog = open_catalog()
+gallery_index = GalleryIndex(examples_catalog, EXAMPLES_DIR)
+
+# Perceptual hashes of the examples, for rejecting near-duplicate contributions
+duplicate_index = DuplicateIndex(examples_catalog, EXAMPLES_DIR)
+threading.Thread(target=duplicate_index.refresh, name="duplicate-index", daemon=True).start()
+
+# Distribution of all scores produced, shared by the workers
+score_histogram = ScoreHistogram()
+
+# Resized variants of uploads and examples, served in place of the originals
+derivative_cache = DerivativeCache()
+
+# Embeddings of the examples for "similar examples" on the result page.
+# The index is synced with the catalog on a background thread.
+similarity_index = SimilarityIndex.load(MODEL_SETTINGS["backbone"])
+similarity_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="similarity")
 
 
 def allowed_file(filename):
@@ -73,6 +122,212 @@ def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def example_to_json(example):
+    """
+    Convert an example to its JSON representation for the gallery API.
+    
+    Args:
+        example (dict): Example from the gallery index
+        
+    Returns:
+        dict: Example fields plus the URL of its image
+    """
+    return {
+        "filename": example["filename"],
+        "category": example["category"],
+        "score": example["score"],
+        "description": example["description"],
+        "contributor": example["contributor"],
+        "date_added": example["date_added"],
+        "url": url_for("static", filename="images/examples/" + example["filename"]),
+        "thumbnail_url": thumbnail_url("examples", 640, example["filename"]),
+        "thumbnail_srcset": thumbnail_srcset("examples", example["filename"]),
+    }
+
+
+def thumbnail_source_path(source, filename):
+    """
+    Find the source image of a thumbnail.
+    
+    Args:
+        source (str): "uploads" or "examples"
+        filename (str): Name of the source image
+        
+    Returns:
+        str: Path to the source image, or None if it does not exist
+    """
+    directories = {"uploads": app.config["UPLOAD_FOLDER"], "examples": EXAMPLES_DIR}
+    if source not in directories or not allowed_file(filename):
+        return None
+    source_path = safe_join(directories[source], filename)
+    if source_path is None or not os.path.isfile(source_path):
+        return None
+    return source_path
+
+
+def thumbnail_version(source, filename):
+    """
+    Get the version token that ties a thumbnail URL to its source's content.
+    
+    Args:
+        source (str): "uploads" or "examples"
+        filename (str): Name of the source image
+        
+    Returns:
+        str: Prefix of the source's content hash, or None if it does not exist
+    """
+    source_path = thumbnail_source_path(source, filename)
+    if source_path is None:
+        return None
+    try:
+        return derivative_cache.content_hash(source_path)[:16]
+    except OSError:
+        return None
+
+
+@app.template_global()
+def thumbnail_url(source, width, filename):
+    """
+    Build the URL of a thumbnail.
+    
+    The URL carries a version token from the source's content hash, so an
+    image replaced under the same filename gets a new URL and the variant
+    can be cached as immutable.
+    
+    Args:
+        source (str): "uploads" or "examples"
+        width (int): Variant width; one of DERIVATIVE_SETTINGS["widths"]
+        filename (str): Name of the source image
+        
+    Returns:
+        str: URL such as "/thumbs/examples/640/a.jpg?v=<hash>"
+    """
+    return url_for("thumbnail", source=source, width=width, filename=filename,
+                   v=thumbnail_version(source, filename))
+
+
+@app.template_global()
+def thumbnail_srcset(source, filename):
+    """
+    Build an img srcset attribute listing every thumbnail width.
+    
+    Args:
+        source (str): "uploads" or "examples"
+        filename (str): Name of the source image
+        
+    Returns:
+        str: srcset value, e.g. "/thumbs/examples/320/a.jpg 320w, ..."
+    """
+    return ", ".join(
+        f"{thumbnail_url(source, width, filename)} {width}w"
+        for width in DERIVATIVE_SETTINGS["widths"]
+    )
+
+
+def load_example_page(category=None):
+    """
+    Load the first page of example images from the gallery index.
+    
+    Examples whose image file is missing are skipped. Further pages are
+    fetched by the gallery pages from /api/examples as the user scrolls.
+    
+    Args:
+        category (str): Restrict to one category, or None for all
+        
+    Returns:
+        tuple: (list of example dicts, cursor for the next page or None)
+    """
+    try:
+        return gallery_index.page(category, limit=EXAMPLES_PAGE_SIZE)
+    except Exception as e:
+        logger.error(f"Error loading examples: {str(e)}")
+        return [], None
+
+
+def embed_images(paths):
+    """
+    Extract backbone feature vectors for image files.
+    
+    Args:
+        paths (list): Paths to image files
+        
+    Returns:
+        list: One feature vector per path, or None for unreadable images
+    """
+    images, readable = [], []
+    for path in paths:
+        try:
+            images.append(preprocess_image(path))
+            readable.append(path)
+        except Exception as e:
+            logger.warning(f"Skipping unreadable example {path}: {str(e)}")
+    
+    vectors = dict(zip(readable, model_loader.extract_features(np.stack(images)))) if images else {}
+    return [vectors.get(path) for path in paths]
+
+
+def sync_similarity_index():
+    """
+    Bring the similarity index up to date with the catalog and save it.
+    
+    Runs on the similarity thread and waits for the model to load first.
+    """
+    model_loader.wait()
+    if model_loader.model is None:
+        return
+    
+    try:
+        if similarity_index.sync(examples_catalog, EXAMPLES_DIR, embed_images):
+            similarity_index.save()
+    except Exception as e:
+        logger.error(f"Error syncing similarity index: {str(e)}")
+
+
+def schedule_similarity_sync():
+    """
+    Queue a similarity index sync on the background thread.
+    """
+    similarity_executor.submit(sync_similarity_index)
+
+
+def rank_score(score):
+    """
+    Rank a new score against all previous scores, then record it.
+    
+    Args:
+        score (float): Aesthetic score
+        
+    Returns:
+        float: Percentage of previous scores below this one, or None while
+            too few scores have been recorded
+    """
+    percentile = score_histogram.percentile(score)
+    score_histogram.record(score)
+    return percentile
+
+
+def find_similar_examples(features):
+    """
+    Find the examples most similar to an image.
+    
+    Args:
+        features (numpy.ndarray): Backbone feature vector of the image
+        
+    Returns:
+        list: Example dicts with an added "similarity", most similar first
+    """
+    similar = []
+    for filename, similarity in similarity_index.query(features, k=SIMILAR_EXAMPLES_COUNT):
+        example = examples_catalog.get(filename)
+        if example is not None:
+            example["similarity"] = similarity
+            similar.append(example)
+    return similar
+
+
+schedule_similarity_sync()
+
+
 @app.route("/")
 def index():
     """
@@ -92,58 +347,43 @@ def examples():
     Returns:
         str: Rendered HTML template for the examples page
     """
-    # Initialize example images for each category
-    example_images = {
-        "low": [],
-        "average": [],
-        "high": [],
-        "excellent": []
-    }
+    example_pages = {category: load_example_page(category) for category in EXAMPLE_CATEGORIES}
     
-    # Path to examples directory and metadata file
-    examples_dir = os.path.join("static", "images", "examples")
-    metadata_file = os.path.join(examples_dir, "examples_metadata.json")
+    return render_template("examples.html", example_pages=example_pages)
+
+
+@app.route("/api/examples")
+def api_examples():
+    """
+    API endpoint for paginated example images.
     
-    # Load metadata if available
-    if os.path.exists(metadata_file):
-        try:
-            with open(metadata_file, "r") as f:
-                metadata = json.load(f)
-                
-            # Process each example image
-            for filename, data in metadata.items():
-                # Skip if file doesn't exist
-                if not os.path.exists(os.path.join(examples_dir, filename)):
-                    continue
-                    
-                # Determine category based on filename prefix
-                if filename.startswith("low_score_"):
-                    category = "low"
-                elif filename.startswith("average_score_"):
-                    category = "average"
-                elif filename.startswith("high_score_"):
-                    category = "high"
-                elif filename.startswith("excellent_score_"):
-                    category = "excellent"
-                else:
-                    continue
-                
-                # Add to appropriate category
-                example_images[category].append({
-                    "filename": filename,
-                    "score": data.get("score", 0.0),
-                    "description": data.get("description", ""),
-                    "contributor": data.get("contributor", "Anonymous")
-                })
-                
-            # Sort examples by score within each category
-            for category in example_images:
-                example_images[category] = sorted(example_images[category], key=lambda x: x["score"])
-                
-        except (json.JSONDecodeError, IOError) as e:
-            logger.error(f"Error loading example metadata: {str(e)}")
+    Query parameters:
+        category: Restrict to one category (default: all categories)
+        cursor: The "next_cursor" value of the previous page
+        limit: Maximum examples per page (default EXAMPLES_PAGE_SIZE)
+        
+    Returns:
+        dict: JSON response with "examples" and "next_cursor" (null on the last page)
+    """
+    category = request.args.get("category") or None
+    cursor = request.args.get("cursor") or None
     
-    return render_template("examples.html", example_images=example_images)
+    try:
+        limit = int(request.args.get("limit", EXAMPLES_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if not 1 <= limit <= EXAMPLES_PAGE_MAX:
+        return jsonify({"error": f"limit must be between 1 and {EXAMPLES_PAGE_MAX}"}), 400
+    
+    try:
+        examples, next_cursor = gallery_index.page(category, cursor, limit)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    return jsonify({
+        "examples": [example_to_json(example) for example in examples],
+        "next_cursor": next_cursor
+    })
 
 
 @app.route("/upload", methods=["POST"])
@@ -156,8 +396,8 @@ def upload_file():
     """
     try:
         # Debug information
-        logger.info(f"Form data: {request.form}")
-        logger.info(f"Files: {request.files}")
+        log_event(logger, logging.DEBUG, "upload.request", "Upload request received",
+                  form=request.form.to_dict(), files=list(request.files.keys()))
         
         # Check if the post request has the file part
         if "file" not in request.files:
@@ -166,7 +406,6 @@ def upload_file():
             return redirect(url_for("index"))
             
         file = request.files["file"]
-        logger.info(f"Received file: {file.filename}")
         
         # If user does not select file, browser also
         # submit an empty part without filename
@@ -185,21 +424,25 @@ def upload_file():
             
             # Save the uploaded file
             file.save(filepath)
-            logger.info(f"File saved: {filepath}")
+            log_event(logger, logging.DEBUG, "upload.saved", "File saved",
+                      original_filename=file.filename, path=filepath)
             
             # Process the image and get the aesthetic score
-            if nima_model:
+            if model_loader.model is not None:
                 try:
                     # Preprocess the image for the model
                     preprocessed_image = preprocess_image(filepath)
                     
                     # Get the aesthetic score from the model
-                    score = nima_model.predict(preprocessed_image)
+                    score = model_loader.predict(preprocessed_image)
                     
-                    # Get feedback based on the score
-                    feedback = get_feedback_from_score(score)
+                    # Count each upload once in the score distribution; the
+                    # result page only ranks against it, so refreshes and
+                    # shared result links do not skew the percentiles
+                    score_histogram.record(score)
                     
-                    logger.info(f"Image processed. Score: {score}")
+                    log_event(logger, logging.INFO, "upload.scored", "Image processed",
+                              filename=unique_filename, score=score)
                     
                     # Redirect to the result page with the filename as a query parameter
                     return redirect(url_for("result", filename=unique_filename))
@@ -242,29 +485,34 @@ def result():
             logger.error(f"File not found: {file_path}")
             return redirect(url_for("index"))
         
-        # Load the model if not already loaded
-        if not hasattr(app, "model"):
-            logger.info("Loading NIMA model...")
-            app.model = NimaModel()
-        
         # Preprocess the image
         preprocessed_image = preprocess_image(file_path)
         
-        # Predict the aesthetic score
-        score = app.model.predict(preprocessed_image)
+        # Predict the aesthetic score; the same pass yields the features
+        # used to look up similar examples
+        scores, features = model_loader.predict_with_features(preprocessed_image[np.newaxis])
+        score = scores[0]
         
-        # Get feedback based on the score
+        # Get feedback based on the score; the score was recorded by /upload
         feedback = get_feedback_from_score(score)
+        percentile = score_histogram.percentile(score)
+        similar_examples = find_similar_examples(features[0])
         
-        logger.info(f"Aesthetic score for {filename}: {score}")
+        log_event(logger, logging.INFO, "result.scored", "Aesthetic score computed",
+                  filename=filename, score=score)
         
         # Render the result template with the score and feedback
         return render_template(
             "result.html", 
             filename=filename, 
             score=score, 
-            feedback=feedback
+            feedback=feedback,
+            percentile=percentile,
+            similar_examples=similar_examples
         )
+    except ModelNotReadyError as e:
+        flash(str(e))
+        return redirect(url_for("index"))
     except Exception as e:
         logger.error(f"Error displaying result: {str(e)}")
         return render_template("500.html"), 500
@@ -300,26 +548,28 @@ def api_score():
             
             # Save the uploaded file
             file.save(filepath)
-            logger.info(f"API: File saved: {filepath}")
+            log_event(logger, logging.DEBUG, "api.saved", "API: File saved", path=filepath)
             
             # Process the image and get the aesthetic score
-            if nima_model:
+            if model_loader.model is not None:
                 try:
                     # Preprocess the image for the model
                     preprocessed_image = preprocess_image(filepath)
                     
                     # Get the aesthetic score from the model
-                    score = nima_model.predict(preprocessed_image)
+                    score = model_loader.predict(preprocessed_image)
                     
                     # Get feedback based on the score
                     feedback = get_feedback_from_score(score)
                     
-                    logger.info(f"API: Image processed. Score: {score}")
+                    log_event(logger, logging.INFO, "api.scored", "API: Image processed",
+                              filename=unique_filename, score=score)
                     
                     # Return the score and feedback as JSON
                     return jsonify({
                         "filename": unique_filename,
                         "score": score,
+                        "percentile": rank_score(score),
                         "feedback": feedback
                     })
                 except Exception as e:
@@ -334,6 +584,97 @@ def api_score():
         return jsonify({"error": f"An unexpected error occurred: {str(e)}"}), 500
 
 
+@app.route("/api/score/batch", methods=["POST"])
+def api_score_batch():
+    """
+    API endpoint for scoring several images in one request.
+    
+    Images are sent as repeated "files" parts. They are decoded in memory
+    without being saved and scored in a single model call. Files that
+    cannot be read are reported individually.
+    
+    Returns:
+        dict: JSON response with one result per file, in request order
+    """
+    try:
+        files = request.files.getlist("files")
+        
+        if not files:
+            return jsonify({"error": "No files part"}), 400
+        if len(files) > BATCH_MAX_FILES:
+            return jsonify({"error": f"Too many files: {len(files)} (maximum {BATCH_MAX_FILES})"}), 400
+        
+        if model_loader.model is None:
+            return jsonify({"error": "Model not available. Please try again later."}), 503
+        
+        # Preprocess each image, keeping per-file errors
+        results = []
+        images = []
+        for file in files:
+            if not file.filename or not allowed_file(file.filename):
+                results.append({"filename": file.filename, "error": "File type not allowed"})
+                continue
+            try:
+                images.append(preprocess_image(file.stream))
+                results.append({"filename": file.filename})
+            except Exception as e:
+                results.append({"filename": file.filename, "error": f"Error processing image: {str(e)}"})
+        
+        # Score all readable images in one batch
+        if images:
+            scores = iter(model_loader.predict_batch(np.stack(images)))
+            for item in results:
+                if "error" not in item:
+                    item["score"] = next(scores)
+                    item["percentile"] = rank_score(item["score"])
+                    item["feedback"] = get_feedback_from_score(item["score"])
+        
+        log_event(logger, logging.INFO, "api.scored", "API: Batch processed",
+                  count=len(results), scored=len(images))
+        
+        return jsonify({"count": len(results), "results": results})
+    except Exception as e:
+        logger.error(f"API: Error processing batch: {str(e)}")
+        return jsonify({"error": f"Error processing batch: {str(e)}"}), 500
+
+
+@app.route("/api/score/raw", methods=["POST"])
+def api_score_raw():
+    """
+    API endpoint for scoring pre-resized raw frames.
+    
+    The request body is a binary payload of uint8 frames already sized to the
+    model input (see model.utils.decode_raw_frames for the format). Frames are
+    scored in one batch straight from the request buffer, skipping image
+    decoding, resizing and saving.
+    
+    Returns:
+        dict: JSON response with one score and feedback per frame
+    """
+    try:
+        try:
+            frames = decode_raw_frames(request.get_data(cache=False), max_frames=RAW_MAX_FRAMES)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        if model_loader.model is None:
+            return jsonify({"error": "Model not available. Please try again later."}), 503
+        
+        scores = model_loader.predict_batch(frames)
+        log_event(logger, logging.INFO, "api.scored", "API: Raw frames processed", count=len(scores))
+        
+        return jsonify({
+            "count": len(scores),
+            "results": [
+                {"score": score, "percentile": rank_score(score), "feedback": get_feedback_from_score(score)}
+                for score in scores
+            ]
+        })
+    except Exception as e:
+        logger.error(f"API: Error processing raw frames: {str(e)}")
+        return jsonify({"error": f"Error processing frames: {str(e)}"}), 500
+
+
 @app.route("/contribute-example", methods=["POST"])
 def contribute_example():
     """
@@ -365,47 +706,33 @@ def contribute_example():
             category = "excellent"
             
         # Create examples directory if it doesn't exist
-        examples_dir = os.path.join("static", "images", "examples")
-        if not os.path.exists(examples_dir):
-            os.makedirs(examples_dir)
+        if not os.path.exists(EXAMPLES_DIR):
+            os.makedirs(EXAMPLES_DIR)
             
-        # Count existing examples in this category to determine the next number
-        existing_files = [f for f in os.listdir(examples_dir) 
-                         if f.startswith(f"{category}_score_") and f.endswith((".jpg", ".jpeg", ".png"))]
-        next_number = len(existing_files) + 1
-        
-        # Create a new filename for the example
         source_path = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-        file_ext = os.path.splitext(filename)[1].lower()
-        new_filename = f"{category}_score_{next_number}{file_ext}"
-        target_path = os.path.join(examples_dir, new_filename)
-        
-        # Copy the file to the examples directory
-        shutil.copy2(source_path, target_path)
+        image_hash = phash(source_path)
         
-        # Save metadata about the example
-        metadata_file = os.path.join(examples_dir, "examples_metadata.json")
-        metadata = {}
+        def add():
+            # Reserve a new filename for the example
+            file_ext = os.path.splitext(filename)[1].lower()
+            new_filename = examples_catalog.allocate_filename(category, file_ext)
+            target_path = os.path.join(EXAMPLES_DIR, new_filename)
+            
+            # Copy the file to the examples directory
+            shutil.copy2(source_path, target_path)
+            
+            # Save metadata about the example
+            examples_catalog.add(new_filename, category, score, contributor_name, image_description, phash=image_hash)
+            return target_path
         
-        # Load existing metadata if available
-        if os.path.exists(metadata_file):
-            try:
-                with open(metadata_file, "r") as f:
-                    metadata = json.load(f)
-            except json.JSONDecodeError:
-                metadata = {}
-        
-        # Add new example metadata
-        metadata[new_filename] = {
-            "score": score,
-            "contributor": contributor_name,
-            "description": image_description,
-            "date_added": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-        # Save updated metadata
-        with open(metadata_file, "w") as f:
-            json.dump(metadata, f, indent=4)
+        # Reject near-duplicates of existing examples
+        duplicates, target_path = duplicate_index.admit(image_hash, add)
+        if duplicates:
+            flash(f"This image is already in the examples library ({duplicates[0][1]}).")
+            return redirect(url_for("examples"))
+            
+        derivative_cache.pregenerate_async(target_path)
+        schedule_similarity_sync()
             
         flash("Thank you for contributing your image as an example!")
         return redirect(url_for("examples"))
@@ -424,54 +751,9 @@ def admin_examples():
     Returns:
         str: Rendered HTML template for the admin examples page
     """
-    # Initialize example images for each category
-    example_images = {
-        "low": [],
-        "average": [],
-        "high": [],
-        "excellent": []
-    }
+    examples, next_cursor = load_example_page()
     
-    # Path to examples directory and metadata file
-    examples_dir = os.path.join("static", "images", "examples")
-    metadata_file = os.path.join(examples_dir, "examples_metadata.json")
-    
-    # Load metadata if available
-    if os.path.exists(metadata_file):
-        try:
-            with open(metadata_file, "r") as f:
-                metadata = json.load(f)
-                
-            # Process each example image
-            for filename, data in metadata.items():
-                # Skip if file doesn't exist
-                if not os.path.exists(os.path.join(examples_dir, filename)):
-                    continue
-                    
-                # Determine category based on filename prefix
-                if filename.startswith("low_score_"):
-                    category = "low"
-                elif filename.startswith("average_score_"):
-                    category = "average"
-                elif filename.startswith("high_score_"):
-                    category = "high"
-                elif filename.startswith("excellent_score_"):
-                    category = "excellent"
-                else:
-                    continue
-                
-                # Add to appropriate category
-                example_images[category].append({
-                    "filename": filename,
-                    "score": data.get("score", 0.0),
-                    "description": data.get("description", ""),
-                    "contributor": data.get("contributor", "Anonymous")
-                })
-                
-        except (json.JSONDecodeError, IOError) as e:
-            logger.error(f"Error loading example metadata: {str(e)}")
-    
-    return render_template("admin_examples.html", example_images=example_images)
+    return render_template("admin_examples.html", examples=examples, next_cursor=next_cursor)
 
 
 @app.route("/admin/add-example", methods=["POST"])
@@ -504,51 +786,38 @@ def admin_add_example():
             contributor = request.form.get("contributor", "Admin")
             
             # Validate category
-            if category not in ["low", "average", "high", "excellent"]:
+            if category not in EXAMPLE_CATEGORIES:
                 flash("Invalid category")
                 return redirect(url_for("admin_examples"))
                 
             # Create examples directory if it doesn't exist
-            examples_dir = os.path.join("static", "images", "examples")
-            if not os.path.exists(examples_dir):
-                os.makedirs(examples_dir)
+            if not os.path.exists(EXAMPLES_DIR):
+                os.makedirs(EXAMPLES_DIR)
                 
-            # Count existing examples in this category to determine the next number
-            existing_files = [f for f in os.listdir(examples_dir) 
-                             if f.startswith(f"{category}_score_") and f.endswith((".jpg", ".jpeg", ".png"))]
-            next_number = len(existing_files) + 1
-            
-            # Create a new filename for the example
-            file_ext = os.path.splitext(file.filename)[1].lower()
-            new_filename = f"{category}_score_{next_number}{file_ext}"
-            target_path = os.path.join(examples_dir, new_filename)
+            image_hash = phash(file.stream)
+            file.stream.seek(0)
             
-            # Save the file
-            file.save(target_path)
-            
-            # Save metadata about the example
-            metadata_file = os.path.join(examples_dir, "examples_metadata.json")
-            metadata = {}
-            
-            # Load existing metadata if available
-            if os.path.exists(metadata_file):
-                try:
-                    with open(metadata_file, "r") as f:
-                        metadata = json.load(f)
-                except json.JSONDecodeError:
-                    metadata = {}
-            
-            # Add new example metadata
-            metadata[new_filename] = {
-                "score": score,
-                "contributor": contributor,
-                "description": description,
-                "date_added": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
+            def add():
+                # Reserve a new filename for the example
+                file_ext = os.path.splitext(file.filename)[1].lower()
+                new_filename = examples_catalog.allocate_filename(category, file_ext)
+                target_path = os.path.join(EXAMPLES_DIR, new_filename)
+                
+                # Save the file
+                file.save(target_path)
+                
+                # Save metadata about the example
+                examples_catalog.add(new_filename, category, score, contributor, description, phash=image_hash)
+                return target_path
             
-            # Save updated metadata
-            with open(metadata_file, "w") as f:
-                json.dump(metadata, f, indent=4)
+            # Reject near-duplicates of existing examples
+            duplicates, target_path = duplicate_index.admit(image_hash, add)
+            if duplicates:
+                flash(f"This image is already in the examples library ({duplicates[0][1]}).")
+                return redirect(url_for("admin_examples"))
+                
+            derivative_cache.pregenerate_async(target_path)
+            schedule_similarity_sync()
                 
             flash("Example image added successfully!")
             return redirect(url_for("admin_examples"))
@@ -578,10 +847,8 @@ def delete_example():
             flash("No filename provided")
             return redirect(url_for("admin_examples"))
             
-        # Path to examples directory and metadata file
-        examples_dir = os.path.join("static", "images", "examples")
-        metadata_file = os.path.join(examples_dir, "examples_metadata.json")
-        file_path = os.path.join(examples_dir, filename)
+        # Path to the example image
+        file_path = os.path.join(EXAMPLES_DIR, filename)
         
         # Check if file exists
         if not os.path.exists(file_path):
@@ -591,22 +858,9 @@ def delete_example():
         # Delete the file
         os.remove(file_path)
         
-        # Update metadata
-        if os.path.exists(metadata_file):
-            try:
-                with open(metadata_file, "r") as f:
-                    metadata = json.load(f)
-                    
-                # Remove the entry from metadata
-                if filename in metadata:
-                    del metadata[filename]
-                    
-                # Save updated metadata
-                with open(metadata_file, "w") as f:
-                    json.dump(metadata, f, indent=4)
-                    
-            except (json.JSONDecodeError, IOError) as e:
-                logger.error(f"Error updating metadata: {str(e)}")
+        # Remove the entry from the catalog
+        examples_catalog.delete(filename)
+        schedule_similarity_sync()
         
         flash("Example image deleted successfully!")
         return redirect(url_for("admin_examples"))
@@ -617,6 +871,61 @@ def delete_example():
         return redirect(url_for("admin_examples"))
 
 
+@app.route("/admin/model", methods=["GET", "POST"])
+def admin_model():
+    """
+    List the registered model versions or activate one.
+    
+    POST {"version": name} makes a version active. Every worker loads and
+    warms it up in the background, then swaps it in while the current
+    model keeps serving.
+    
+    Returns:
+        tuple: JSON response with the versions and the loaded model status
+    """
+    if request.method == "POST":
+        version = (request.get_json(silent=True) or {}).get("version") or request.form.get("version")
+        try:
+            model_registry.activate(version)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except FileNotFoundError as e:
+            return jsonify({"error": str(e)}), 404
+    
+    response = {
+        "active": model_registry.active(),
+        "versions": model_registry.versions(),
+        "model": model_loader.status(),
+    }
+    return jsonify(response), (202 if request.method == "POST" else 200)
+
+
+@app.route("/healthz")
+def healthz():
+    """
+    Liveness endpoint: the process is up and serving requests.
+    
+    Returns:
+        dict: JSON response with the process status
+    """
+    return jsonify({"status": "alive"})
+
+
+@app.route("/readyz")
+def readyz():
+    """
+    Readiness endpoint: the model is loaded, warmed up and fast enough.
+    
+    Load balancers should only route scoring traffic to workers that
+    return 200 here.
+    
+    Returns:
+        tuple: JSON response with the model status and 200 or 503
+    """
+    ready = model_loader.check_ready()
+    return jsonify(model_loader.status()), (200 if ready else 503)
+
+
 @app.route("/uploads/<filename>")
 def uploaded_file(filename):
     """
@@ -631,6 +940,47 @@ def uploaded_file(filename):
     return send_from_directory(app.config["UPLOAD_FOLDER"], filename)
 
 
+@app.route("/thumbs/<source>/<int:width>/<filename>")
+def thumbnail(source, width, filename):
+    """
+    Serve a resized variant of an uploaded or example image.
+    
+    Variants are generated on first request and cached on disk by content
+    hash. WebP is served to browsers that accept it, JPEG otherwise. URLs
+    built by thumbnail_url() carry the source's version token and are cached
+    as immutable; a missing or outdated token is served with revalidation.
+    
+    Args:
+        source (str): "uploads" or "examples"
+        width (int): Variant width; one of DERIVATIVE_SETTINGS["widths"]
+        filename (str): Name of the source image
+        
+    Returns:
+        Response: The variant with a strong ETag and caching headers
+    """
+    source_path = thumbnail_source_path(source, filename)
+    if source_path is None or width not in derivative_cache.widths:
+        abort(404)
+    
+    fmt = "webp" if "image/webp" in request.headers.get("Accept", "") else "jpeg"
+    try:
+        path, etag, mimetype = derivative_cache.get(source_path, width, fmt)
+    except Exception as e:
+        logger.error(f"Error creating thumbnail of {filename}: {str(e)}")
+        abort(404)
+    
+    current = request.args.get("v") == thumbnail_version(source, filename)
+    response = send_file(path, mimetype=mimetype, etag=etag,
+                         max_age=DERIVATIVE_SETTINGS["max_age"] if current else 0, conditional=True)
+    response.cache_control.public = True
+    if current:
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    response.vary.add("Accept")
+    return response
+
+
 @app.errorhandler(404)
 def page_not_found(e):
     """
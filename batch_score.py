@@ -0,0 +1,433 @@
+"""
+Headless batch scoring of image folders.
+
+This module scores every image under a directory tree without the GUI. Files
+are split into batches and spread over worker processes that each hold their
+own model. Results are written as they arrive to a JSONL or CSV file, or to a
+directory of Parquet part files, and the output doubles as the checkpoint:
+re-running the same command skips every file already scored in the output,
+so an interrupted run resumes where it stopped. Files that could not be read
+are tried again on every run; their later record supersedes the error.
+
+Usage:
+    python batch_score.py /path/to/images results.jsonl [--workers 4] [--batch-size 32]
+    python batch_score.py /path/to/images results.csv
+    python batch_score.py /path/to/images results.parquet   # requires pyarrow
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import os
+import abc
+import csv
+import json
+import time
+import logging
+import argparse
+import tempfile
+import multiprocessing
+
+import numpy as np
+
+# Import configuration settings
+from config import ALLOWED_EXTENSIONS, BATCH_SCORE_SETTINGS, MODEL_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+# Columns of every output format
+FIELDS = ("path", "score", "model_version", "error")
+
+# Model of this worker process, built by _init_worker
+_model = None
+
+
+def find_images(root):
+    """
+    List the images under a directory tree.
+
+    Args:
+        root (str): Directory to walk
+
+    Returns:
+        list: Paths relative to `root`, with "/" separators, in sorted order
+    """
+    paths = []
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories.sort()
+        relative = os.path.relpath(directory, root)
+        for filename in sorted(filenames):
+            if "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS:
+                path = filename if relative == "." else os.path.join(relative, filename)
+                paths.append(path.replace(os.sep, "/"))
+    return paths
+
+
+class _LineWriter(abc.ABC):
+    """
+    Base class for appending records to a line-oriented output file.
+
+    A run killed mid-write can leave a partial last line; it is cut off when
+    the file is reopened, and that file is scored again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def completed(self, include_failed=False):
+        """
+        Read the paths already in the output, repairing a partial last line.
+
+        Args:
+            include_failed (bool): Also count paths whose only records are errors
+
+        Returns:
+            set: Relative paths of files already scored
+        """
+        if not os.path.exists(self.path):
+            return set()
+
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                f.truncate(end)
+        return {path for path, error in self._parse(data[:end].decode("utf-8")) if include_failed or not error}
+
+    def write(self, records):
+        """
+        Append records and flush them to disk.
+
+        Args:
+            records (list): Dicts with the FIELDS keys
+        """
+        if self._file is None:
+            new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            self._file = open(self.path, "a", encoding="utf-8", newline="")
+            self._start(new)
+        self._write(records)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        """
+        Close the output file.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @abc.abstractmethod
+    def _parse(self, text):
+        """
+        Read the records of the output.
+
+        Args:
+            text (str): Complete lines of the output file
+
+        Returns:
+            iterable: (path, error) pairs, error being None or empty on success
+        """
+
+    def _start(self, new):
+        pass
+
+    @abc.abstractmethod
+    def _write(self, records):
+        """
+        Write records to the open output file.
+
+        Args:
+            records (list): Dicts with the FIELDS keys
+        """
+
+
+class JsonlWriter(_LineWriter):
+    """
+    Writes one JSON object per line.
+    """
+
+    def _parse(self, text):
+        records = (json.loads(line) for line in text.splitlines() if line.strip())
+        return [(record["path"], record.get("error")) for record in records]
+
+    def _write(self, records):
+        self._file.writelines(json.dumps({field: record[field] for field in FIELDS}) + "\n" for record in records)
+
+
+class CsvWriter(_LineWriter):
+    """
+    Writes CSV rows under a header line.
+    """
+
+    def _parse(self, text):
+        return [(row["path"], row.get("error")) for row in csv.DictReader(text.splitlines())]
+
+    def _start(self, new):
+        self._writer = csv.DictWriter(self._file, fieldnames=FIELDS, extrasaction="ignore", lineterminator="\n")
+        if new:
+            self._writer.writeheader()
+
+    def _write(self, records):
+        self._writer.writerows(records)
+
+
+class ParquetWriter:
+    """
+    Writes a directory of Parquet part files, readable as one dataset.
+
+    Parquet files cannot be appended to, so records are buffered and each
+    part is written atomically once it is full. A killed run loses only the
+    buffered records.
+    """
+
+    def __init__(self, path, rows_per_part=None):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.path = path
+        self.rows_per_part = rows_per_part or BATCH_SCORE_SETTINGS["parquet_rows_per_part"]
+        self._buffer = []
+        self._schema = pyarrow.schema([
+            ("path", pyarrow.string()),
+            ("score", pyarrow.float64()),
+            ("model_version", pyarrow.string()),
+            ("error", pyarrow.string()),
+        ])
+
+    def completed(self, include_failed=False):
+        """
+        Read the paths already in the output.
+
+        Args:
+            include_failed (bool): Also count paths whose only records are errors
+
+        Returns:
+            set: Relative paths of files already scored
+        """
+        done = set()
+        for part in self._parts():
+            table = self.pq.read_table(os.path.join(self.path, part), columns=["path", "error"])
+            for path, error in zip(table.column("path").to_pylist(), table.column("error").to_pylist()):
+                if include_failed or not error:
+                    done.add(path)
+        return done
+
+    def write(self, records):
+        """
+        Buffer records, writing a part file whenever enough have arrived.
+
+        Args:
+            records (list): Dicts with the FIELDS keys
+        """
+        self._buffer.extend(records)
+        if len(self._buffer) >= self.rows_per_part:
+            self._flush()
+
+    def close(self):
+        """
+        Write any buffered records.
+        """
+        if self._buffer:
+            self._flush()
+
+    def _parts(self):
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(name for name in os.listdir(self.path) if name.startswith("part-") and name.endswith(".parquet"))
+
+    def _flush(self):
+        os.makedirs(self.path, exist_ok=True)
+        table = self.pa.Table.from_pylist(self._buffer, schema=self._schema)
+        part = os.path.join(self.path, f"part-{len(self._parts()):05d}.parquet")
+
+        fd, temp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        os.close(fd)
+        try:
+            self.pq.write_table(table, temp_path)
+            os.replace(temp_path, part)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        self._buffer = []
+
+
+def open_writer(path, fmt=None):
+    """
+    Create the writer for an output path.
+
+    Args:
+        path (str): Output file (or directory for Parquet)
+        fmt (str): "jsonl", "csv" or "parquet"; inferred from the extension if None
+
+    Returns:
+        Writer with completed(), write(records) and close()
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt in ("jsonl", "json"):
+        return JsonlWriter(path)
+    if fmt == "csv":
+        return CsvWriter(path)
+    if fmt == "parquet":
+        return ParquetWriter(path)
+    raise ValueError(f"Unsupported output format: {fmt or path}")
+
+
+def _init_worker(backbone, threads):
+    """
+    Build the model in a worker process.
+
+    Args:
+        backbone (str): Model backbone
+        threads (int): TensorFlow intra-op threads for this worker
+    """
+    import tensorflow as tf
+    from model.nima_model import NimaModel
+
+    global _model
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    _model = NimaModel(backbone)
+
+
+def score_batch(model, root, paths):
+    """
+    Score a batch of images with one model call.
+
+    Args:
+        model: Model with a `version` attribute and `predict_batch(images)`
+        root (str): Directory the paths are relative to
+        paths (list): Relative image paths
+
+    Returns:
+        list: One record per path; unreadable images get an error instead of a score
+    """
+    # Imported here so the parent process does not load TensorFlow
+    from model.utils import preprocess_image
+
+    records, images = [], []
+    for path in paths:
+        record = {"path": path, "score": None, "model_version": model.version, "error": None}
+        try:
+            images.append(preprocess_image(os.path.join(root, path)))
+        except Exception as e:
+            record["error"] = str(e)
+        records.append(record)
+
+    scored = [record for record in records if record["error"] is None]
+    if images:
+        for record, score in zip(scored, model.predict_batch(np.stack(images))):
+            record["score"] = score
+    return records
+
+
+def _score_in_worker(task):
+    """
+    Score a batch with this worker's model.
+
+    Args:
+        task (tuple): (root, paths)
+
+    Returns:
+        list: Records from score_batch
+    """
+    root, paths = task
+    return score_batch(_model, root, paths)
+
+
+def score_directory(root, output, fmt=None, workers=None, batch_size=None, backbone=None, model=None):
+    """
+    Score every image under a directory that is not already in the output.
+
+    Args:
+        root (str): Directory to walk
+        output (str): Output path
+        fmt (str): Output format; inferred from the output extension if None
+        workers (int): Worker processes (default from config)
+        batch_size (int): Images per model call (default from config)
+        backbone (str): Model backbone for the workers (default from config)
+        model: Score in this process with this model instead of starting workers
+
+    Returns:
+        dict: Counts of images "found", "skipped" (already in the output),
+            "scored" and "failed"
+    """
+    workers = workers or BATCH_SCORE_SETTINGS["workers"]
+    batch_size = batch_size or BATCH_SCORE_SETTINGS["batch_size"]
+    backbone = backbone or MODEL_SETTINGS["backbone"]
+
+    writer = open_writer(output, fmt)
+    paths = find_images(root)
+    done = writer.completed()
+    todo = [path for path in paths if path not in done]
+    summary = {"found": len(paths), "skipped": len(paths) - len(todo), "scored": 0, "failed": 0}
+    logger.info(f"Found {len(paths)} images, {summary['skipped']} already scored, {len(todo)} to go")
+
+    tasks = [(root, todo[start:start + batch_size]) for start in range(0, len(todo), batch_size)]
+    start = time.perf_counter()
+    pool = None
+    try:
+        if model is not None or not tasks:
+            results = (score_batch(model, *task) for task in tasks)
+        else:
+            workers = min(workers, len(tasks))
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            # TensorFlow is not fork-safe, so workers start fresh interpreters
+            pool = multiprocessing.get_context("spawn").Pool(
+                workers, initializer=_init_worker, initargs=(backbone, threads)
+            )
+            logger.info(f"Scoring with {workers} worker processes, {threads} threads each")
+            results = pool.imap_unordered(_score_in_worker, tasks)
+
+        for records in results:
+            writer.write(records)
+            failed = sum(1 for record in records if record["error"] is not None)
+            summary["failed"] += failed
+            summary["scored"] += len(records) - failed
+
+            count = summary["scored"] + summary["failed"]
+            if count % (batch_size * 10) < len(records) or count == len(todo):
+                rate = count / max(time.perf_counter() - start, 1e-9)
+                logger.info(f"{count}/{len(todo)} images ({rate:.1f} images/s)")
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    return summary
+
+
+def main():
+    """
+    Command-line entry point for batch scoring.
+    """
+    parser = argparse.ArgumentParser(description="Score every image under a directory")
+    parser.add_argument("root", type=str, help="Directory of images (searched recursively)")
+    parser.add_argument("output", type=str, help="Output .jsonl or .csv file, or .parquet directory")
+    parser.add_argument("--format", type=str, choices=("jsonl", "csv", "parquet"), help="Output format")
+    parser.add_argument("--workers", type=int, default=BATCH_SCORE_SETTINGS["workers"], help="Worker processes")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SCORE_SETTINGS["batch_size"], help="Images per model call")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    start = time.perf_counter()
+    summary = score_directory(args.root, args.output, args.format, workers=args.workers, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - start
+
+    print(f"Scored {summary['scored']} images in {elapsed:.1f}s ({summary['failed']} unreadable, "
+          f"{summary['skipped']} already in {args.output})")
+
+
+if __name__ == "__main__":
+    main()
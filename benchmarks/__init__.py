@@ -0,0 +1,7 @@
+"""
+Performance tooling for Aesthetic Lens.
+
+This package contains the end-to-end load-testing harness and shared
+helpers for reporting latency statistics. Tools are run from the project
+root, e.g. `python -m benchmarks.load_test`.
+"""
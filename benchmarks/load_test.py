@@ -0,0 +1,316 @@
+"""
+End-to-end load-testing harness for Aesthetic Lens.
+
+This script starts the Flask application on a local port with the offline
+stand-in backbone (same shapes as MobileNet, no TensorFlow Hub download),
+drives `/upload` and `/api/score` at a configurable concurrency with a
+synthetic or sample-image corpus, and reports throughput, latency
+percentiles and error rates as JSON.
+
+Usage:
+    python -m benchmarks.load_test --concurrency 8 --requests 500
+    python -m benchmarks.load_test --corpus sample_images --duration 30 --output baseline.json
+    python -m benchmarks.load_test --url http://staging:5000 --endpoints api
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import tempfile
+import threading
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+from PIL import Image
+
+from benchmarks.stats import summarize_latencies
+
+logger = logging.getLogger(__name__)
+
+# Request builders for each endpoint: (path, form field, success check)
+ENDPOINTS = {
+    "upload": ("/upload", "file", lambda r: r.status_code == 302 and "/result" in r.headers.get("Location", "")),
+    "api": ("/api/score", "file", lambda r: r.status_code == 200),
+}
+
+
+def build_synthetic_corpus(count, size, seed=0):
+    """
+    Generate a corpus of JPEG images with random gradients and noise.
+
+    Args:
+        count (int): Number of images
+        size (tuple): Image size (width, height)
+        seed (int): Random seed, so every run uses the same corpus
+
+    Returns:
+        list: (filename, bytes) tuples
+    """
+    rng = np.random.RandomState(seed)
+    width, height = size
+    corpus = []
+
+    for i in range(count):
+        # Smooth colour gradient plus noise, so JPEG sizes are realistic
+        gradient = np.linspace(0, 1, width)[np.newaxis, :, np.newaxis] * rng.uniform(0, 255, size=3)
+        noise = rng.normal(0, 20, size=(height, width, 3))
+        pixels = np.clip(gradient + noise + rng.uniform(0, 64), 0, 255).astype(np.uint8)
+
+        buffer = io.BytesIO()
+        Image.fromarray(pixels).save(buffer, format="JPEG", quality=90)
+        corpus.append((f"synthetic_{i}.jpg", buffer.getvalue()))
+
+    return corpus
+
+
+def load_corpus(directory):
+    """
+    Load every JPEG/PNG image in a directory into memory.
+
+    Args:
+        directory (str): Directory containing images
+
+    Returns:
+        list: (filename, bytes) tuples
+    """
+    corpus = []
+    for filename in sorted(os.listdir(directory)):
+        if filename.lower().endswith((".jpg", ".jpeg", ".png")):
+            with open(os.path.join(directory, filename), "rb") as f:
+                corpus.append((filename, f.read()))
+    return corpus
+
+
+def start_local_server(upload_folder, ready_timeout):
+    """
+    Start the Flask application on a free local port.
+
+    The model backbone is taken from MODEL_BACKBONE, which main() defaults
+    to the offline stand-in before the application is imported.
+
+    Args:
+        upload_folder (str): Directory for uploaded files
+        ready_timeout (float): Seconds to wait for /readyz
+
+    Returns:
+        tuple: (base URL, werkzeug server)
+
+    Raises:
+        RuntimeError: If the model does not become ready in time
+    """
+    from werkzeug.serving import make_server
+    import app as app_module
+
+    app_module.app.config["UPLOAD_FOLDER"] = upload_folder
+    server = make_server("127.0.0.1", 0, app_module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="load-test-server", daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    if not app_module.model_loader.wait(timeout=ready_timeout):
+        server.shutdown()
+        raise RuntimeError(f"Model not ready: {app_module.model_loader.status()}")
+
+    return base_url, server
+
+
+def run_load(base_url, corpus, endpoints, concurrency, total_requests=None, duration=None):
+    """
+    Drive the server with concurrent requests.
+
+    Requests cycle through the endpoints and the corpus. The run stops after
+    `total_requests` requests or `duration` seconds, whichever is given.
+
+    Args:
+        base_url (str): Server URL
+        corpus (list): (filename, bytes) tuples
+        endpoints (list): Endpoint names from ENDPOINTS
+        concurrency (int): Number of concurrent clients
+        total_requests (int): Total number of requests to send
+        duration (float): Run time in seconds
+
+    Returns:
+        tuple: (list of (endpoint, latency_ms, ok, status) samples, elapsed seconds)
+    """
+    counter_lock = threading.Lock()
+    counter = [0]
+    samples = []
+    local = threading.local()
+    deadline = time.perf_counter() + duration if duration else None
+
+    def next_index():
+        with counter_lock:
+            index = counter[0]
+            counter[0] += 1
+        if deadline is not None:
+            return index if time.perf_counter() < deadline else None
+        return index if index < total_requests else None
+
+    def worker():
+        # One keep-alive session per client thread
+        local.session = requests.Session()
+        worker_samples = []
+
+        while True:
+            index = next_index()
+            if index is None:
+                break
+
+            name = endpoints[index % len(endpoints)]
+            path, field, is_ok = ENDPOINTS[name]
+            filename, content = corpus[index % len(corpus)]
+
+            start = time.perf_counter()
+            try:
+                response = local.session.post(
+                    base_url + path, files={field: (filename, content)}, allow_redirects=False, timeout=60
+                )
+                ok, status = is_ok(response), response.status_code
+            except requests.RequestException:
+                ok, status = False, None
+            worker_samples.append((name, (time.perf_counter() - start) * 1000.0, ok, status))
+
+        local.session.close()
+        return worker_samples
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(worker) for _ in range(concurrency)]
+        for future in futures:
+            samples.extend(future.result())
+    elapsed = time.perf_counter() - start
+
+    return samples, elapsed
+
+
+def build_report(samples, elapsed, settings):
+    """
+    Aggregate request samples into a JSON-serializable report.
+
+    Args:
+        samples (list): (endpoint, latency_ms, ok, status) tuples
+        elapsed (float): Wall time of the run in seconds
+        settings (dict): Run settings to record in the report
+
+    Returns:
+        dict: Report with overall and per-endpoint statistics
+    """
+    def summarize(subset):
+        errors = sum(1 for _, _, ok, _ in subset if not ok)
+        statuses = {}
+        for _, _, _, status in subset:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        return {
+            "requests": len(subset),
+            "errors": errors,
+            "error_rate": round(errors / len(subset), 4) if subset else 0.0,
+            "throughput_rps": round(len(subset) / elapsed, 3) if elapsed else 0.0,
+            "status_codes": statuses,
+            "latency": summarize_latencies([latency for _, latency, _, _ in subset]),
+        }
+
+    endpoints = sorted({name for name, _, _, _ in samples})
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "host": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "settings": settings,
+        "elapsed_s": round(elapsed, 3),
+        "overall": summarize(samples),
+        "endpoints": {name: summarize([s for s in samples if s[0] == name]) for name in endpoints},
+    }
+
+
+def main():
+    """
+    Run a load test and print or save the JSON report.
+    """
+    parser = argparse.ArgumentParser(description="Load-test the Aesthetic Lens application")
+    parser.add_argument("--url", type=str, help="Test a running server instead of starting one in-process")
+    parser.add_argument("--backbone", type=str, default="standin", choices=["standin", "mobilenet"],
+                        help="Model backbone for the in-process server (default: standin)")
+    parser.add_argument("--endpoints", type=str, default="upload,api",
+                        help="Comma-separated endpoints to drive: upload, api")
+    parser.add_argument("--concurrency", type=int, default=4, help="Number of concurrent clients")
+    parser.add_argument("--requests", type=int, default=200, help="Total number of requests")
+    parser.add_argument("--duration", type=float, help="Run for this many seconds instead of a request count")
+    parser.add_argument("--corpus", type=str, help="Directory of images to send (default: synthetic)")
+    parser.add_argument("--synthetic-count", type=int, default=16, help="Number of synthetic images")
+    parser.add_argument("--synthetic-size", type=str, default="1024x768", help="Synthetic image size, WxH")
+    parser.add_argument("--ready-timeout", type=float, default=300, help="Seconds to wait for the model")
+    parser.add_argument("--output", type=str, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    endpoints = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = [name for name in endpoints if name not in ENDPOINTS]
+    if unknown:
+        parser.error(f"Unknown endpoints: {', '.join(unknown)}")
+
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+        if not corpus:
+            parser.error(f"No images found in {args.corpus}")
+    else:
+        width, height = (int(v) for v in args.synthetic_size.lower().split("x"))
+        corpus = build_synthetic_corpus(args.synthetic_count, (width, height))
+
+    server = None
+    upload_dir = None
+    try:
+        if args.url:
+            base_url = args.url.rstrip("/")
+        else:
+            # Must be set before the application (and config) is imported
+            os.environ["MODEL_BACKBONE"] = args.backbone
+            upload_dir = tempfile.TemporaryDirectory(prefix="aesthetic_lens_load_")
+            logger.info(f"Starting in-process server with the {args.backbone} backbone...")
+            base_url, server = start_local_server(upload_dir.name, args.ready_timeout)
+
+        logger.info(f"Driving {base_url} with {args.concurrency} clients...")
+        samples, elapsed = run_load(
+            base_url, corpus, endpoints, args.concurrency,
+            total_requests=args.requests, duration=args.duration
+        )
+    finally:
+        if server is not None:
+            server.shutdown()
+        if upload_dir is not None:
+            upload_dir.cleanup()
+
+    settings = {
+        "url": args.url,
+        "backbone": None if args.url else args.backbone,
+        "endpoints": endpoints,
+        "concurrency": args.concurrency,
+        "requests": None if args.duration else args.requests,
+        "duration_s": args.duration,
+        "corpus": args.corpus or f"synthetic:{args.synthetic_count}@{args.synthetic_size}",
+        "corpus_images": len(corpus),
+    }
+    report = build_report(samples, elapsed, settings)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        logger.info(f"Report written to {args.output}")
+    else:
+        print(output)
+
+    if report["overall"]["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+Microbenchmarks for the preprocessing and inference hot paths.
+
+This script times `preprocess_image` across image sizes and formats,
+`NimaModel.predict` and `NimaModel.predict_batch` across batch sizes,
+`create_heatmap`, and `get_feedback_from_score` throughput. Results are
+written as JSON, and the `compare` command flags cases whose median time
+regressed beyond a threshold against a stored baseline.
+
+The model is built once per run with the offline stand-in backbone by
+default, so results are repeatable without TensorFlow Hub. With `--export`
+the inference cases run on an inference-only export (see model/export.py),
+so its latency can be compared against the Keras model.
+
+Usage:
+    python -m benchmarks.microbench run --output results.json
+    python -m benchmarks.microbench run --only predict --export /path/to/export --output export.json
+    python -m benchmarks.microbench compare baseline.json results.json --threshold 0.1
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import tempfile
+import datetime
+
+import numpy as np
+from PIL import Image
+
+from benchmarks.stats import summarize_latencies
+
+logger = logging.getLogger(__name__)
+
+# Image sizes (width, height) and formats for preprocessing benchmarks
+IMAGE_SIZES = [(640, 480), (1920, 1080), (4000, 3000)]
+IMAGE_FORMATS = ["JPEG", "PNG", "WEBP"]
+
+# Batch sizes for inference benchmarks
+BATCH_SIZES = [1, 4, 16, 32]
+
+
+def time_case(func, repeat, warmup=1):
+    """
+    Time repeated calls of a function.
+
+    Args:
+        func (callable): Zero-argument function to time
+        repeat (int): Number of timed calls
+        warmup (int): Number of untimed calls made first
+
+    Returns:
+        dict: Latency summary in milliseconds (see summarize_latencies)
+    """
+    for _ in range(warmup):
+        func()
+
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - start) * 1000.0)
+    return summarize_latencies(latencies)
+
+
+def write_sample_images(directory, seed=0):
+    """
+    Write a noisy gradient image for every size and format.
+
+    Args:
+        directory (str): Directory to write into
+        seed (int): Random seed
+
+    Returns:
+        dict: Mapping of (format, size) to file path
+    """
+    rng = np.random.RandomState(seed)
+    paths = {}
+
+    for width, height in IMAGE_SIZES:
+        gradient = np.linspace(0, 255, width)[np.newaxis, :, np.newaxis]
+        noise = rng.normal(0, 20, size=(height, width, 3))
+        img = Image.fromarray(np.clip(gradient + noise, 0, 255).astype(np.uint8))
+
+        for fmt in IMAGE_FORMATS:
+            path = os.path.join(directory, f"bench_{width}x{height}.{fmt.lower()}")
+            img.save(path, format=fmt)
+            paths[(fmt, (width, height))] = path
+
+    return paths
+
+
+def build_heatmap_model(input_shape):
+    """
+    Build a small convolutional classifier for the heatmap benchmark.
+
+    `create_heatmap` needs a named 4-D feature-map layer in the model graph,
+    which the NIMA model does not expose (its backbone is a single opaque
+    layer). This model has the NIMA input and output shapes and a named
+    convolution, so the Grad-CAM path itself can be timed.
+
+    Args:
+        input_shape (tuple): Image input shape
+
+    Returns:
+        tuple: (tf.keras.Model, name of the convolution layer)
+    """
+    import tensorflow as tf
+
+    seed = tf.keras.initializers.GlorotUniform(seed=0)
+    inputs = tf.keras.Input(shape=input_shape)
+    x = tf.keras.layers.AveragePooling2D(pool_size=4)(inputs)
+    x = tf.keras.layers.Conv2D(64, 3, activation="relu", kernel_initializer=seed, name="heatmap_conv")(x)
+    x = tf.keras.layers.GlobalAveragePooling2D()(x)
+    x = tf.keras.layers.Dense(10, activation="softmax", kernel_initializer=seed)(x)
+    return tf.keras.Model(inputs=inputs, outputs=x), "heatmap_conv"
+
+
+def run_benchmarks(backbone, repeat, only=None, export=None):
+    """
+    Run all benchmark groups.
+
+    Args:
+        backbone (str): Model backbone, "standin" or "mobilenet"
+        repeat (int): Timed repetitions per case
+        only (set): Benchmark groups to run; all groups if None
+        export (str): Time inference on this inference-only export instead
+
+    Returns:
+        dict: Mapping of case name to latency summary
+    """
+    # Must be set before config is imported
+    os.environ["MODEL_BACKBONE"] = backbone
+
+    from config import MODEL_SETTINGS
+    from model.nima_model import NimaModel
+    from model.utils import preprocess_image, get_feedback_from_score, create_heatmap
+
+    def enabled(group):
+        return only is None or group in only
+
+    results = {}
+
+    if enabled("preprocess"):
+        with tempfile.TemporaryDirectory(prefix="aesthetic_lens_bench_") as directory:
+            for (fmt, (width, height)), path in write_sample_images(directory).items():
+                name = f"preprocess_image[{fmt.lower()}-{width}x{height}]"
+                logger.info(f"Timing {name}")
+                results[name] = time_case(lambda: preprocess_image(path), repeat)
+
+    input_shape = tuple(MODEL_SETTINGS["input_shape"])
+    rng = np.random.RandomState(0)
+
+    if enabled("predict"):
+        # The heatmap case times its own conv model, so only predict needs this
+        if export:
+            from model.export import ServingModel
+
+            logger.info(f"Loading exported model from {export}...")
+            model = ServingModel(export)
+        else:
+            logger.info(f"Building NIMA model ({backbone} backbone)...")
+            model = NimaModel(backbone)
+
+        image = rng.rand(*input_shape).astype(np.float32)
+        logger.info("Timing predict[1]")
+        results["predict[1]"] = time_case(lambda: model.predict(image), repeat)
+
+        for batch_size in BATCH_SIZES:
+            batch = rng.rand(batch_size, *input_shape).astype(np.float32)
+            name = f"predict_batch[{batch_size}]"
+            logger.info(f"Timing {name}")
+            summary = time_case(lambda: model.predict_batch(batch), repeat)
+            summary["images_per_s"] = round(batch_size / (summary["p50_ms"] / 1000.0), 3)
+            results[name] = summary
+
+    if enabled("heatmap"):
+        heatmap_model, layer_name = build_heatmap_model(input_shape)
+        image = rng.rand(*input_shape).astype(np.float32)
+        logger.info("Timing create_heatmap")
+        results["create_heatmap"] = time_case(lambda: create_heatmap(heatmap_model, image, layer_name), repeat)
+
+    if enabled("feedback"):
+        scores = np.linspace(1.0, 10.0, 10000).tolist()
+
+        def feedback_sweep():
+            for score in scores:
+                get_feedback_from_score(score)
+
+        logger.info("Timing get_feedback_from_score")
+        summary = time_case(feedback_sweep, repeat)
+        summary["calls_per_s"] = round(len(scores) / (summary["p50_ms"] / 1000.0), 1)
+        results["get_feedback_from_score[x10000]"] = summary
+
+    return results
+
+
+def compare_results(baseline, current, threshold):
+    """
+    Compare median timings of two benchmark runs.
+
+    Args:
+        baseline (dict): Baseline report
+        current (dict): Current report
+        threshold (float): Relative slowdown that counts as a regression (0.1 = 10%)
+
+    Returns:
+        list: (case, baseline ms, current ms, relative change, status) rows
+    """
+    rows = []
+    base_cases = baseline["results"]
+    current_cases = current["results"]
+
+    for name in sorted(set(base_cases) | set(current_cases)):
+        if name not in base_cases or name not in current_cases:
+            rows.append((name, base_cases.get(name, {}).get("p50_ms"),
+                         current_cases.get(name, {}).get("p50_ms"), None, "missing"))
+            continue
+
+        base_ms = base_cases[name]["p50_ms"]
+        current_ms = current_cases[name]["p50_ms"]
+        change = (current_ms - base_ms) / base_ms if base_ms else 0.0
+
+        if change > threshold:
+            status = "REGRESSION"
+        elif change < -threshold:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append((name, base_ms, current_ms, change, status))
+
+    return rows
+
+
+def main():
+    """
+    Parse arguments and run or compare benchmarks.
+    """
+    parser = argparse.ArgumentParser(description="Microbenchmarks for Aesthetic Lens hot paths")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks")
+    run_parser.add_argument("--backbone", type=str, default="standin", choices=["standin", "mobilenet"],
+                            help="Model backbone (default: standin)")
+    run_parser.add_argument("--repeat", type=int, default=10, help="Timed repetitions per case")
+    run_parser.add_argument("--only", type=str, help="Comma-separated groups: preprocess, predict, heatmap, feedback")
+    run_parser.add_argument("--output", type=str, help="Write the JSON results to this file")
+    run_parser.add_argument("--export", type=str, help="Time inference on this inference-only export")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare results against a baseline")
+    compare_parser.add_argument("baseline", type=str, help="Baseline results JSON")
+    compare_parser.add_argument("current", type=str, help="Current results JSON")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="Relative median slowdown flagged as a regression (default: 0.1)")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    if args.command == "run":
+        only = {group.strip() for group in args.only.split(",")} if args.only else None
+        report = {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "host": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+            "settings": {"backbone": args.backbone, "repeat": args.repeat, "export": args.export},
+            "results": run_benchmarks(args.backbone, args.repeat, only, args.export),
+        }
+
+        output = json.dumps(report, indent=2)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(output + "\n")
+            logger.info(f"Results written to {args.output}")
+        else:
+            print(output)
+        return
+
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+    with open(args.current, "r") as f:
+        current = json.load(f)
+
+    rows = compare_results(baseline, current, args.threshold)
+    print(f"{'case':<40} {'baseline p50':>14} {'current p50':>14} {'change':>9}  status")
+    for name, base_ms, current_ms, change, status in rows:
+        base_text = f"{base_ms:.3f} ms" if base_ms is not None else "-"
+        current_text = f"{current_ms:.3f} ms" if current_ms is not None else "-"
+        change_text = f"{change:+.1%}" if change is not None else "-"
+        print(f"{name:<40} {base_text:>14} {current_text:>14} {change_text:>9}  {status}")
+
+    if any(status == "REGRESSION" for *_, status in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Cold-start profiler for the model stack.
+
+This script measures where a cold start spends its time and memory: importing
+TensorFlow, TensorFlow Hub and the model module, each phase of
+`NimaModel.__init__` (the backbone, which for MobileNet is split into
+resolving/downloading the TensorFlow Hub module and constructing its
+`hub.KerasLayer`; building the scoring head; the weights fingerprint) and the
+first (graph-tracing) and second predictions. With `--export` it profiles loading an inference-only
+export (see model/export.py) instead. Every run happens in a fresh Python
+interpreter, so nothing is already imported or cached in memory. Wall time
+and resident memory are recorded per phase; the median over runs is reported
+as JSON in the same shape as the microbenchmarks, so `compare` can flag
+cold-start regressions between releases.
+
+Usage:
+    python -m benchmarks.startup run --output startup.json [--runs 3] [--backbone mobilenet]
+    python -m benchmarks.startup run --export /path/to/export --output startup_export.json
+    python -m benchmarks.startup compare baseline.json startup.json --threshold 0.2
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import datetime
+import statistics
+import contextlib
+import subprocess
+
+from benchmarks.stats import summarize_latencies
+
+logger = logging.getLogger(__name__)
+
+# Project root, the working directory of the profiled interpreters
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def rss_mb():
+    """
+    Get the resident memory of this process.
+
+    Returns:
+        float: Current RSS in MiB on Linux; peak RSS elsewhere
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and KiB elsewhere
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class StartupProfiler:
+    """
+    Records wall time and memory growth of named phases.
+    """
+
+    def __init__(self):
+        self.phases = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Time a phase.
+
+        Args:
+            name (str): Phase name; repeated phases are summed
+        """
+        rss_before = rss_mb()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
+            entry = self.phases.setdefault(name, {"wall_ms": 0.0, "rss_delta_mb": 0.0})
+            entry["wall_ms"] += elapsed_ms
+            entry["rss_delta_mb"] += rss_mb() - rss_before
+            entry["rss_mb"] = rss_mb()
+
+
+def profile_startup(backbone, export=None):
+    """
+    Profile a cold start in this process. Must run in a fresh interpreter.
+
+    Args:
+        backbone (str): Model backbone, "standin" or "mobilenet"
+        export (str): Profile loading this inference-only export instead
+
+    Returns:
+        dict: Mapping of phase name to wall_ms, rss_delta_mb and rss_mb
+    """
+    # Must be set before config is imported
+    os.environ["MODEL_BACKBONE"] = backbone
+    profiler = StartupProfiler()
+
+    with profiler.phase("import_tensorflow"):
+        import tensorflow  # noqa: F401
+
+    if export:
+        # An export does not need TensorFlow Hub
+        with profiler.phase("import_model"):
+            import numpy as np
+            from config import MODEL_SETTINGS
+            from model.export import ServingModel
+        model = ServingModel(export, profiler=profiler)
+    else:
+        with profiler.phase("import_tensorflow_hub"):
+            import tensorflow_hub  # noqa: F401
+        with profiler.phase("import_model"):
+            import numpy as np
+            from config import MODEL_SETTINGS
+            from model.nima_model import NimaModel
+        model = NimaModel(backbone, profiler=profiler)
+
+    image = np.zeros((1,) + tuple(MODEL_SETTINGS["input_shape"]), dtype=np.float32)
+    with profiler.phase("first_predict"):
+        model.predict_batch(image)
+    with profiler.phase("second_predict"):
+        model.predict_batch(image)
+
+    return profiler.phases
+
+
+def run_profiles(backbone, runs, export=None):
+    """
+    Profile several cold starts, each in a new interpreter.
+
+    Args:
+        backbone (str): Model backbone
+        runs (int): Number of cold starts
+        export (str): Profile loading this inference-only export instead
+
+    Returns:
+        dict: Mapping of phase name to a latency summary of its wall time
+            plus the median "rss_delta_mb" and "rss_mb"; "total" covers the
+            whole start-up
+    """
+    samples = []
+    for run in range(runs):
+        logger.info(f"Cold start {run + 1} of {runs} ({export or backbone + ' backbone'})...")
+        command = [sys.executable, "-m", "benchmarks.startup", "profile", "--backbone", backbone]
+        if export:
+            command += ["--export", os.path.abspath(export)]
+        output = subprocess.run(
+            command, cwd=PROJECT_DIR, check=True, capture_output=True, text=True
+        ).stdout
+        # The report is the last line; TensorFlow may print before it
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    names = [name for name in samples[0]]
+    results = {}
+    for name in names:
+        entries = [sample[name] for sample in samples if name in sample]
+        summary = summarize_latencies([entry["wall_ms"] for entry in entries])
+        summary["rss_delta_mb"] = round(statistics.median(entry["rss_delta_mb"] for entry in entries), 1)
+        summary["rss_mb"] = round(statistics.median(entry["rss_mb"] for entry in entries), 1)
+        results[name] = summary
+
+    totals = [sum(entry["wall_ms"] for entry in sample.values()) for sample in samples]
+    results["total"] = summarize_latencies(totals)
+    results["total"]["rss_mb"] = round(statistics.median(max(e["rss_mb"] for e in s.values()) for s in samples), 1)
+    return results
+
+
+def format_results(results):
+    """
+    Format profile results as a table.
+
+    Args:
+        results (dict): Results from run_profiles
+
+    Returns:
+        str: One line per phase with median wall time and memory
+    """
+    lines = [f"{'phase':<24} {'p50':>11} {'RSS delta':>11} {'RSS':>10}"]
+    for name, summary in results.items():
+        delta = f"{summary['rss_delta_mb']:+.1f} MB" if "rss_delta_mb" in summary else ""
+        lines.append(f"{name:<24} {summary['p50_ms']:>8.1f} ms {delta:>11} {summary['rss_mb']:>7.1f} MB")
+    return "\n".join(lines)
+
+
+def main():
+    """
+    Parse arguments and run or compare start-up profiles.
+    """
+    parser = argparse.ArgumentParser(description="Cold-start profiler for the Aesthetic Lens model stack")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Profile cold starts")
+    run_parser.add_argument("--backbone", type=str, default="standin", choices=["standin", "mobilenet"],
+                            help="Model backbone (default: standin)")
+    run_parser.add_argument("--runs", type=int, default=3, help="Number of cold starts")
+    run_parser.add_argument("--output", type=str, help="Write the JSON report to this file")
+    run_parser.add_argument("--export", type=str, help="Profile loading this inference-only export instead")
+
+    # Used by `run` for each cold start; prints one JSON line
+    profile_parser = subparsers.add_parser("profile", help=argparse.SUPPRESS)
+    profile_parser.add_argument("--backbone", type=str, default="standin")
+    profile_parser.add_argument("--export", type=str)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare a report against a baseline")
+    compare_parser.add_argument("baseline", type=str, help="Baseline report JSON")
+    compare_parser.add_argument("current", type=str, help="Current report JSON")
+    compare_parser.add_argument("--threshold", type=float, default=0.2,
+                                help="Relative median slowdown flagged as a regression (default: 0.2)")
+
+    args = parser.parse_args()
+
+    if args.command == "profile":
+        print(json.dumps(profile_startup(args.backbone, args.export)))
+        return
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    if args.command == "run":
+        report = {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "host": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+            "settings": {"backbone": args.backbone, "runs": args.runs, "export": args.export},
+            "results": run_profiles(args.backbone, args.runs, args.export),
+        }
+
+        print(format_results(report["results"]))
+
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(json.dumps(report, indent=2) + "\n")
+            logger.info(f"Report written to {args.output}")
+        return
+
+    # Imported here so profiled interpreters do not load numpy up front
+    from benchmarks.microbench import compare_results
+
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+    with open(args.current, "r") as f:
+        current = json.load(f)
+
+    rows = compare_results(baseline, current, args.threshold)
+    print(f"{'phase':<24} {'baseline p50':>14} {'current p50':>14} {'change':>9}  status")
+    for name, base_ms, current_ms, change, status in rows:
+        base_text = f"{base_ms:.1f} ms" if base_ms is not None else "-"
+        current_text = f"{current_ms:.1f} ms" if current_ms is not None else "-"
+        change_text = f"{change:+.1%}" if change is not None else "-"
+        print(f"{name:<24} {base_text:>14} {current_text:>14} {change_text:>9}  {status}")
+
+    if any(status == "REGRESSION" for *_, status in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Latency statistics helpers for the benchmarking tools.
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import math
+
+# Percentiles reported for every latency series
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(sorted_values, pct):
+    """
+    Compute a percentile with the nearest-rank method.
+
+    Args:
+        sorted_values (list): Values sorted in ascending order
+        pct (float): Percentile in [0, 100]
+
+    Returns:
+        float: The percentile value, or None for an empty list
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, int(math.ceil(pct / 100.0 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+def summarize_latencies(latencies_ms):
+    """
+    Summarize a series of latencies.
+
+    Args:
+        latencies_ms (list): Latencies in milliseconds
+
+    Returns:
+        dict: Count, mean, min, max and percentiles, rounded to 3 decimals
+    """
+    values = sorted(latencies_ms)
+    if not values:
+        return {"count": 0}
+
+    summary = {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values), 3),
+        "min_ms": round(values[0], 3),
+        "max_ms": round(values[-1], 3),
+    }
+    for pct in PERCENTILES:
+        summary[f"p{pct}_ms"] = round(percentile(values, pct), 3)
+    return summary
@@ -0,0 +1,334 @@
+"""
+Cascaded scoring: low-resolution screening with full-resolution escalation.
+
+For bulk triage most images are clearly above or below the score boundaries
+the triage decides on, and a cheaper model places them correctly. This
+module scores every image first with a screening model that runs at a
+smaller input size (160 px by default, with the MobileNet trained at that
+size and a head trained on its features by `train_head.py --input-size`).
+Only images whose screening score lies within a margin of a threshold, or
+whose predicted score distribution is spread out (a high standard deviation
+means the model is unsure), are rescored by the full 224 px model. Each
+image is decoded once and resized for both models by the decoding threads,
+so escalation costs no second decode.
+
+A run reports the speedup over scoring everything with the full model and
+the agreement rate: the share of images the cascade places on the same side
+of every threshold as the full model. Both are measured on audit batches,
+which are also scored entirely by the full model; `--evaluate` audits every
+batch.
+
+Usage:
+    python cascade.py /path/to/images results.jsonl [--input-size 160] [--threshold 5] [--margin 0.5]
+    python cascade.py /path/to/images results.csv --threshold 4 --threshold 7 --evaluate
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import os
+import math
+import time
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Import configuration settings
+from config import CASCADE_SETTINGS, MODEL_SETTINGS, TRAIN_SETTINGS
+from batch_score import find_images, open_writer
+
+logger = logging.getLogger(__name__)
+
+# Score represented by each entry of a predicted distribution
+SCORE_VALUES = np.arange(1, 11, dtype=np.float32)
+
+
+def distribution_stats(distributions):
+    """
+    Reduce predicted score distributions to their mean and standard deviation.
+
+    Args:
+        distributions (numpy.ndarray): Probabilities of shape (n, 10)
+
+    Returns:
+        tuple: (means, standard deviations), float arrays of shape (n,)
+    """
+    means = distributions @ SCORE_VALUES
+    variances = distributions @ SCORE_VALUES ** 2 - means ** 2
+    return means, np.sqrt(np.maximum(variances, 0.0))
+
+
+class CascadeScorer:
+    """
+    Scores batches with a screening model, escalating uncertain images to the full model.
+    """
+
+    def __init__(self, fast_model, full_model, thresholds=None, margin=None, max_std=None, audit_fraction=None):
+        """
+        Initialize the cascade.
+
+        Args:
+            fast_model: Screening model with `version` and `predict_distribution(images)`
+            full_model: Full-resolution model with the same interface
+            thresholds (tuple): Score boundaries of the triage (default from config)
+            margin (float): Screening scores this close to a threshold are escalated
+            max_std (float): Screening distributions with a larger standard
+                deviation are escalated
+            audit_fraction (float): Share of batches also scored entirely by
+                the full model, to measure agreement and speedup
+        """
+        self.fast_model = fast_model
+        self.full_model = full_model
+        self.thresholds = np.array(sorted(thresholds or CASCADE_SETTINGS["thresholds"]), dtype=np.float32)
+        self.margin = CASCADE_SETTINGS["margin"] if margin is None else margin
+        self.max_std = CASCADE_SETTINGS["max_std"] if max_std is None else max_std
+        self.audit_fraction = CASCADE_SETTINGS["audit_fraction"] if audit_fraction is None else audit_fraction
+        self.stats = {"batches": 0, "images": 0, "escalated": 0, "audited": 0, "agreed": 0,
+                      "abs_difference": 0.0, "fast_seconds": 0.0, "escalated_seconds": 0.0, "audit_seconds": 0.0}
+
+    def bands(self, scores):
+        """
+        Place scores between the thresholds.
+
+        Args:
+            scores (numpy.ndarray): Mean scores
+
+        Returns:
+            numpy.ndarray: Number of thresholds at or below each score
+        """
+        return np.searchsorted(self.thresholds, scores, side="right")
+
+    def needs_escalation(self, scores, stds):
+        """
+        Decide which screening results are too uncertain to keep.
+
+        Args:
+            scores (numpy.ndarray): Screening mean scores
+            stds (numpy.ndarray): Standard deviations of the screening distributions
+
+        Returns:
+            numpy.ndarray: Boolean mask of the images to rescore at full resolution
+        """
+        distance = np.min(np.abs(scores[:, None] - self.thresholds[None, :]), axis=1)
+        return (distance < self.margin) | (stds > self.max_std)
+
+    def score(self, images, screening_images=None):
+        """
+        Score a batch through the cascade.
+
+        Args:
+            images (numpy.ndarray): Batch preprocessed for the full model
+            screening_images (numpy.ndarray): The same batch at the screening
+                model's input size; resized in its graph if None
+
+        Returns:
+            list: One dict per image with "score", "std", "stage" ("fast" or
+                "full") and "model_version"
+        """
+        start = time.perf_counter()
+        screening_images = images if screening_images is None else screening_images
+        scores, stds = distribution_stats(self.fast_model.predict_distribution(screening_images))
+        self.stats["fast_seconds"] += time.perf_counter() - start
+        stages = np.full(len(images), "fast", dtype=object)
+
+        escalated = self.needs_escalation(scores, stds)
+        if escalated.any():
+            start = time.perf_counter()
+            full_distributions = self.full_model.predict_distribution(images[escalated])
+            self.stats["escalated_seconds"] += time.perf_counter() - start
+            scores[escalated], stds[escalated] = distribution_stats(full_distributions)
+            stages[escalated] = "full"
+
+        # Batches are audited at an even spacing, starting with the first
+        batch = self.stats["batches"]
+        if math.ceil(batch * self.audit_fraction) < math.ceil((batch + 1) * self.audit_fraction):
+            self._audit(images, scores)
+
+        self.stats["batches"] += 1
+        self.stats["images"] += len(images)
+        self.stats["escalated"] += int(escalated.sum())
+
+        versions = {"fast": self.fast_model.version, "full": self.full_model.version}
+        return [{"score": round(float(score), 2), "std": round(float(std), 2), "stage": stage,
+                 "model_version": versions[stage]} for score, std, stage in zip(scores, stds, stages)]
+
+    def _audit(self, images, scores):
+        """
+        Score a whole batch with the full model and compare with the cascade.
+
+        Args:
+            images (numpy.ndarray): Batch preprocessed for the full model
+            scores (numpy.ndarray): Cascade scores of the batch
+        """
+        start = time.perf_counter()
+        full_scores, _ = distribution_stats(self.full_model.predict_distribution(images))
+        self.stats["audit_seconds"] += time.perf_counter() - start
+        self.stats["audited"] += len(images)
+        self.stats["agreed"] += int(np.sum(self.bands(scores) == self.bands(full_scores)))
+        self.stats["abs_difference"] += float(np.sum(np.abs(scores - full_scores)))
+
+    def summary(self):
+        """
+        Summarize the batches scored so far.
+
+        Returns:
+            dict: "images", "escalated", "escalation_rate", "audited",
+                "agreement" (share of audited images in the same band as the
+                full model), "mean_abs_difference", "cascade_seconds"
+                (screening and escalation), "full_seconds" (estimated time of
+                the full model on every image) and "speedup"; figures that
+                need an audit are None without one
+        """
+        stats = self.stats
+        audited = stats["audited"]
+        cascade_seconds = stats["fast_seconds"] + stats["escalated_seconds"]
+        full_seconds = stats["audit_seconds"] / audited * stats["images"] if audited else None
+        return {
+            "images": stats["images"],
+            "escalated": stats["escalated"],
+            "escalation_rate": stats["escalated"] / stats["images"] if stats["images"] else 0.0,
+            "audited": audited,
+            "agreement": stats["agreed"] / audited if audited else None,
+            "mean_abs_difference": stats["abs_difference"] / audited if audited else None,
+            "cascade_seconds": cascade_seconds,
+            "full_seconds": full_seconds,
+            "speedup": full_seconds / cascade_seconds if audited and cascade_seconds > 0 else None,
+        }
+
+
+def _load(path, sizes):
+    """
+    Preprocess an image for both models.
+
+    Args:
+        path (str): Path to the image file
+        sizes (list): Input sizes (height, width) of the full and screening models
+
+    Returns:
+        tuple: (list of preprocessed images, None), or (None, error message)
+    """
+    # Imported here so the command line parses without loading TensorFlow
+    from model.utils import preprocess_image_sizes
+
+    try:
+        return preprocess_image_sizes(path, sizes), None
+    except Exception as e:
+        return None, str(e)
+
+
+def cascade_directory(scorer, root, output, fmt=None, batch_size=None, decode_workers=None):
+    """
+    Score every image under a directory that is not already in the output.
+
+    Args:
+        scorer (CascadeScorer): Cascade to score with
+        root (str): Directory to walk
+        output (str): Output path; each record's model_version names the
+            model that produced its score
+        fmt (str): Output format; inferred from the output extension if None
+        batch_size (int): Images per model call (default from config)
+        decode_workers (int): Image decoding threads (default from config)
+
+    Returns:
+        dict: Counts of images "found", "skipped", "scored" and "failed"
+    """
+    batch_size = batch_size or CASCADE_SETTINGS["batch_size"]
+    decode_workers = decode_workers or TRAIN_SETTINGS["decode_workers"]
+    sizes = [tuple(scorer.full_model.input_shape[:2]), tuple(scorer.fast_model.input_shape[:2])]
+
+    writer = open_writer(output, fmt)
+    paths = find_images(root)
+    done = writer.completed()
+    todo = [path for path in paths if path not in done]
+    summary = {"found": len(paths), "skipped": len(paths) - len(todo), "scored": 0, "failed": 0}
+    logger.info(f"Found {len(paths)} images, {summary['skipped']} already scored, {len(todo)} to go")
+
+    try:
+        with ThreadPoolExecutor(max_workers=decode_workers, thread_name_prefix="cascade") as pool:
+            for offset in range(0, len(todo), batch_size):
+                batch = todo[offset:offset + batch_size]
+                loaded = list(pool.map(lambda path: _load(os.path.join(root, path), sizes), batch))
+
+                records = [{"path": path, "score": None, "model_version": None, "error": error}
+                           for path, (_, error) in zip(batch, loaded)]
+                readable = [index for index, (image, _) in enumerate(loaded) if image is not None]
+                if readable:
+                    results = scorer.score(np.stack([loaded[index][0][0] for index in readable]),
+                                           np.stack([loaded[index][0][1] for index in readable]))
+                    for index, result in zip(readable, results):
+                        records[index]["score"] = result["score"]
+                        records[index]["model_version"] = result["model_version"]
+
+                writer.write(records)
+                summary["scored"] += len(readable)
+                summary["failed"] += len(batch) - len(readable)
+    finally:
+        writer.close()
+
+    return summary
+
+
+def main():
+    """
+    Command-line entry point for cascaded scoring.
+    """
+    parser = argparse.ArgumentParser(description="Score images with low-resolution screening "
+                                                 "and full-resolution escalation")
+    parser.add_argument("root", type=str, help="Directory of images (searched recursively)")
+    parser.add_argument("output", type=str, help="Output .jsonl or .csv file, or .parquet directory")
+    parser.add_argument("--format", type=str, choices=("jsonl", "csv", "parquet"), help="Output format")
+    parser.add_argument("--input-size", type=int, default=CASCADE_SETTINGS["input_size"],
+                        help="Input size of the screening model in pixels")
+    parser.add_argument("--head-weights", type=str, default=CASCADE_SETTINGS["head_weights"],
+                        help="Head weights trained for the screening model")
+    parser.add_argument("--threshold", type=float, action="append", dest="thresholds",
+                        help="Score boundary of the triage (repeat for several; default from config)")
+    parser.add_argument("--margin", type=float, default=CASCADE_SETTINGS["margin"],
+                        help="Escalate screening scores this close to a threshold")
+    parser.add_argument("--max-std", type=float, default=CASCADE_SETTINGS["max_std"],
+                        help="Escalate screening distributions with a larger standard deviation")
+    parser.add_argument("--audit-fraction", type=float, default=CASCADE_SETTINGS["audit_fraction"],
+                        help="Share of batches also scored by the full model to measure agreement")
+    parser.add_argument("--evaluate", action="store_true", help="Audit every batch (exact agreement and speedup)")
+    parser.add_argument("--batch-size", type=int, default=CASCADE_SETTINGS["batch_size"], help="Images per model call")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    if args.input_size >= MODEL_SETTINGS["input_shape"][0]:
+        parser.error(f"--input-size must be smaller than the full model's {MODEL_SETTINGS['input_shape'][0]} px")
+
+    from model.nima_model import NimaModel
+
+    head_weights = args.head_weights if os.path.exists(args.head_weights or "") else None
+    fast_model = NimaModel(head_weights=head_weights, input_size=args.input_size)
+    if head_weights is None:
+        logger.warning(f"No head weights for {args.input_size}px inputs at {args.head_weights}; screening "
+                       f"scores will disagree with the full model (train them with train_head.py --input-size)")
+    full_model = NimaModel()
+    for model in (fast_model, full_model):
+        model.warm_up(args.batch_size)
+
+    scorer = CascadeScorer(fast_model, full_model, thresholds=args.thresholds, margin=args.margin,
+                           max_std=args.max_std, audit_fraction=1.0 if args.evaluate else args.audit_fraction)
+    counts = cascade_directory(scorer, args.root, args.output, args.format, batch_size=args.batch_size)
+    summary = scorer.summary()
+
+    print(f"Scored {counts['scored']} images ({counts['failed']} unreadable, "
+          f"{counts['skipped']} already in {args.output})")
+    print(f"Escalated {summary['escalated']} of {summary['images']} images "
+          f"({summary['escalation_rate']:.1%}) to the full model")
+    if summary["audited"]:
+        print(f"Agreement with the full model: {summary['agreement']:.1%} of {summary['audited']} audited images "
+              f"(mean score difference {summary['mean_abs_difference']:.2f})")
+        print(f"Model time {summary['cascade_seconds']:.1f}s vs {summary['full_seconds']:.1f}s estimated "
+              f"for the full model alone ({summary['speedup']:.2f}x)")
+    else:
+        print("No batch was audited; run with --evaluate to measure agreement and speedup")
+
+
+if __name__ == "__main__":
+    main()
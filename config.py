@@ -19,6 +19,88 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 UPLOAD_FOLDER = os.path.join(BASE_DIR, "uploads")
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg"}
 MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max upload size
+RAW_MAX_FRAMES = 64  # Maximum frames per /api/score/raw request
+BATCH_MAX_FILES = 32  # Maximum files per /api/score/batch request
+
+# Example gallery configuration
+EXAMPLES_DIR = os.path.join(BASE_DIR, "static", "images", "examples")
+EXAMPLES_METADATA_FILE = os.path.join(EXAMPLES_DIR, "examples_metadata.json")  # Legacy, migrated on startup
+EXAMPLE_CATEGORIES = ("low", "average", "high", "excellent")
+EXAMPLES_PAGE_SIZE = 24  # Examples per gallery page and default /api/examples limit
+EXAMPLES_PAGE_MAX = 100  # Maximum /api/examples limit
+
+# Local application data (SQLite databases, indexes)
+DATA_DIR = os.environ.get("DATA_DIR", os.path.join(BASE_DIR, "data"))
+EXAMPLES_DB = os.path.join(DATA_DIR, "examples.db")
+
+# Distribution of produced scores, for "better than X% of images"
+SCORES_DB = os.path.join(DATA_DIR, "scores.db")
+SCORE_HISTOGRAM_SETTINGS = {
+    # Seconds between merges of a worker's counts into the shared database
+    "flush_interval": float(os.environ.get("SCORE_HISTOGRAM_FLUSH_INTERVAL", 5.0)),
+    # Percentiles are reported only once this many scores have been seen
+    "min_samples": 50,
+}
+
+# Largest Hamming distance between 64-bit perceptual hashes for two images
+# to count as near-duplicates (re-encoded or resized copies are typically < 4)
+DUPLICATE_MAX_DISTANCE = 6
+
+# Nearest-neighbour index of example embeddings for "similar examples"
+SIMILARITY_INDEX_FILE = os.path.join(DATA_DIR, "similarity_index.npz")
+SIMILAR_EXAMPLES_COUNT = 4  # Similar examples shown on the result page
+
+# Re-scoring of the examples library after a model change (rescore.py)
+RESCORE_SETTINGS = {
+    # Images per model call
+    "batch_size": 32,
+    # Threads decoding and resizing the next batch while the model runs
+    "decode_workers": 4,
+}
+
+# Headless batch scoring of image folders (batch_score.py)
+BATCH_SCORE_SETTINGS = {
+    # Worker processes, each holding its own model
+    "workers": int(os.environ.get("BATCH_SCORE_WORKERS", max(1, (os.cpu_count() or 2) // 2))),
+    # Images per model call
+    "batch_size": 32,
+    # Rows per Parquet part file
+    "parquet_rows_per_part": 1000,
+}
+
+# Batch scoring shared by several machines through a job directory (distributed_score.py)
+DISTRIBUTED_SETTINGS = {
+    # Images per work unit, the granularity of claiming and reclaiming work
+    "unit_size": 500,
+    # A lease not renewed for this long belongs to a dead node and is reclaimed
+    "lease_seconds": float(os.environ.get("DISTRIBUTED_LEASE_SECONDS", 120.0)),
+    # Seconds between checks for reclaimable units once none are free
+    "poll_interval": 10.0,
+}
+
+# Watch-folder scoring daemon (watch_folder.py)
+WATCH_STORE = os.path.join(DATA_DIR, "watch_scores.db")
+WATCH_SETTINGS = {
+    # Seconds between directory scans (filesystem events, when available,
+    # trigger a scan sooner)
+    "poll_interval": float(os.environ.get("WATCH_POLL_INTERVAL", 5.0)),
+    # A file is scored once its size and mtime have not changed for this long
+    "settle_seconds": 2.0,
+    # Images per model call
+    "batch_size": 32,
+}
+
+# Resized image derivatives, cached on disk by content hash
+DERIVATIVES_DIR = os.path.join(DATA_DIR, "derivatives")
+DERIVATIVE_SETTINGS = {
+    # Widths (pixels) of the generated variants; other widths are rejected
+    "widths": (320, 640, 1280),
+    # Encoder quality for WebP and JPEG variants
+    "quality": 80,
+    # Cache-Control max-age (seconds) for variant URLs that carry the source's
+    # content version (?v=...); replacing an image changes its URLs
+    "max_age": 365 * 24 * 3600,
+}
 
 # Flask application configuration
 SECRET_KEY = os.environ.get("SECRET_KEY", str(uuid.uuid4()))
@@ -29,6 +111,77 @@ PORT = int(os.environ.get("PORT", 5000))
 MODEL_SETTINGS = {
     "input_shape": (224, 224, 3),
     "mobilenet_url": "https://tfhub.dev/google/tf2-preview/mobilenet_v2/feature_vector/4",
+    # MobileNet V2 trained at smaller input sizes, for low-resolution models
+    "mobilenet_low_res_urls": {
+        128: "https://tfhub.dev/google/imagenet/mobilenet_v2_100_128/feature_vector/4",
+        160: "https://tfhub.dev/google/imagenet/mobilenet_v2_100_160/feature_vector/4",
+        192: "https://tfhub.dev/google/imagenet/mobilenet_v2_100_192/feature_vector/4",
+    },
+    # "mobilenet" (TensorFlow Hub) or "standin" (offline, deterministic; for load tests)
+    "backbone": os.environ.get("MODEL_BACKBONE", "mobilenet"),
+    # Trained scoring head loaded at startup if present (see train_head.py)
+    "head_weights": os.environ.get("MODEL_HEAD_WEIGHTS", os.path.join(DATA_DIR, "nima_head.npz")),
+    # Inference-only export (python -m model.export) served instead of
+    # building the model, unless a registry version is active
+    "serving_export": os.environ.get("MODEL_SERVING_EXPORT"),
+}
+
+# Versioned scoring heads, hot-swapped by the app when CURRENT changes (model/registry.py)
+MODEL_REGISTRY_DIR = os.path.join(DATA_DIR, "models")
+MODEL_REGISTRY_SETTINGS = {
+    # Seconds between checks of the active version
+    "poll_interval": float(os.environ.get("MODEL_REGISTRY_POLL_INTERVAL", 5.0)),
+}
+
+# Head-only training on cached backbone features (train_head.py)
+FEATURES_DIR = os.path.join(DATA_DIR, "features")
+TRAIN_SETTINGS = {
+    # Images per backbone call while extracting features
+    "extract_batch_size": 32,
+    # Image decoding threads while extracting features
+    "decode_workers": 4,
+    # Feature vectors per training step
+    "batch_size": 256,
+    "epochs": 30,
+    "learning_rate": 1e-3,
+    # Share of the labelled images held out to measure the head
+    "validation_fraction": 0.1,
+    # Epochs without validation improvement before training stops
+    "patience": 5,
+    # Spread of the score distribution built from a single mean score
+    "label_sigma": 1.0,
+}
+
+# Cascaded scoring: low-resolution screening, full-resolution escalation (cascade.py)
+CASCADE_SETTINGS = {
+    # Input size (pixels) of the screening model; a key of "mobilenet_low_res_urls"
+    "input_size": 160,
+    # Head trained on the screening model's features (train_head.py --input-size)
+    "head_weights": os.environ.get("CASCADE_HEAD_WEIGHTS", os.path.join(DATA_DIR, "nima_head_160.npz")),
+    # Score boundaries the triage decides on (e.g. keep at 5 and above)
+    "thresholds": (5.0,),
+    # Screening scores closer than this to a threshold are rescored at full resolution
+    "margin": 0.5,
+    # Screening distributions with a larger standard deviation are rescored too
+    "max_std": 2.0,
+    # Share of the screened-only images also scored at full resolution to
+    # measure the agreement rate
+    "audit_fraction": 0.05,
+    # Images per model call
+    "batch_size": 32,
+}
+
+# Readiness configuration
+READINESS_SETTINGS = {
+    # Number of dummy images run through the model before serving traffic
+    "warmup_batch_size": int(os.environ.get("WARMUP_BATCH_SIZE", 4)),
+    # Workers whose smoothed inference latency exceeds this are not ready
+    "max_latency_ms": float(os.environ.get("READY_MAX_LATENCY_MS", 2000)),
+    # Smoothing factor for the inference latency moving average
+    "latency_ewma_alpha": 0.2,
+    # Minimum seconds between latency re-measurements while a worker is too
+    # slow to be ready (readiness probes answer from the last measurement)
+    "remeasure_interval": float(os.environ.get("READY_REMEASURE_INTERVAL", 10.0)),
 }
 
 # Logging configuration
@@ -36,6 +189,26 @@ LOG_FILE = os.path.join(BASE_DIR, "aesthetic_lens.log")
 LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
 LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
 
+# Maximum number of records buffered for the background log writer.
+# Records beyond this are dropped rather than blocking a request.
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", 10000))
+
+# Sampling rates (0.0-1.0) for per-request and per-image log events.
+# Events not listed here are always logged.
+LOG_SAMPLING_RATES = {
+    "upload.request": 0.01,
+    "upload.saved": 0.1,
+    "upload.scored": 1.0,
+    "api.saved": 0.1,
+    "api.scored": 1.0,
+    "result.scored": 0.1,
+    "image.loading": 0.01,
+    "image.preprocessed": 0.01,
+    "model.prediction": 0.01,
+}
+
 # Create necessary directories if they don't exist
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
+if not os.path.exists(DATA_DIR):
+    os.makedirs(DATA_DIR)
@@ -34,9 +34,19 @@ def main():
     try:
         # Parse command-line arguments
         parser = argparse.ArgumentParser(description="Demo the NIMA model with a sample image")
-        parser.add_argument("--image", type=str, required=True, help="Path to the image file")
+        parser.add_argument("--image", type=str, help="Path to the image file")
+        parser.add_argument("--profile-startup", action="store_true",
+                            help="Profile a cold start of the model instead (see benchmarks/startup.py)")
         args = parser.parse_args()
         
+        if args.profile_startup:
+            from benchmarks.startup import run_profiles, format_results
+            print(format_results(run_profiles(MODEL_SETTINGS["backbone"], runs=1)))
+            return
+        
+        if not args.image:
+            parser.error("--image is required")
+        
         # Check if the image file exists
         if not os.path.exists(args.image):
             logger.error(f"Image file not found: {args.image}")
@@ -0,0 +1,226 @@
+"""
+On-disk cache of resized image derivatives.
+
+This module creates resized WebP and JPEG variants of uploads and example
+images at a few fixed widths. Variants are stored under the content hash of
+the source image, so identical images share their variants and a replaced
+file never serves stale ones. Each variant has a strong ETag derived from
+the same hash.
+
+Usage:
+    python derivatives.py pregenerate [--dir static/images/examples]
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import os
+import hashlib
+import logging
+import argparse
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps
+
+# Import configuration settings
+from config import DERIVATIVES_DIR, DERIVATIVE_SETTINGS, EXAMPLES_DIR
+
+logger = logging.getLogger(__name__)
+
+# Output formats: name -> (PIL format, file extension, MIME type)
+FORMATS = {
+    "webp": ("WEBP", "webp", "image/webp"),
+    "jpeg": ("JPEG", "jpg", "image/jpeg"),
+}
+
+# Number of source file hashes remembered between requests
+HASH_CACHE_SIZE = 4096
+
+
+class DerivativeCache:
+    """
+    Generates and caches resized variants of source images.
+
+    Source hashes are memoized by (path, size, mtime), so serving a cached
+    variant costs one stat of the source and one of the variant.
+    """
+
+    def __init__(self, cache_dir=DERIVATIVES_DIR, widths=None, quality=None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir (str): Directory holding the variants
+            widths (tuple): Allowed variant widths (default from config)
+            quality (int): Encoder quality (default from config)
+        """
+        self.cache_dir = cache_dir
+        self.widths = tuple(widths or DERIVATIVE_SETTINGS["widths"])
+        self.quality = quality or DERIVATIVE_SETTINGS["quality"]
+        self._hashes = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def content_hash(self, source_path):
+        """
+        Get the SHA-256 hash of a source file's content.
+
+        Args:
+            source_path (str): Path to the source image
+
+        Returns:
+            str: Hex digest
+
+        Raises:
+            FileNotFoundError: If the source does not exist
+        """
+        stat = os.stat(source_path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            cached = self._hashes.get(source_path)
+            if cached is not None and cached[0] == signature:
+                self._hashes.move_to_end(source_path)
+                return cached[1]
+
+        digest = hashlib.sha256()
+        with open(source_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()
+
+        with self._lock:
+            self._hashes[source_path] = (signature, content_hash)
+            self._hashes.move_to_end(source_path)
+            while len(self._hashes) > HASH_CACHE_SIZE:
+                self._hashes.popitem(last=False)
+        return content_hash
+
+    def get(self, source_path, width, fmt="webp"):
+        """
+        Get a variant of a source image, generating it if needed.
+
+        Args:
+            source_path (str): Path to the source image
+            width (int): Variant width; one of the allowed widths
+            fmt (str): "webp" or "jpeg"
+
+        Returns:
+            tuple: (path to the variant file, ETag value, MIME type)
+
+        Raises:
+            ValueError: If the width or format is not allowed
+            FileNotFoundError: If the source does not exist
+        """
+        if width not in self.widths:
+            raise ValueError(f"Unsupported width: {width}")
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}")
+
+        content_hash = self.content_hash(source_path)
+        pil_format, extension, mimetype = FORMATS[fmt]
+        path = os.path.join(self.cache_dir, content_hash[:2], f"{content_hash}_{width}.{extension}")
+
+        if not os.path.exists(path):
+            self._generate(source_path, path, width, pil_format)
+
+        return path, f"{content_hash[:32]}-{width}-{fmt}", mimetype
+
+    def pregenerate(self, source_path):
+        """
+        Generate every variant of a source image.
+
+        Args:
+            source_path (str): Path to the source image
+
+        Returns:
+            int: Number of variants available
+        """
+        count = 0
+        for width in self.widths:
+            for fmt in FORMATS:
+                self.get(source_path, width, fmt)
+                count += 1
+        return count
+
+    def pregenerate_async(self, source_path):
+        """
+        Generate every variant of a source image on a background thread.
+
+        Errors are logged rather than raised, since the variants will
+        otherwise be generated on first request.
+
+        Args:
+            source_path (str): Path to the source image
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="derivatives")
+
+        def run():
+            try:
+                self.pregenerate(source_path)
+            except Exception as e:
+                logger.warning(f"Could not pre-generate variants of {source_path}: {str(e)}")
+
+        self._executor.submit(run)
+
+    def _generate(self, source_path, path, width, pil_format):
+        """
+        Resize a source image and write the variant atomically.
+
+        Args:
+            source_path (str): Path to the source image
+            path (str): Destination path
+            width (int): Target width; smaller images are not upscaled
+            pil_format (str): PIL output format
+        """
+        with Image.open(source_path) as img:
+            # Let the JPEG decoder downscale by a power of two while decoding
+            img.draft("RGB", (width, width))
+            img = ImageOps.exif_transpose(img).convert("RGB")
+            if img.width > width:
+                height = max(1, round(img.height * width / img.width))
+                img = img.resize((width, height), Image.LANCZOS)
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    img.save(f, format=pil_format, quality=self.quality)
+                os.replace(temp_path, path)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+
+        logger.debug(f"Generated {width}px {pil_format} variant of {source_path}")
+
+
+def main():
+    """
+    Command-line entry point for pre-generating variants.
+    """
+    parser = argparse.ArgumentParser(description="Manage the image derivative cache")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    pregenerate_parser = subparsers.add_parser("pregenerate", help="Generate variants for every image in a directory")
+    pregenerate_parser.add_argument("--dir", type=str, default=EXAMPLES_DIR, help="Directory of source images")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    if args.command == "pregenerate":
+        cache = DerivativeCache()
+        count = 0
+        for filename in sorted(os.listdir(args.dir)):
+            if filename.lower().endswith((".jpg", ".jpeg", ".png")):
+                count += cache.pregenerate(os.path.join(args.dir, filename))
+        print(f"{count} variants available in {cache.cache_dir}")
+
+
+if __name__ == "__main__":
+    main()
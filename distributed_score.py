@@ -0,0 +1,547 @@
+"""
+Batch scoring shared by several machines.
+
+This module spreads the scoring of a large image archive over any number of
+nodes that mount the same filesystem, without a coordinator or database.
+`init` writes a job directory holding a manifest of every image path, split
+into fixed-size work units. Each node then claims units by creating lease
+files with an exclusive create, renews its leases from a heartbeat thread
+while it scores, and writes every finished unit's results as a file of its
+own. A lease that has not been renewed for `lease_seconds` belongs to a dead
+node, and another node reclaims the unit. Since finished units are skipped
+and their results are replaced atomically, a unit scored twice does no harm.
+`merge` combines the unit results into one output file in manifest order.
+
+Usage:
+    python distributed_score.py init /shared/job /shared/archive [--unit-size 500]
+    python distributed_score.py work /shared/job [--workers 4] [--root /mnt/archive]   # on every node
+    python distributed_score.py status /shared/job
+    python distributed_score.py merge /shared/job results.parquet
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import logging
+import argparse
+import tempfile
+import threading
+import multiprocessing
+
+# Import configuration settings
+from config import BATCH_SCORE_SETTINGS, DISTRIBUTED_SETTINGS, MODEL_SETTINGS
+import batch_score
+from batch_score import find_images, open_writer, score_batch
+
+logger = logging.getLogger(__name__)
+
+
+def _write_atomic(path, text):
+    """
+    Replace a file with new contents in one step.
+
+    Args:
+        path (str): File to write
+        text (str): New contents
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class ScoringJob:
+    """
+    A scoring job in a directory on a shared filesystem.
+
+    Layout of the job directory:
+        manifest.json          root, unit size and every image path
+        leases/unit-NNNNN      lease of the node scoring a unit; its mtime is the heartbeat
+        results/unit-NNNNN.jsonl   records of a finished unit
+        clock/NODE             touched to read the shared filesystem's clock
+    """
+
+    def __init__(self, job_dir, lease_seconds=None):
+        """
+        Open an existing job.
+
+        Args:
+            job_dir (str): Job directory created by ScoringJob.create
+            lease_seconds (float): Age after which a lease is reclaimed (default from config)
+
+        Raises:
+            FileNotFoundError: If the job has no manifest
+        """
+        self.job_dir = job_dir
+        self.lease_seconds = lease_seconds or DISTRIBUTED_SETTINGS["lease_seconds"]
+
+        with open(os.path.join(job_dir, "manifest.json"), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.root = manifest["root"]
+        self.unit_size = manifest["unit_size"]
+        self.paths = manifest["paths"]
+        self.units = (len(self.paths) + self.unit_size - 1) // self.unit_size
+
+        for name in ("leases", "results", "clock"):
+            os.makedirs(os.path.join(job_dir, name), exist_ok=True)
+
+    @classmethod
+    def create(cls, job_dir, root, unit_size=None, lease_seconds=None):
+        """
+        Create a job for every image under a directory, or open it if it exists.
+
+        The manifest is published with a hard link, which fails if another
+        node has already created it, so running `init` on several nodes at
+        once is safe.
+
+        Args:
+            job_dir (str): Job directory
+            root (str): Directory of images (searched recursively)
+            unit_size (int): Images per work unit (default from config)
+            lease_seconds (float): Age after which a lease is reclaimed (default from config)
+
+        Returns:
+            ScoringJob: The job
+        """
+        os.makedirs(job_dir, exist_ok=True)
+        manifest_path = os.path.join(job_dir, "manifest.json")
+        if not os.path.exists(manifest_path):
+            manifest = {
+                "root": os.path.abspath(root),
+                "unit_size": unit_size or DISTRIBUTED_SETTINGS["unit_size"],
+                "paths": find_images(root),
+            }
+            fd, temp_path = tempfile.mkstemp(dir=job_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(manifest, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.link(temp_path, manifest_path)
+                logger.info(f"Created job with {len(manifest['paths'])} images in {job_dir}")
+            except FileExistsError:
+                logger.info(f"Job {job_dir} already exists")
+            finally:
+                os.remove(temp_path)
+        return cls(job_dir, lease_seconds)
+
+    def unit_paths(self, unit):
+        """
+        Get the image paths of a work unit.
+
+        Args:
+            unit (int): Unit number
+
+        Returns:
+            list: Paths relative to the job root
+        """
+        return self.paths[unit * self.unit_size:(unit + 1) * self.unit_size]
+
+    def claim(self, node_id):
+        """
+        Lease a unit that is neither finished nor leased by a live node.
+
+        Nodes start looking at different units so they rarely race for the
+        same one.
+
+        Args:
+            node_id (str): Identifier of the claiming node
+
+        Returns:
+            int: The claimed unit, or None if every unfinished unit is leased
+        """
+        done = self._finished()
+        leased = set(os.listdir(os.path.join(self.job_dir, "leases")))
+        now = None
+        offset = uuid.uuid5(uuid.NAMESPACE_OID, node_id).int % max(self.units, 1)
+
+        for step in range(self.units):
+            unit = (offset + step) % self.units
+            if unit in done:
+                continue
+            name = self._unit_name(unit)
+            if name in leased:
+                now = now if now is not None else self._fs_now(node_id)
+                if not self._reclaim(unit, now):
+                    continue
+            if not self._acquire(unit, node_id):
+                continue
+            # Another node may have finished it since the listing
+            if unit in self._finished():
+                self.release(unit, node_id)
+                continue
+            return unit
+        return None
+
+    def renew(self, unit, node_id):
+        """
+        Extend a lease.
+
+        Args:
+            unit (int): Leased unit
+            node_id (str): Node that should hold the lease
+
+        Returns:
+            bool: False if the lease was lost to another node
+        """
+        path = self._lease_path(unit)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                if json.load(f).get("node") != node_id:
+                    return False
+            os.utime(path)
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def complete(self, unit, records, node_id):
+        """
+        Store a finished unit's results and release its lease.
+
+        Args:
+            unit (int): Unit number
+            records (list): Records from batch_score.score_batch
+            node_id (str): Node holding the lease
+        """
+        path = os.path.join(self.job_dir, "results", f"{self._unit_name(unit)}.jsonl")
+        _write_atomic(path, "".join(json.dumps(record) + "\n" for record in records))
+        self.release(unit, node_id)
+
+    def release(self, unit, node_id):
+        """
+        Give up a lease if this node still holds it.
+
+        Args:
+            unit (int): Unit number
+            node_id (str): Node holding the lease
+        """
+        if self.renew(unit, node_id):
+            try:
+                os.remove(self._lease_path(unit))
+            except FileNotFoundError:
+                pass
+
+    def status(self):
+        """
+        Count units by state.
+
+        Returns:
+            dict: Numbers of "units", "finished" and "leased" units and of "images"
+        """
+        done = self._finished()
+        leases = set(os.listdir(os.path.join(self.job_dir, "leases")))
+        leased = sum(1 for unit in range(self.units) if self._unit_name(unit) in leases and unit not in done)
+        return {"units": self.units, "finished": len(done), "leased": leased, "images": len(self.paths)}
+
+    def merge(self, output, fmt=None):
+        """
+        Write the results of every unit to one output, in manifest order.
+
+        Records already in the output are skipped, so an interrupted merge
+        can be run again.
+
+        Args:
+            output (str): Output path (see batch_score.open_writer)
+            fmt (str): Output format; inferred from the output extension if None
+
+        Returns:
+            int: Number of records written
+
+        Raises:
+            RuntimeError: If some units are not finished
+        """
+        missing = [unit for unit in range(self.units) if unit not in self._finished()]
+        if missing:
+            raise RuntimeError(f"{len(missing)} of {self.units} units are not finished yet")
+
+        writer = open_writer(output, fmt)
+        # Every stored record is final here, errors included
+        done = writer.completed(include_failed=True)
+        written = 0
+        try:
+            for unit in range(self.units):
+                with open(os.path.join(self.job_dir, "results", f"{self._unit_name(unit)}.jsonl"), "r",
+                          encoding="utf-8") as f:
+                    records = [record for record in map(json.loads, f) if record["path"] not in done]
+                if records:
+                    writer.write(records)
+                    written += len(records)
+        finally:
+            writer.close()
+        return written
+
+    def _unit_name(self, unit):
+        return f"unit-{unit:05d}"
+
+    def _lease_path(self, unit):
+        return os.path.join(self.job_dir, "leases", self._unit_name(unit))
+
+    def _finished(self):
+        """
+        Get the units whose results have been stored.
+
+        Returns:
+            set: Finished unit numbers
+        """
+        return {
+            int(name[len("unit-"):-len(".jsonl")])
+            for name in os.listdir(os.path.join(self.job_dir, "results"))
+            if name.startswith("unit-") and name.endswith(".jsonl")
+        }
+
+    def _acquire(self, unit, node_id):
+        """
+        Create a unit's lease; fails if any node holds it.
+
+        Args:
+            unit (int): Unit number
+            node_id (str): Claiming node
+
+        Returns:
+            bool: True if this node now holds the lease
+        """
+        try:
+            fd = os.open(self._lease_path(unit), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"node": node_id, "host": socket.gethostname(), "pid": os.getpid()}, f)
+        return True
+
+    def _reclaim(self, unit, now):
+        """
+        Remove a unit's lease if it has expired.
+
+        Several nodes may notice the same expired lease. Each one first
+        creates a marker named after the lease's mtime with an exclusive
+        create, so only one of them removes it, and a lease created again in
+        the meantime is never removed.
+
+        Args:
+            unit (int): Unit number
+            now (float): Current time on the shared filesystem
+
+        Returns:
+            bool: True if the unit is free to acquire
+        """
+        path = self._lease_path(unit)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return True
+        if now - stat.st_mtime < self.lease_seconds:
+            return False
+
+        try:
+            fd = os.open(f"{path}.expired-{stat.st_mtime_ns}", os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        os.close(fd)
+
+        logger.warning(f"Reclaiming {self._unit_name(unit)}: lease expired {now - stat.st_mtime:.0f}s ago")
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        return True
+
+    def _fs_now(self, node_id):
+        """
+        Read the current time from the shared filesystem.
+
+        Lease ages are measured against the file server's clock, so nodes
+        whose clocks disagree do not reclaim each other's live leases.
+
+        Args:
+            node_id (str): Node reading the clock
+
+        Returns:
+            float: Seconds since the epoch
+        """
+        path = os.path.join(self.job_dir, "clock", node_id)
+        with open(path, "w"):
+            pass
+        return os.stat(path).st_mtime
+
+
+class _Heartbeat:
+    """
+    Renews a node's leases on a background thread.
+    """
+
+    def __init__(self, job, node_id):
+        self.job = job
+        self.node_id = node_id
+        self.units = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="lease-heartbeat", daemon=True)
+        self._thread.start()
+
+    def add(self, unit):
+        with self._lock:
+            self.units.add(unit)
+
+    def remove(self, unit):
+        with self._lock:
+            self.units.discard(unit)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.job.lease_seconds / 3):
+            with self._lock:
+                units = list(self.units)
+            for unit in units:
+                if not self.job.renew(unit, self.node_id):
+                    logger.warning(f"Lost the lease of {self.job._unit_name(unit)} to another node")
+
+
+def run_node(job, model, node_id=None, batch_size=None, root=None, poll_interval=None):
+    """
+    Claim and score units until every unit of the job is finished.
+
+    When no unit is free but others are still leased, the node waits and
+    checks again, so it can take over the units of nodes that die.
+
+    Args:
+        job (ScoringJob): The job
+        model: Model with a `version` attribute and `predict_batch(images)`
+        node_id (str): Identifier of this node (default: host, pid and a random suffix)
+        batch_size (int): Images per model call (default from config)
+        root (str): Where this node mounts the job root, if not at the same path
+        poll_interval (float): Seconds between checks for reclaimable units (default from config)
+
+    Returns:
+        int: Number of units this node finished
+    """
+    node_id = node_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    batch_size = batch_size or BATCH_SCORE_SETTINGS["batch_size"]
+    poll_interval = poll_interval if poll_interval is not None else DISTRIBUTED_SETTINGS["poll_interval"]
+    root = root or job.root
+
+    heartbeat = _Heartbeat(job, node_id)
+    finished = 0
+    try:
+        while True:
+            unit = job.claim(node_id)
+            if unit is None:
+                status = job.status()
+                if status["finished"] == status["units"]:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            heartbeat.add(unit)
+            try:
+                paths = job.unit_paths(unit)
+                start = time.perf_counter()
+                records = []
+                for offset in range(0, len(paths), batch_size):
+                    records.extend(score_batch(model, root, paths[offset:offset + batch_size]))
+                job.complete(unit, records, node_id)
+                finished += 1
+                logger.info(f"{node_id} finished {job._unit_name(unit)} "
+                            f"({len(paths) / max(time.perf_counter() - start, 1e-9):.1f} images/s)")
+            except BaseException:
+                job.release(unit, node_id)
+                raise
+            finally:
+                heartbeat.remove(unit)
+    finally:
+        heartbeat.stop()
+    return finished
+
+
+def _node_process(job_dir, root, batch_size, backbone, threads):
+    """
+    Run a node in a worker process with its own model.
+
+    Args:
+        job_dir (str): Job directory
+        root (str): Where this node mounts the job root, or None
+        batch_size (int): Images per model call
+        backbone (str): Model backbone
+        threads (int): TensorFlow intra-op threads for this worker
+
+    Returns:
+        int: Number of units the worker finished
+    """
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    batch_score._init_worker(backbone, threads)
+    return run_node(ScoringJob(job_dir), batch_score._model, batch_size=batch_size, root=root)
+
+
+def main():
+    """
+    Command-line entry point for distributed scoring.
+    """
+    parser = argparse.ArgumentParser(description="Score an image archive on several machines sharing a filesystem")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    init_parser = subparsers.add_parser("init", help="Create a job for every image under a directory")
+    init_parser.add_argument("job", type=str, help="Job directory on the shared filesystem")
+    init_parser.add_argument("root", type=str, help="Directory of images (searched recursively)")
+    init_parser.add_argument("--unit-size", type=int, default=DISTRIBUTED_SETTINGS["unit_size"],
+                             help="Images per work unit")
+
+    work_parser = subparsers.add_parser("work", help="Score units until the job is finished")
+    work_parser.add_argument("job", type=str, help="Job directory on the shared filesystem")
+    work_parser.add_argument("--workers", type=int, default=BATCH_SCORE_SETTINGS["workers"],
+                             help="Worker processes on this machine")
+    work_parser.add_argument("--batch-size", type=int, default=BATCH_SCORE_SETTINGS["batch_size"],
+                             help="Images per model call")
+    work_parser.add_argument("--root", type=str, help="Where this machine mounts the image directory")
+
+    status_parser = subparsers.add_parser("status", help="Show job progress")
+    status_parser.add_argument("job", type=str, help="Job directory")
+
+    merge_parser = subparsers.add_parser("merge", help="Combine unit results into one output")
+    merge_parser.add_argument("job", type=str, help="Job directory")
+    merge_parser.add_argument("output", type=str, help="Output .jsonl or .csv file, or .parquet directory")
+    merge_parser.add_argument("--format", type=str, choices=("jsonl", "csv", "parquet"), help="Output format")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    if args.command == "init":
+        job = ScoringJob.create(args.job, args.root, args.unit_size)
+        print(f"{len(job.paths)} images in {job.units} units")
+
+    elif args.command == "work":
+        ScoringJob(args.job)
+        workers = max(1, args.workers)
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        backbone = MODEL_SETTINGS["backbone"]
+        # TensorFlow is not fork-safe, so workers start fresh interpreters
+        with multiprocessing.get_context("spawn").Pool(workers) as pool:
+            finished = pool.starmap(_node_process, [(args.job, args.root, args.batch_size, backbone, threads)] * workers)
+        print(f"This machine finished {sum(finished)} units")
+
+    elif args.command == "status":
+        status = ScoringJob(args.job).status()
+        print(f"{status['finished']}/{status['units']} units finished, {status['leased']} in progress "
+              f"({status['images']} images)")
+
+    else:
+        written = ScoringJob(args.job).merge(args.output, args.format)
+        print(f"Wrote {written} records to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""
+Perceptual-hash near-duplicate detection for example images.
+
+This module computes a 64-bit DCT perceptual hash (pHash) for images and
+keeps the hashes of all examples in a BK-tree, so a new contribution can be
+checked for near-duplicates by Hamming distance without comparing it to
+every example. Hashes are stored in the examples catalog and the tree
+follows the catalog through its change log.
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import os
+import logging
+import threading
+import numpy as np
+from PIL import Image, ImageOps
+
+# Import configuration settings
+from config import DUPLICATE_MAX_DISTANCE
+
+logger = logging.getLogger(__name__)
+
+# The image is reduced to HASH_IMAGE_SIZE^2 pixels and the lowest
+# HASH_SIZE x HASH_SIZE DCT frequencies give the 64 hash bits
+HASH_IMAGE_SIZE = 32
+HASH_SIZE = 8
+
+
+def _dct_matrix(size):
+    """
+    Build the orthonormal DCT-II matrix.
+
+    Args:
+        size (int): Transform size
+
+    Returns:
+        numpy.ndarray: Matrix D such that D @ x is the DCT of x
+    """
+    n = np.arange(size)
+    matrix = np.cos(np.pi * (2 * n[np.newaxis, :] + 1) * n[:, np.newaxis] / (2 * size))
+    matrix[0] *= 1 / np.sqrt(2)
+    return matrix * np.sqrt(2 / size)
+
+
+_DCT = _dct_matrix(HASH_IMAGE_SIZE)
+
+
+def phash(image):
+    """
+    Compute the 64-bit perceptual hash of an image.
+
+    The image is converted to greyscale, reduced to 32x32, and transformed
+    with a 2-D DCT. Each bit records whether one of the 8x8 lowest
+    frequencies is above their median, so re-encoding, resizing and small
+    colour changes flip few bits.
+
+    Args:
+        image: Path, file-like object or PIL Image
+
+    Returns:
+        int: Unsigned 64-bit hash
+    """
+    if isinstance(image, Image.Image):
+        return _hash_image(image)
+
+    with Image.open(image) as img:
+        # Let the JPEG decoder downscale while decoding
+        img.draft("L", (HASH_IMAGE_SIZE * 2, HASH_IMAGE_SIZE * 2))
+        return _hash_image(img)
+
+
+def _hash_image(img):
+    """
+    Compute the perceptual hash of an opened image.
+
+    Args:
+        img (PIL.Image.Image): Image to hash
+
+    Returns:
+        int: Unsigned 64-bit hash
+    """
+    img = ImageOps.exif_transpose(img).convert("L").resize((HASH_IMAGE_SIZE, HASH_IMAGE_SIZE), Image.LANCZOS)
+    pixels = np.asarray(img, dtype=np.float64)
+
+    low = (_DCT @ pixels @ _DCT.T)[:HASH_SIZE, :HASH_SIZE].flatten()
+    # The DC term only measures brightness, so it is left out of the median
+    bits = low > np.median(low[1:])
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+def hamming_distance(a, b):
+    """
+    Count the bits that differ between two hashes.
+
+    Args:
+        a (int): First hash
+        b (int): Second hash
+
+    Returns:
+        int: Number of differing bits
+    """
+    return bin(a ^ b).count("1")
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over 64-bit hashes with Hamming distance.
+
+    Each node stores one hash and the keys that have it. Children are
+    indexed by their distance to the node, so a search within radius r only
+    visits children whose edge distance is within r of the query distance
+    (triangle inequality). Removing a key leaves its node in place as a
+    routing node.
+    """
+
+    def __init__(self):
+        self._root = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, value, key):
+        """
+        Add a key with the given hash.
+
+        Args:
+            value (int): Hash
+            key: Identifier returned by searches
+        """
+        self._size += 1
+        if self._root is None:
+            self._root = [value, {key}, {}]
+            return
+
+        node = self._root
+        while True:
+            distance = hamming_distance(value, node[0])
+            if distance == 0:
+                node[1].add(key)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, {key}, {}]
+                return
+            node = child
+
+    def remove(self, value, key):
+        """
+        Remove a key with the given hash.
+
+        Args:
+            value (int): Hash the key was added with
+            key: Identifier to remove
+
+        Returns:
+            bool: True if the key was present
+        """
+        node = self._root
+        while node is not None:
+            distance = hamming_distance(value, node[0])
+            if distance == 0:
+                if key in node[1]:
+                    node[1].discard(key)
+                    self._size -= 1
+                    return True
+                return False
+            node = node[2].get(distance)
+        return False
+
+    def search(self, value, radius):
+        """
+        Find keys whose hash is within a Hamming distance of a value.
+
+        Args:
+            value (int): Query hash
+            radius (int): Maximum distance
+
+        Returns:
+            list: (distance, key) tuples, closest first
+        """
+        results = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(value, node[0])
+            if distance <= radius:
+                results.extend((distance, key) for key in node[1])
+            for edge, child in node[2].items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return sorted(results, key=lambda item: (item[0], str(item[1])))
+
+
+class DuplicateIndex:
+    """
+    Near-duplicate lookup over the perceptual hashes of all examples.
+
+    The index stays in step with the catalog like the gallery index: each
+    lookup costs one catalog version query when nothing changed, and only
+    changed examples are (re)hashed otherwise. Hashes missing from the
+    catalog are computed from the image files and stored.
+    """
+
+    def __init__(self, catalog, examples_dir, max_distance=DUPLICATE_MAX_DISTANCE):
+        """
+        Initialize the index. It is built on first use.
+
+        Args:
+            catalog (ExamplesCatalog): Catalog holding the examples and hashes
+            examples_dir (str): Directory holding the example images
+            max_distance (int): Largest Hamming distance counted as a duplicate
+        """
+        self.catalog = catalog
+        self.examples_dir = examples_dir
+        self.max_distance = max_distance
+        self.version = None
+        self._tree = BKTree()
+        self._hashes = {}
+        self._lock = threading.Lock()
+        # Held from the duplicate check to the catalog insert in admit()
+        self._admit_lock = threading.Lock()
+
+    def find(self, value, max_distance=None):
+        """
+        Find examples that are near-duplicates of a hash.
+
+        Args:
+            value (int): Perceptual hash of the candidate image
+            max_distance (int): Override for the duplicate threshold
+
+        Returns:
+            list: (distance, filename) tuples, closest first
+        """
+        radius = self.max_distance if max_distance is None else max_distance
+        with self._lock:
+            self._refresh()
+            return self._tree.search(value, radius)
+
+    def check(self, image):
+        """
+        Hash an image and look for near-duplicates among the examples.
+
+        Args:
+            image: Path, file-like object or PIL Image
+
+        Returns:
+            tuple: (perceptual hash, list of (distance, filename) matches)
+        """
+        value = phash(image)
+        return value, self.find(value)
+
+    def admit(self, value, add):
+        """
+        Add an example unless it is a near-duplicate of one already present.
+
+        The lookup and the insert happen under one lock, so two concurrent
+        contributions of the same photo cannot both pass the check. The
+        callback must add the example (with its hash) to the catalog; the
+        next lookup picks it up from the catalog change log.
+
+        Args:
+            value (int): Perceptual hash of the candidate image
+            add (callable): Zero-argument callable that adds the example
+
+        Returns:
+            tuple: (list of (distance, filename) matches, result of add or
+                None if the image was rejected)
+        """
+        with self._admit_lock:
+            matches = self.find(value)
+            if matches:
+                return matches, None
+            return [], add()
+
+    def refresh(self):
+        """
+        Bring the index up to date with the catalog.
+
+        Lookups refresh the index themselves; calling this ahead of time
+        (e.g. at startup) moves the one-off hashing of unhashed examples out
+        of the first request.
+        """
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self):
+        """
+        Bring the tree up to date with the catalog. Called with the lock held.
+        """
+        version = self.catalog.version()
+        if version == self.version:
+            return
+
+        changes = None
+        if self.version is not None and self.version < version:
+            changes = self.catalog.changes_since(self.version)
+
+        if changes is None or any(op == "reset" for _, op, _ in changes):
+            self._rebuild()
+        else:
+            changed = list(dict.fromkeys(filename for _, _, filename in changes if filename))
+            # Only the changed examples' hashes are read; the full map is
+            # loaded by _rebuild() alone
+            stored = self.catalog.phashes(changed)
+            for filename in changed:
+                if filename in self._hashes:
+                    self._tree.remove(self._hashes.pop(filename), filename)
+                if self.catalog.get(filename) is None:
+                    continue
+                self._insert(filename, stored.get(filename))
+
+        self.version = version
+
+    def _rebuild(self):
+        """
+        Rebuild the tree from the stored hashes, hashing examples that lack one.
+        """
+        stored = self.catalog.phashes()
+        self._tree = BKTree()
+        self._hashes = {}
+        for example in self.catalog.list_examples():
+            self._insert(example["filename"], stored.get(example["filename"]))
+
+    def _insert(self, filename, value):
+        """
+        Add an example to the tree, computing and storing its hash if needed.
+
+        Args:
+            filename (str): Example filename
+            value (int): Stored hash, or None to hash the image file
+        """
+        if value is None:
+            path = os.path.join(self.examples_dir, filename)
+            try:
+                value = phash(path)
+            except Exception as e:
+                logger.warning(f"Could not hash example {filename}: {str(e)}")
+                return
+            self.catalog.set_phash(filename, value)
+
+        self._hashes[filename] = value
+        self._tree.add(value, filename)
@@ -0,0 +1,742 @@
+"""
+SQLite-backed catalog of example images.
+
+This module stores example image metadata (score, category, contributor,
+description) in an indexed SQLite database in WAL mode. Inserts and deletes
+are single atomic statements, so concurrent contributions no longer lose
+writes, and their cost does not grow with the size of the library. The
+legacy `examples_metadata.json` file is imported on first use.
+
+Usage:
+    python examples_catalog.py migrate [--json path/to/examples_metadata.json]
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import os
+import re
+import json
+import base64
+import bisect
+import sqlite3
+import logging
+import argparse
+import datetime
+import threading
+
+# Import configuration settings
+from config import EXAMPLES_DB, EXAMPLES_DIR, EXAMPLES_METADATA_FILE, EXAMPLE_CATEGORIES
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS examples (
+    filename TEXT PRIMARY KEY,
+    category TEXT NOT NULL,
+    score REAL NOT NULL,
+    contributor TEXT NOT NULL DEFAULT 'Anonymous',
+    description TEXT NOT NULL DEFAULT '',
+    date_added TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_examples_category_score ON examples (category, score, filename);
+CREATE TABLE IF NOT EXISTS example_hashes (
+    filename TEXT PRIMARY KEY,
+    phash INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS score_manifest (
+    filename TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    model_version TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counters (
+    category TEXT PRIMARY KEY,
+    last_number INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS changes (
+    version INTEGER PRIMARY KEY AUTOINCREMENT,
+    filename TEXT,
+    op TEXT NOT NULL
+);
+"""
+
+# Number of change log entries kept for incremental index refreshes
+CHANGE_LOG_RETENTION = 10000
+
+# Perceptual hashes are unsigned 64-bit; SQLite integers are signed
+_HASH_SIGN_BIT = 1 << 63
+
+
+def category_for_filename(filename):
+    """
+    Determine an example's category from its filename prefix.
+
+    Args:
+        filename (str): Example filename, e.g. "high_score_3.jpg"
+
+    Returns:
+        str: Category name, or None if the filename has no category prefix
+    """
+    for category in EXAMPLE_CATEGORIES:
+        if filename.startswith(f"{category}_score_"):
+            return category
+    return None
+
+
+def encode_cursor(example):
+    """
+    Encode the position just after an example as an opaque page cursor.
+
+    Args:
+        example (dict): Last example of a page
+
+    Returns:
+        str: URL-safe cursor
+    """
+    key = [example["category"], example["score"], example["filename"]]
+    return base64.urlsafe_b64encode(json.dumps(key).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """
+    Decode a page cursor created by encode_cursor.
+
+    Args:
+        cursor (str): Cursor from a previous page
+
+    Returns:
+        tuple: (category, score, filename) of the last example already seen
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        category, score, filename = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if category not in EXAMPLE_CATEGORIES or not isinstance(score, (int, float)) or not isinstance(filename, str):
+        raise ValueError("Invalid cursor")
+    return category, float(score), filename
+
+
+def _highest_example_number(category, filenames):
+    """
+    Find the highest example number used for a category.
+
+    Args:
+        category (str): Category name
+        filenames (iterable): Filenames to inspect
+
+    Returns:
+        int: Highest number found, or 0 if there are none
+    """
+    pattern = re.compile(rf"^{re.escape(category)}_score_(\d+)\.")
+    highest = 0
+    for filename in filenames:
+        match = pattern.match(filename)
+        if match:
+            highest = max(highest, int(match.group(1)))
+    return highest
+
+
+class ExamplesCatalog:
+    """
+    Indexed SQLite store for example image metadata.
+
+    Each thread gets its own connection, so one catalog can be shared by
+    all request handlers of a threaded server.
+    """
+
+    def __init__(self, db_path=EXAMPLES_DB):
+        """
+        Open (and if needed create) the catalog database.
+
+        Args:
+            db_path (str): Path to the SQLite database file
+        """
+        self.db_path = db_path
+        self._local = threading.local()
+
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        """
+        Get this thread's connection, opening it on first use.
+
+        Returns:
+            sqlite3.Connection: Connection in WAL mode with row access by name
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, filename, category, score, contributor="Anonymous", description="", date_added=None,
+            phash=None):
+        """
+        Add an example atomically.
+
+        Args:
+            filename (str): Example filename in the examples directory
+            category (str): One of EXAMPLE_CATEGORIES
+            score (float): Aesthetic score
+            contributor (str): Contributor name
+            description (str): Image description
+            date_added (str): Timestamp "YYYY-MM-DD HH:MM:SS"; defaults to now
+            phash (int): 64-bit perceptual hash of the image, if already computed
+
+        Returns:
+            dict: The stored example
+
+        Raises:
+            ValueError: If the category is invalid or the filename already exists
+        """
+        if category not in EXAMPLE_CATEGORIES:
+            raise ValueError(f"Invalid category: {category}")
+        if date_added is None:
+            date_added = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        example = {
+            "filename": filename,
+            "category": category,
+            "score": float(score),
+            "contributor": contributor,
+            "description": description,
+            "date_added": date_added,
+        }
+
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT INTO examples (filename, category, score, contributor, description, date_added) "
+                    "VALUES (:filename, :category, :score, :contributor, :description, :date_added)",
+                    example
+                )
+                if phash is not None:
+                    self._store_phash(conn, filename, phash)
+                self._record_change(conn, "add", filename)
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Example already exists: {filename}")
+
+        return example
+
+    def allocate_filename(self, category, file_ext, examples_dir=EXAMPLES_DIR):
+        """
+        Reserve the next example filename for a category.
+
+        Numbers come from a persistent per-category counter that is
+        incremented under an exclusive write transaction, so concurrent
+        requests and processes never receive the same number and numbers are
+        not reused after deletes. The first allocation for a category seeds
+        the counter from the highest number already in the examples
+        directory or the catalog; after that no scan is needed.
+
+        Args:
+            category (str): One of EXAMPLE_CATEGORIES
+            file_ext (str): File extension including the dot, e.g. ".jpg"
+            examples_dir (str): Directory used to seed a new counter
+
+        Returns:
+            str: Filename such as "high_score_12.jpg"
+
+        Raises:
+            ValueError: If the category is invalid
+        """
+        if category not in EXAMPLE_CATEGORIES:
+            raise ValueError(f"Invalid category: {category}")
+
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT last_number FROM counters WHERE category = ?", (category,)).fetchone()
+            if row is None:
+                filenames = os.listdir(examples_dir) if os.path.isdir(examples_dir) else []
+                rows = conn.execute("SELECT filename FROM examples WHERE category = ?", (category,))
+                filenames += [r[0] for r in rows]
+                number = _highest_example_number(category, filenames) + 1
+                conn.execute("INSERT INTO counters (category, last_number) VALUES (?, ?)", (category, number))
+            else:
+                number = row[0] + 1
+                conn.execute("UPDATE counters SET last_number = ? WHERE category = ?", (number, category))
+
+        return f"{category}_score_{number}{file_ext}"
+
+    def delete(self, filename):
+        """
+        Delete an example atomically.
+
+        Args:
+            filename (str): Example filename
+
+        Returns:
+            bool: True if an example was deleted
+        """
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM examples WHERE filename = ?", (filename,))
+            conn.execute("DELETE FROM example_hashes WHERE filename = ?", (filename,))
+            conn.execute("DELETE FROM score_manifest WHERE filename = ?", (filename,))
+            if cursor.rowcount > 0:
+                self._record_change(conn, "delete", filename)
+        return cursor.rowcount > 0
+
+    def get(self, filename):
+        """
+        Look up one example.
+
+        Args:
+            filename (str): Example filename
+
+        Returns:
+            dict: The example, or None if it does not exist
+        """
+        row = self._connect().execute("SELECT * FROM examples WHERE filename = ?", (filename,)).fetchone()
+        return dict(row) if row else None
+
+    def list_examples(self, category=None):
+        """
+        List examples sorted by score.
+
+        Args:
+            category (str): Restrict to one category
+
+        Returns:
+            list: Example dicts in ascending score order
+        """
+        conn = self._connect()
+        if category is None:
+            rows = conn.execute("SELECT * FROM examples ORDER BY category, score, filename")
+        else:
+            rows = conn.execute(
+                "SELECT * FROM examples WHERE category = ? ORDER BY score, filename", (category,)
+            )
+        return [dict(row) for row in rows]
+
+    def grouped(self):
+        """
+        Group all examples by category, sorted by score within each category.
+
+        Returns:
+            dict: Mapping of category name to a list of example dicts
+        """
+        groups = {category: [] for category in EXAMPLE_CATEGORIES}
+        for example in self.list_examples():
+            groups.setdefault(example["category"], []).append(example)
+        return groups
+
+    def set_phash(self, filename, phash):
+        """
+        Store the perceptual hash of an example.
+
+        Args:
+            filename (str): Example filename
+            phash (int): Unsigned 64-bit perceptual hash
+        """
+        with self._connect() as conn:
+            self._store_phash(conn, filename, phash)
+
+    def phashes(self, filenames=None):
+        """
+        Get the stored perceptual hashes of examples.
+
+        Args:
+            filenames (iterable): Only look up these examples (default: all)
+
+        Returns:
+            dict: Mapping of filename to unsigned 64-bit hash; examples
+                without a stored hash are left out
+        """
+        query = "SELECT h.filename, h.phash FROM example_hashes h JOIN examples e ON e.filename = h.filename"
+        conn = self._connect()
+        if filenames is None:
+            return {filename: phash % (1 << 64) for filename, phash in conn.execute(query)}
+
+        filenames = list(filenames)
+        hashes = {}
+        # Stay well under SQLite's limit on bound parameters
+        for start in range(0, len(filenames), 500):
+            chunk = filenames[start:start + 500]
+            rows = conn.execute(f"{query} WHERE h.filename IN ({', '.join('?' * len(chunk))})", chunk)
+            hashes.update((filename, phash % (1 << 64)) for filename, phash in rows)
+        return hashes
+
+    def _store_phash(self, conn, filename, phash):
+        """
+        Write a perceptual hash inside the caller's transaction.
+
+        Args:
+            conn (sqlite3.Connection): Connection with an open transaction
+            filename (str): Example filename
+            phash (int): Unsigned 64-bit perceptual hash
+        """
+        signed = phash - (1 << 64) if phash & _HASH_SIGN_BIT else phash
+        conn.execute("INSERT OR REPLACE INTO example_hashes (filename, phash) VALUES (?, ?)", (filename, signed))
+
+    def score_manifest(self):
+        """
+        Get the record of which image content and model produced each score.
+
+        Returns:
+            dict: Mapping of filename to a dict with the image file's "size",
+                "mtime_ns" and "content_hash" and the "model_version" at the
+                time it was scored. Examples never re-scored are absent.
+        """
+        rows = self._connect().execute(
+            "SELECT m.* FROM score_manifest m JOIN examples e ON e.filename = m.filename"
+        )
+        return {row["filename"]: dict(row) for row in rows}
+
+    def update_scores(self, results):
+        """
+        Store new scores and their manifest entries in one transaction.
+
+        Args:
+            results (list): Dicts with "filename", "score", "size", "mtime_ns",
+                "content_hash" and "model_version"
+
+        Returns:
+            int: Number of examples whose score changed
+        """
+        changed = 0
+        with self._connect() as conn:
+            for result in results:
+                cursor = conn.execute(
+                    "UPDATE examples SET score = ? WHERE filename = ? AND score != ?",
+                    (float(result["score"]), result["filename"], float(result["score"]))
+                )
+                if cursor.rowcount > 0:
+                    changed += 1
+                    self._record_change(conn, "update", result["filename"])
+                conn.execute(
+                    "INSERT OR REPLACE INTO score_manifest (filename, size, mtime_ns, content_hash, model_version) "
+                    "VALUES (:filename, :size, :mtime_ns, :content_hash, :model_version)",
+                    result
+                )
+        return changed
+
+    def count(self):
+        """
+        Count the examples in the catalog.
+
+        Returns:
+            int: Number of examples
+        """
+        return self._connect().execute("SELECT COUNT(*) FROM examples").fetchone()[0]
+
+    def version(self):
+        """
+        Get the catalog version, which increases with every change.
+
+        Returns:
+            int: Current version (0 for a catalog that was never changed)
+        """
+        row = self._connect().execute("SELECT MAX(version) FROM changes").fetchone()
+        return row[0] or 0
+
+    def changes_since(self, version):
+        """
+        List the changes made after a given version.
+
+        Args:
+            version (int): Version the caller has already seen
+
+        Returns:
+            list: (version, op, filename) tuples in order, where op is "add",
+                "update", "delete" or "reset". None if the log no longer reaches
+                back to `version` and the caller must reload everything.
+        """
+        conn = self._connect()
+        oldest = conn.execute("SELECT MIN(version) FROM changes").fetchone()[0]
+        if oldest is not None and version < oldest - 1:
+            return None
+        rows = conn.execute(
+            "SELECT version, op, filename FROM changes WHERE version > ? ORDER BY version", (version,)
+        )
+        return [tuple(row) for row in rows]
+
+    def _record_change(self, conn, op, filename=None):
+        """
+        Append an entry to the change log inside the caller's transaction.
+
+        Args:
+            conn (sqlite3.Connection): Connection with an open transaction
+            op (str): "add", "update", "delete" or "reset"
+            filename (str): Affected example, if any
+        """
+        cursor = conn.execute("INSERT INTO changes (filename, op) VALUES (?, ?)", (filename, op))
+        if cursor.lastrowid % 1000 == 0:
+            conn.execute("DELETE FROM changes WHERE version <= ?", (cursor.lastrowid - CHANGE_LOG_RETENTION,))
+
+    def migrate_from_json(self, json_path=EXAMPLES_METADATA_FILE):
+        """
+        Import examples from the legacy JSON metadata file.
+
+        Entries already in the catalog are left unchanged, and entries whose
+        filename has no category prefix are skipped. The import runs in a
+        single transaction.
+
+        Args:
+            json_path (str): Path to examples_metadata.json
+
+        Returns:
+            int: Number of examples imported
+        """
+        if not os.path.exists(json_path):
+            return 0
+
+        with open(json_path, "r") as f:
+            metadata = json.load(f)
+
+        rows = []
+        for filename, data in metadata.items():
+            category = category_for_filename(filename)
+            if category is None:
+                logger.warning(f"Skipping example without a category prefix: {filename}")
+                continue
+            rows.append((
+                filename,
+                category,
+                float(data.get("score", 0.0)),
+                data.get("contributor", "Anonymous"),
+                data.get("description", ""),
+                data.get("date_added") or datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            ))
+
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO examples (filename, category, score, contributor, description, date_added) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            imported = conn.total_changes - before
+            if imported:
+                self._record_change(conn, "reset")
+
+        logger.info(f"Imported {imported} examples from {json_path}")
+        return imported
+
+
+class GalleryIndex:
+    """
+    In-memory index of the example gallery, grouped and sorted ready to serve.
+
+    Serving the gallery costs one directory stat and one catalog version
+    query. When the catalog version moves, only the changed examples are
+    re-read and re-inserted in score order; when the examples directory
+    changes without a catalog change (files added or removed by hand), the
+    index is rebuilt from a single directory listing.
+
+    Each category keeps a parallel list of (score, filename) sort keys, so a
+    page can be located by bisection and served in O(log n + page size).
+    """
+
+    def __init__(self, catalog, examples_dir):
+        """
+        Initialize the index. It is built on first use.
+
+        Args:
+            catalog (ExamplesCatalog): Catalog to index
+            examples_dir (str): Directory holding the example images
+        """
+        self.catalog = catalog
+        self.examples_dir = examples_dir
+        self.version = None
+        self.dir_mtime = None
+        self._groups = {category: [] for category in EXAMPLE_CATEGORIES}
+        self._keys = {category: [] for category in EXAMPLE_CATEGORIES}
+        self._lock = threading.Lock()
+
+    def groups(self):
+        """
+        Get the gallery grouped by category.
+
+        The returned lists are shared with the index and must not be modified.
+
+        Returns:
+            dict: Mapping of category name to example dicts sorted by score,
+                limited to examples whose image file exists
+        """
+        with self._lock:
+            self._refresh()
+            return self._groups
+
+    def page(self, category=None, cursor=None, limit=24):
+        """
+        Get one page of the gallery using keyset pagination.
+
+        Examples are ordered by category (in EXAMPLE_CATEGORIES order), then
+        by score and filename. A page starts right after the example encoded
+        in the cursor, so pages stay stable while examples are added or
+        deleted elsewhere in the gallery.
+
+        Args:
+            category (str): Restrict to one category, or None for all
+            cursor (str): Cursor returned with the previous page, or None
+            limit (int): Maximum number of examples in the page
+
+        Returns:
+            tuple: (list of example dicts, cursor for the next page or None)
+
+        Raises:
+            ValueError: If the category or cursor is invalid
+        """
+        if category is not None and category not in EXAMPLE_CATEGORIES:
+            raise ValueError(f"Invalid category: {category}")
+        categories = [category] if category else list(EXAMPLE_CATEGORIES)
+
+        after = decode_cursor(cursor) if cursor else None
+        if after is not None:
+            if after[0] not in categories:
+                raise ValueError("Cursor does not match the category")
+            categories = categories[categories.index(after[0]):]
+
+        with self._lock:
+            self._refresh()
+            groups, keys = self._groups, self._keys
+
+        # Collect one extra example to find out whether another page exists
+        examples = []
+        for name in categories:
+            start = 0
+            if after is not None and name == after[0]:
+                start = bisect.bisect_right(keys[name], after[1:])
+            examples.extend(groups[name][start:start + limit + 1 - len(examples)])
+            if len(examples) > limit:
+                break
+
+        if len(examples) > limit:
+            return examples[:limit], encode_cursor(examples[limit - 1])
+        return examples, None
+
+    def _refresh(self):
+        """
+        Bring the index up to date with the catalog and the directory.
+        """
+        try:
+            dir_mtime = os.stat(self.examples_dir).st_mtime_ns
+        except FileNotFoundError:
+            dir_mtime = None
+        version = self.catalog.version()
+
+        if version == self.version and dir_mtime == self.dir_mtime:
+            return
+
+        changes = None
+        if self.version is not None and version != self.version:
+            changes = self.catalog.changes_since(self.version)
+
+        if changes is None or any(op == "reset" for _, op, _ in changes):
+            self._rebuild()
+        else:
+            self._apply(changes)
+
+        self.version = version
+        self.dir_mtime = dir_mtime
+
+    def _rebuild(self):
+        """
+        Rebuild the whole index from the catalog and one directory listing.
+        """
+        try:
+            present = set(os.listdir(self.examples_dir))
+        except FileNotFoundError:
+            present = set()
+
+        groups = {category: [] for category in EXAMPLE_CATEGORIES}
+        for category, examples in self.catalog.grouped().items():
+            groups[category] = [example for example in examples if example["filename"] in present]
+        self._groups = groups
+        self._keys = {
+            category: [(example["score"], example["filename"]) for example in examples]
+            for category, examples in groups.items()
+        }
+
+    def _apply(self, changes):
+        """
+        Apply catalog changes to the index incrementally.
+
+        Args:
+            changes (list): (version, op, filename) tuples from the catalog
+        """
+        # Copy on write: the dict and lists already handed out stay unchanged
+        self._groups = dict(self._groups)
+        self._keys = dict(self._keys)
+
+        for filename in dict.fromkeys(filename for _, _, filename in changes):
+            self._remove(filename)
+
+            example = self.catalog.get(filename)
+            if example is None or not os.path.exists(os.path.join(self.examples_dir, filename)):
+                continue
+
+            category = example["category"]
+            group = self._groups.get(category, [])
+            keys = self._keys.get(category, [])
+            key = (example["score"], example["filename"])
+            position = bisect.bisect(keys, key)
+            self._groups[category] = group[:position] + [example] + group[position:]
+            self._keys[category] = keys[:position] + [key] + keys[position:]
+
+    def _remove(self, filename):
+        """
+        Remove an example from the index if present.
+
+        Args:
+            filename (str): Example filename
+        """
+        for category, group in self._groups.items():
+            for i, item in enumerate(group):
+                if item["filename"] == filename:
+                    keys = self._keys[category]
+                    self._groups[category] = group[:i] + group[i + 1:]
+                    self._keys[category] = keys[:i] + keys[i + 1:]
+                    return
+
+
+def open_catalog(db_path=EXAMPLES_DB, json_path=EXAMPLES_METADATA_FILE):
+    """
+    Open the examples catalog, importing the legacy JSON file if it is empty.
+
+    Args:
+        db_path (str): Path to the SQLite database file
+        json_path (str): Path to the legacy examples_metadata.json
+
+    Returns:
+        ExamplesCatalog: The opened catalog
+    """
+    catalog = ExamplesCatalog(db_path)
+    if catalog.count() == 0:
+        catalog.migrate_from_json(json_path)
+    return catalog
+
+
+def main():
+    """
+    Command-line entry point for catalog maintenance.
+    """
+    parser = argparse.ArgumentParser(description="Manage the examples catalog")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Import examples_metadata.json into the catalog")
+    migrate_parser.add_argument("--json", type=str, default=EXAMPLES_METADATA_FILE, help="Path to the JSON file")
+    migrate_parser.add_argument("--db", type=str, default=EXAMPLES_DB, help="Path to the catalog database")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    if args.command == "migrate":
+        catalog = ExamplesCatalog(args.db)
+        imported = catalog.migrate_from_json(args.json)
+        print(f"Imported {imported} examples; catalog now holds {catalog.count()}")
+
+
+if __name__ == "__main__":
+    main()
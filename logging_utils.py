@@ -0,0 +1,183 @@
+"""
+Asynchronous, sampled logging for the Aesthetic Lens application.
+
+This module moves log I/O off the request thread. Records are pushed onto a
+bounded in-memory queue and written to the log file and console by a
+background listener thread. Per-image detail is tagged with an event name
+and sampled at the rates configured in `config.LOG_SAMPLING_RATES`, so
+high-volume debug lines can be kept in the code without costing throughput.
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import queue
+import random
+
+# Import configuration settings
+from config import (
+    LOG_FILE, LOG_FORMAT, LOG_LEVEL, LOG_QUEUE_SIZE, LOG_SAMPLING_RATES
+)
+
+# Listener that drains the log queue; set by configure_logging()
+_listener = None
+
+
+def should_sample(event, rates=None):
+    """
+    Decide whether a record for the given event should be emitted.
+
+    Args:
+        event (str): Event name, e.g. "model.prediction"
+        rates (dict): Mapping of event name to sampling rate in [0, 1].
+            Defaults to `config.LOG_SAMPLING_RATES`.
+
+    Returns:
+        bool: True if the record should be emitted, False otherwise
+    """
+    if rates is None:
+        rates = LOG_SAMPLING_RATES
+    rate = rates.get(event, 1.0)
+    if rate >= 1.0:
+        return True
+    if rate <= 0.0:
+        return False
+    return random.random() < rate
+
+
+def log_event(logger, level, event, message, **fields):
+    """
+    Log a structured event, subject to level and sampling checks.
+
+    Both checks run before the record is created, so a dropped event costs
+    no string formatting and no queue traffic.
+
+    Args:
+        logger (logging.Logger): Logger to emit the record on
+        level (int): Logging level, e.g. logging.DEBUG
+        event (str): Event name used for sampling and structured output
+        message (str): Human-readable message
+        **fields: Structured fields attached to the record
+    """
+    if not logger.isEnabledFor(level) or not should_sample(event):
+        return
+    logger.log(level, message, extra={"event": event, "fields": fields})
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Format log records as single-line JSON objects.
+    """
+
+    def format(self, record):
+        """
+        Format a record as JSON.
+
+        Args:
+            record (logging.LogRecord): The record to format
+
+        Returns:
+            str: JSON representation of the record
+        """
+        payload = {
+            "ts": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        event = getattr(record, "event", None)
+        if event:
+            payload["event"] = event
+        fields = getattr(record, "fields", None)
+        if fields:
+            payload["fields"] = fields
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that drops records instead of blocking when the queue is full.
+
+    Logging must never stall a request, so a burst that outruns the listener
+    loses records rather than latency. The number of dropped records is kept
+    in `dropped`.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        """
+        Put a record on the queue without blocking.
+
+        Args:
+            record (logging.LogRecord): The prepared record
+        """
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(log_file=LOG_FILE, level=LOG_LEVEL):
+    """
+    Configure the root logger with a queue-based asynchronous pipeline.
+
+    The root logger gets a single non-blocking queue handler. A background
+    listener writes JSON lines to the log file and plain text to the console.
+    Calling this more than once is a no-op.
+
+    Args:
+        log_file (str): Path to the log file
+        level (str or int): Root logging level
+
+    Returns:
+        logging.handlers.QueueListener: The running listener
+    """
+    global _listener
+
+    if _listener is not None:
+        return _listener
+
+    file_handler = logging.FileHandler(log_file)
+    file_handler.setFormatter(StructuredFormatter())
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = DroppingQueueHandler(log_queue)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    return _listener
+
+
+def shutdown_logging():
+    """
+    Flush queued records and stop the background listener.
+    """
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
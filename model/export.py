@@ -0,0 +1,305 @@
+"""
+Inference-only export of the NIMA model.
+
+This module exports a built `NimaModel` as a serving-only TensorFlow
+SavedModel and loads it back with the same prediction interface. The
+exported graph holds only what inference needs: the frozen backbone, and
+the scoring head as constant matrix multiplications with the Dropout layers
+(identities at inference) left out and no optimizer or training state.
+The head weights are baked into the graph as constants, so TensorFlow's
+graph optimizer can fold them and fuse each matmul, bias add and ReLU into
+a single kernel, and the mean score is computed in the graph as well. XLA
+compilation of the whole function can be enabled at export time.
+
+Loading an export skips downloading the backbone from TensorFlow Hub and
+rebuilding the Keras model, which shortens cold starts.
+
+Usage:
+    python -m model.export /path/to/export [--xla] [--head-weights data/models/v2.npz]
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import os
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+
+import numpy as np
+import tensorflow as tf
+
+# Import configuration settings
+from config import MODEL_SETTINGS
+from logging_utils import log_event
+
+logger = logging.getLogger(__name__)
+
+# Description of the export, next to the SavedModel files
+EXPORT_INFO_FILE = "aesthetic_lens.json"
+
+
+class _ServingModule(tf.Module):
+    """
+    Serving graph: backbone, constant scoring head and mean score.
+    """
+
+    def __init__(self, base_model, head_weights, input_shape, jit_compile):
+        super().__init__()
+        # Tracked so the backbone variables are saved with the graph
+        self.base_model = base_model
+        self._head = [(tf.constant(kernel), tf.constant(bias)) for kernel, bias in head_weights]
+        self._score_values = tf.constant(np.arange(1, 11, dtype=np.float32))
+
+        self.serve = tf.function(
+            self._serve,
+            input_signature=[tf.TensorSpec([None] + list(input_shape), tf.float32, name="images")],
+            jit_compile=jit_compile,
+        )
+
+    def _serve(self, images):
+        features = self.base_model(images, training=False)
+        x = features
+        for index, (kernel, bias) in enumerate(self._head):
+            x = tf.nn.bias_add(tf.matmul(x, kernel), bias)
+            if index < len(self._head) - 1:
+                x = tf.nn.relu(x)
+        distribution = tf.nn.softmax(x)
+        return {
+            "scores": tf.linalg.matvec(distribution, self._score_values),
+            "distribution": distribution,
+            "features": features,
+        }
+
+
+def export_serving(model, path, jit_compile=False):
+    """
+    Export a model as a serving-only SavedModel.
+
+    The export is written to a temporary directory and moved into place, so
+    a process loading `path` never sees a partial export.
+
+    Args:
+        model (NimaModel): Built model to export
+        path (str): Output directory (replaced if it exists)
+        jit_compile (bool): Compile the serving function with XLA
+
+    Returns:
+        dict: The export description saved with it
+    """
+    dense_layers = [layer for layer in model.head_layers if isinstance(layer, tf.keras.layers.Dense)]
+    input_shape = tuple(model.input_shape)
+    module = _ServingModule(model.base_model, [layer.get_weights() for layer in dense_layers], input_shape,
+                            jit_compile)
+
+    info = {
+        "version": model.version,
+        "backbone": model.backbone,
+        "input_shape": list(input_shape),
+        "jit_compile": bool(jit_compile),
+        "exported_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    temp_path = tempfile.mkdtemp(dir=parent, prefix=".export-")
+    os.chmod(temp_path, 0o755)
+    try:
+        tf.saved_model.save(module, temp_path, signatures={"serving_default": module.serve})
+        with open(os.path.join(temp_path, EXPORT_INFO_FILE), "w", encoding="utf-8") as f:
+            json.dump(info, f, indent=2)
+
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.replace(temp_path, path)
+    except BaseException:
+        shutil.rmtree(temp_path, ignore_errors=True)
+        raise
+
+    logger.info(f"Exported model {model.version} to {path}")
+    return info
+
+
+class ServingModel:
+    """
+    Model loaded from an inference-only export.
+
+    Provides the prediction interface of NimaModel, so it can be used
+    wherever a NimaModel is (ModelLoader, batch scoring, the watch folder).
+    """
+
+    def __init__(self, path, profiler=None):
+        """
+        Load an export.
+
+        Args:
+            path (str): Directory written by export_serving
+            profiler: Optional object whose `phase(name)` context manager
+                times the load (see benchmarks/startup.py)
+
+        Raises:
+            Exception: If loading fails
+        """
+        try:
+            with open(os.path.join(path, EXPORT_INFO_FILE), "r", encoding="utf-8") as f:
+                info = json.load(f)
+            self.version = info["version"]
+            self.backbone = info["backbone"]
+            self.input_shape = tuple(info["input_shape"])
+
+            logger.info(f"Loading exported model from {path}...")
+            if profiler is not None:
+                with profiler.phase("load_export"):
+                    self._module = tf.saved_model.load(path)
+            else:
+                self._module = tf.saved_model.load(path)
+            self._serve = self._module.serve
+
+            logger.info(f"Exported model loaded successfully (version {self.version})")
+        except Exception as e:
+            logger.error(f"Failed to load exported model: {str(e)}")
+            raise
+
+    def predict(self, image):
+        """
+        Predict the aesthetic score for an image.
+
+        Args:
+            image (numpy.ndarray): Preprocessed image as a numpy array
+
+        Returns:
+            float: Aesthetic score between 1 and 10
+        """
+        return self.predict_batch(image)[0]
+
+    def predict_batch(self, images):
+        """
+        Predict aesthetic scores for a batch of images in a single call.
+
+        Args:
+            images (numpy.ndarray): Batch of shape (n, height, width, 3), either
+                uint8 pixels or floats already normalized to [0, 1]
+
+        Returns:
+            list: Aesthetic scores between 1 and 10, one per image
+        """
+        try:
+            scores = self._serve(self._to_inputs(images))["scores"].numpy()
+            log_event(logger, logging.DEBUG, "model.prediction", "Predicted aesthetic scores",
+                      batch_size=len(scores))
+            return [round(float(score), 2) for score in scores]
+        except Exception as e:
+            logger.error(f"Failed to predict aesthetic scores: {str(e)}")
+            raise
+
+    def predict_with_features(self, images):
+        """
+        Predict aesthetic scores and extract backbone features in one pass.
+
+        Args:
+            images (numpy.ndarray): Batch of shape (n, height, width, 3)
+
+        Returns:
+            tuple: (list of scores between 1 and 10, float32 array of shape
+                (n, feature_dim))
+        """
+        try:
+            outputs = self._serve(self._to_inputs(images))
+            return [round(float(score), 2) for score in outputs["scores"].numpy()], outputs["features"].numpy()
+        except Exception as e:
+            logger.error(f"Failed to predict aesthetic scores: {str(e)}")
+            raise
+
+    def predict_distribution(self, images):
+        """
+        Predict the score distribution for a batch of images.
+
+        Args:
+            images (numpy.ndarray): Batch of shape (n, height, width, 3)
+
+        Returns:
+            numpy.ndarray: Probabilities of the scores 1-10, shape (n, 10)
+        """
+        try:
+            return self._serve(self._to_inputs(images))["distribution"].numpy()
+        except Exception as e:
+            logger.error(f"Failed to predict score distributions: {str(e)}")
+            raise
+
+    def extract_features(self, images):
+        """
+        Extract backbone feature vectors.
+
+        Args:
+            images (numpy.ndarray): Batch of shape (n, height, width, 3)
+
+        Returns:
+            numpy.ndarray: float32 array of shape (n, feature_dim)
+        """
+        return self.predict_with_features(images)[1]
+
+    def warm_up(self, batch_size=1):
+        """
+        Run dummy batches through the model so the first real request is fast.
+
+        Args:
+            batch_size (int): Number of dummy images per batch
+
+        Returns:
+            float: Latency of the timed warm-up call in milliseconds
+        """
+        dummy_batch = np.zeros((batch_size,) + self.input_shape, dtype=np.float32)
+        self.predict_batch(dummy_batch)
+
+        start = time.perf_counter()
+        self.predict_batch(dummy_batch)
+        return (time.perf_counter() - start) * 1000.0
+
+    def _to_inputs(self, images):
+        """
+        Convert an image batch to a float32 tensor in [0, 1].
+
+        Args:
+            images (numpy.ndarray): Image or batch of images
+
+        Returns:
+            tf.Tensor: Batch of shape (n, height, width, 3)
+        """
+        if len(images.shape) == 3:
+            images = np.expand_dims(images, axis=0)
+
+        if images.dtype == np.uint8:
+            return tf.cast(tf.convert_to_tensor(images), tf.float32) / 255.0
+        return tf.convert_to_tensor(images, dtype=tf.float32)
+
+
+def main():
+    """
+    Command-line entry point for exporting the model.
+    """
+    parser = argparse.ArgumentParser(description="Export the NIMA model as a serving-only SavedModel")
+    parser.add_argument("output", type=str, help="Export directory")
+    parser.add_argument("--xla", action="store_true", help="Compile the serving function with XLA")
+    parser.add_argument("--head-weights", type=str, help="Trained head weights (default: MODEL_SETTINGS)")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    from model.nima_model import NimaModel
+
+    model = NimaModel(head_weights=args.head_weights)
+    export_serving(model, args.output, jit_compile=args.xla)
+
+    # Check the export against the model it came from
+    exported = ServingModel(args.output)
+    images = np.random.default_rng(0).random((4,) + tuple(MODEL_SETTINGS["input_shape"]), dtype=np.float32)
+    difference = np.max(np.abs(np.subtract(model.predict_batch(images), exported.predict_batch(images))))
+    print(f"Exported model {model.version} to {args.output} (largest score difference: {difference:.2f})")
+
+
+if __name__ == "__main__":
+    main()
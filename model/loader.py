@@ -0,0 +1,412 @@
+"""
+Background model loading and readiness tracking.
+
+This module loads the NIMA model off the main thread, warms it up with a
+dummy batch, and tracks inference latency so the application can report
+liveness and readiness separately to a load balancer. A loaded model can be
+replaced without downtime: the new one is built and warmed up in the
+background while the old one keeps serving, and then swapped in.
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import logging
+import threading
+import contextlib
+import time
+
+# Import configuration settings
+from config import READINESS_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+
+class ModelNotReadyError(RuntimeError):
+    """
+    Raised when a prediction is requested before the model is ready.
+    """
+
+
+class ModelLoader:
+    """
+    Load a model in the background and report when it is ready to serve.
+
+    The loader moves through the states "pending", "loading", "warming" and
+    then "ready" or "failed". It is ready only once the model is loaded, a
+    warm-up batch has run, and the smoothed inference latency is under the
+    configured threshold.
+
+    `reload` hot-swaps the model. Requests hold the model they started with
+    until they finish, so in-flight requests complete on the old model, and
+    the loader drops its last reference to the old model once no request is
+    using it.
+    """
+
+    STATE_PENDING = "pending"
+    STATE_LOADING = "loading"
+    STATE_WARMING = "warming"
+    STATE_READY = "ready"
+    STATE_FAILED = "failed"
+
+    def __init__(self, factory, warmup_batch_size=None, max_latency_ms=None, latency_alpha=None,
+                 remeasure_interval=None):
+        """
+        Initialize the loader.
+
+        Args:
+            factory (callable): Zero-argument callable that builds the model
+            warmup_batch_size (int): Batch size used for the warm-up call
+            max_latency_ms (float): Readiness latency threshold in milliseconds
+            latency_alpha (float): Smoothing factor for the latency moving average
+            remeasure_interval (float): Minimum seconds between latency
+                re-measurements by readiness probes
+        """
+        self.factory = factory
+        self.warmup_batch_size = warmup_batch_size or READINESS_SETTINGS["warmup_batch_size"]
+        self.max_latency_ms = max_latency_ms or READINESS_SETTINGS["max_latency_ms"]
+        self.latency_alpha = latency_alpha or READINESS_SETTINGS["latency_ewma_alpha"]
+        if remeasure_interval is None:
+            remeasure_interval = READINESS_SETTINGS["remeasure_interval"]
+        self.remeasure_interval = remeasure_interval
+
+        self.model = None
+        self.state = self.STATE_PENDING
+        self.error = None
+        self.latency_ms = None
+        self.loaded_at = None
+
+        # Hot swap state: "idle", "loading", "warming" or "failed"
+        self.reload_state = "idle"
+        self.reload_error = None
+        self._reload_thread = None
+        # Requests running per model (by id), and swapped-out models still in use
+        self._in_use = {}
+        self._retired = {}
+
+        # Latency re-measurement started by readiness probes
+        self._remeasure_thread = None
+        self._remeasured_at = None
+
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """
+        Start loading the model in a background thread.
+
+        Returns:
+            threading.Thread: The loader thread
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.load, name="model-loader", daemon=True)
+                self._thread.start()
+        return self._thread
+
+    def wait(self, timeout=None):
+        """
+        Block until the background load finishes.
+
+        Args:
+            timeout (float): Maximum number of seconds to wait
+
+        Returns:
+            bool: True if the model is ready, False otherwise
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.is_ready()
+
+    def load(self):
+        """
+        Build the model and warm it up. Runs on the loader thread.
+
+        A reload may finish while the initial load is still running; its
+        model is newer, so the initially loaded one is then discarded.
+        """
+        try:
+            self.state = self.STATE_LOADING
+            logger.info("Loading NIMA model...")
+            model = self.factory()
+
+            with self._lock:
+                if self.model is None:
+                    self.state = self.STATE_WARMING
+            logger.info(f"Warming up NIMA model with a batch of {self.warmup_batch_size}...")
+            latency_ms = model.warm_up(self.warmup_batch_size)
+
+            with self._lock:
+                if self.model is not None:
+                    logger.info(f"Discarding initially loaded NIMA model: a reload already swapped in "
+                                f"{getattr(self.model, 'version', '')}")
+                    return
+                self.model = model
+                self.latency_ms = latency_ms
+                self.loaded_at = time.time()
+                self.state = self.STATE_READY
+
+            logger.info(f"NIMA model ready (warm-up latency: {latency_ms:.1f} ms)")
+        except Exception as e:
+            with self._lock:
+                if self.model is not None:
+                    logger.warning(f"Initial NIMA model load failed after a reload succeeded: {str(e)}")
+                    return
+                self.error = str(e)
+                self.state = self.STATE_FAILED
+            logger.error(f"Failed to initialize NIMA model: {str(e)}")
+
+    def reload(self, factory=None):
+        """
+        Build a new model in the background and swap it in when it is warm.
+
+        The current model keeps serving until the swap. A failed reload
+        leaves it in place.
+
+        Args:
+            factory (callable): Builds the new model; the loader's factory if None
+
+        Returns:
+            threading.Thread: The reload thread
+
+        Raises:
+            RuntimeError: If a reload is already in progress
+        """
+        with self._lock:
+            if self._reload_thread is not None and self._reload_thread.is_alive():
+                raise RuntimeError("A model reload is already in progress")
+            self.reload_state = "loading"
+            self.reload_error = None
+            self._reload_thread = threading.Thread(
+                target=self._reload, args=(factory or self.factory,), name="model-reload", daemon=True
+            )
+            self._reload_thread.start()
+            return self._reload_thread
+
+    def _reload(self, factory):
+        """
+        Build, warm up and swap in a new model. Runs on the reload thread.
+
+        Args:
+            factory (callable): Builds the new model
+        """
+        try:
+            logger.info("Loading replacement NIMA model...")
+            model = factory()
+
+            self.reload_state = "warming"
+            latency_ms = model.warm_up(self.warmup_batch_size)
+
+            with self._lock:
+                old = self.model
+                self.model = model
+                self.latency_ms = latency_ms
+                self.loaded_at = time.time()
+                self.state = self.STATE_READY
+                self.error = None
+                self.reload_state = "idle"
+                # Keep the old model until its last request finishes
+                if old is not None and self._in_use.get(id(old)):
+                    self._retired[id(old)] = old
+
+            logger.info(f"Swapped in NIMA model {getattr(model, 'version', '')} "
+                        f"(warm-up latency: {latency_ms:.1f} ms)")
+        except Exception as e:
+            self.reload_error = str(e)
+            self.reload_state = "failed"
+            logger.error(f"Failed to reload NIMA model, keeping the current one: {str(e)}")
+
+    @contextlib.contextmanager
+    def _use(self):
+        """
+        Hold the current model for the duration of a request.
+
+        Yields:
+            The model, which stays valid even if it is swapped out meanwhile
+
+        Raises:
+            ModelNotReadyError: If the model has not finished loading
+        """
+        with self._lock:
+            model = self.model
+            if model is None:
+                raise ModelNotReadyError("Model not available. Please try again later.")
+            self._in_use[id(model)] = self._in_use.get(id(model), 0) + 1
+        try:
+            yield model
+        finally:
+            with self._lock:
+                remaining = self._in_use[id(model)] - 1
+                if remaining:
+                    self._in_use[id(model)] = remaining
+                else:
+                    del self._in_use[id(model)]
+                    if self._retired.pop(id(model), None) is not None:
+                        logger.info(f"Released NIMA model {getattr(model, 'version', '')}")
+
+    def record_latency(self, latency_ms):
+        """
+        Fold an observed inference latency into the moving average.
+
+        Args:
+            latency_ms (float): Observed latency in milliseconds
+        """
+        with self._lock:
+            if self.latency_ms is None:
+                self.latency_ms = latency_ms
+            else:
+                self.latency_ms += self.latency_alpha * (latency_ms - self.latency_ms)
+
+    def is_ready(self):
+        """
+        Check whether the model may receive scoring traffic.
+
+        Returns:
+            bool: True if loaded, warmed up and under the latency threshold
+        """
+        return (
+            self.state == self.STATE_READY
+            and self.latency_ms is not None
+            and self.latency_ms <= self.max_latency_ms
+        )
+
+    def check_ready(self):
+        """
+        Check readiness, re-measuring latency if it has drifted over the threshold.
+
+        A worker that is taken out of rotation stops receiving traffic, so its
+        moving average would never recover on its own. When the model is
+        loaded but too slow, a fresh warm-up batch is timed instead. The
+        measurement runs on a background thread, one at a time and at most
+        once per `remeasure_interval`, so probes from several load balancers
+        answer immediately from the current state and do not pile inference
+        onto an already slow worker.
+
+        Returns:
+            bool: True if the model may receive scoring traffic
+        """
+        model = self.model
+        if self.state == self.STATE_READY and model is not None and not self.is_ready():
+            with self._lock:
+                now = time.monotonic()
+                due = (
+                    (self._remeasure_thread is None or not self._remeasure_thread.is_alive())
+                    and (self._remeasured_at is None or now - self._remeasured_at >= self.remeasure_interval)
+                )
+                if due:
+                    self._remeasured_at = now
+                    self._remeasure_thread = threading.Thread(
+                        target=self._remeasure, args=(model,), name="model-remeasure", daemon=True
+                    )
+                    self._remeasure_thread.start()
+        return self.is_ready()
+
+    def _remeasure(self, model):
+        """
+        Time a warm-up batch and reset the latency average. Runs on the re-measure thread.
+
+        Args:
+            model: The model that was too slow
+        """
+        try:
+            latency_ms = model.warm_up(self.warmup_batch_size)
+            with self._lock:
+                # A model swapped in meanwhile has its own warm-up latency
+                if self.model is model:
+                    self.latency_ms = latency_ms
+        except Exception as e:
+            logger.error(f"Readiness probe failed: {str(e)}")
+
+    def predict(self, image):
+        """
+        Predict the aesthetic score for an image and record the latency.
+
+        Args:
+            image (numpy.ndarray): Preprocessed image as a numpy array
+
+        Returns:
+            float: Aesthetic score between 1 and 10
+
+        Raises:
+            ModelNotReadyError: If the model has not finished loading
+        """
+        with self._use() as model:
+            start = time.perf_counter()
+            score = model.predict(image)
+        self.record_latency((time.perf_counter() - start) * 1000.0)
+        return score
+
+    def predict_batch(self, images):
+        """
+        Predict aesthetic scores for a batch of images and record the latency.
+
+        Args:
+            images (numpy.ndarray): Batch of images of shape (n, height, width, 3)
+
+        Returns:
+            list: Aesthetic scores between 1 and 10, one per image
+
+        Raises:
+            ModelNotReadyError: If the model has not finished loading
+        """
+        with self._use() as model:
+            start = time.perf_counter()
+            scores = model.predict_batch(images)
+        self.record_latency((time.perf_counter() - start) * 1000.0)
+        return scores
+
+    def predict_with_features(self, images):
+        """
+        Predict aesthetic scores and backbone features and record the latency.
+
+        Args:
+            images (numpy.ndarray): Batch of images of shape (n, height, width, 3)
+
+        Returns:
+            tuple: (list of scores, feature array of shape (n, feature_dim))
+
+        Raises:
+            ModelNotReadyError: If the model has not finished loading
+        """
+        with self._use() as model:
+            start = time.perf_counter()
+            result = model.predict_with_features(images)
+        self.record_latency((time.perf_counter() - start) * 1000.0)
+        return result
+
+    def extract_features(self, images):
+        """
+        Extract backbone feature vectors for a batch of images.
+
+        Args:
+            images (numpy.ndarray): Batch of images of shape (n, height, width, 3)
+
+        Returns:
+            numpy.ndarray: Feature array of shape (n, feature_dim)
+
+        Raises:
+            ModelNotReadyError: If the model has not finished loading
+        """
+        with self._use() as model:
+            return model.extract_features(images)
+
+    def status(self):
+        """
+        Describe the loader state for health endpoints.
+
+        Returns:
+            dict: State, readiness, latency, model version, reload and error information
+        """
+        model = self.model
+        with self._lock:
+            draining = len(self._retired)
+        return {
+            "state": self.state,
+            "model_version": getattr(model, "version", None),
+            "ready": self.is_ready(),
+            "latency_ms": round(self.latency_ms, 2) if self.latency_ms is not None else None,
+            "max_latency_ms": self.max_latency_ms,
+            "error": self.error,
+            "reload": {"state": self.reload_state, "error": self.reload_error, "draining_models": draining},
+        }
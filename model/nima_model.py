@@ -10,16 +10,89 @@ https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scori
 """
 
 import os
+import time
+import hashlib
 import logging
+import contextlib
 import numpy as np
 import tensorflow as tf
 import tensorflow_hub as hub
 
 # Import configuration settings
 from config import MODEL_SETTINGS
+from logging_utils import log_event
+from model.standin import build_standin_backbone, STANDIN_SEED
 
 logger = logging.getLogger(__name__)
 
+# Seed of the head initializers for the MobileNet backbone. Without trained
+# head weights the head keeps its initial values, and seeding them keeps the
+# scores and model version identical across processes and restarts.
+HEAD_SEED = 2025
+
+
+def _no_phase(name):
+    """
+    Stand-in for a profiler's phase timer when construction is not profiled.
+    
+    Args:
+        name (str): Phase name
+        
+    Returns:
+        contextlib.nullcontext: Context manager that does nothing
+    """
+    return contextlib.nullcontext()
+
+
+def build_head_layers(initializer=None):
+    """
+    Create the layers of the scoring head.
+    
+    The head maps backbone features to a distribution over the scores 1-10.
+    The model applies these layers to the backbone output; train_head.py
+    applies the same layers to cached features.
+    
+    Args:
+        initializer (callable): Maps a dense layer's index (0-2) to its kernel
+            initializer; "glorot_uniform" for every layer if None
+        
+    Returns:
+        list: Layers to apply in order to the backbone features
+    """
+    initializer = initializer or (lambda offset: "glorot_uniform")
+    return [
+        # Dropout to prevent overfitting
+        tf.keras.layers.Dropout(0.5),
+        tf.keras.layers.Dense(256, activation="relu", kernel_initializer=initializer(0)),
+        tf.keras.layers.Dropout(0.5),
+        tf.keras.layers.Dense(128, activation="relu", kernel_initializer=initializer(1)),
+        # 10 outputs for scores 1-10 with softmax
+        tf.keras.layers.Dense(10, activation="softmax", kernel_initializer=initializer(2)),
+    ]
+
+
+def save_head_weights(path, layers, backbone):
+    """
+    Save the weights of a trained scoring head.
+    
+    Args:
+        path (str): Output .npz file
+        layers (list): Head layers from build_head_layers
+        backbone (str): Feature space the head was trained on (the model's
+            `feature_space`, e.g. "mobilenet" or "mobilenet-160")
+    """
+    arrays = {"backbone": np.array(backbone)}
+    dense_layers = [layer for layer in layers if isinstance(layer, tf.keras.layers.Dense)]
+    for index, layer in enumerate(dense_layers):
+        for slot, weights in enumerate(layer.get_weights()):
+            arrays[f"dense{index}_{slot}"] = weights
+    
+    # Write to a temporary file first so a running app never sees a partial file
+    temp_path = f"{path}.tmp.npz"
+    np.savez(temp_path, **arrays)
+    os.replace(temp_path, path)
+
+
 class NimaModel:
     """
     NIMA model for aesthetic image scoring.
@@ -28,21 +101,66 @@ class NimaModel:
     a pre-trained MobileNet model from TensorFlow Hub.
     """
     
-    def __init__(self):
+    def __init__(self, backbone=None, profiler=None, head_weights=None, input_size=None):
         """
         Initialize the NIMA model.
         
         Loads the pre-trained MobileNet model and sets up the scoring layers.
         
+        Args:
+            backbone (str): "mobilenet" for the TensorFlow Hub model or "standin"
+                for the offline deterministic stand-in. Defaults to
+                MODEL_SETTINGS["backbone"].
+            profiler: Optional object whose `phase(name)` context manager
+                times each construction phase (see benchmarks/startup.py)
+            head_weights (str): Trained head weights to load (e.g. a model
+                registry version). Defaults to MODEL_SETTINGS["head_weights"]
+                if that file exists. Weights passed here must have been
+                trained on this model's feature space.
+            input_size (int): Side of the square input in pixels. Defaults to
+                MODEL_SETTINGS["input_shape"]; smaller sizes use the matching
+                low-resolution MobileNet and need a head trained at that size.
+        
         Raises:
             Exception: If model loading fails
         """
         try:
-            # Load the MobileNet model from TensorFlow Hub
-            logger.info("Loading MobileNet model from TensorFlow Hub...")
-            mobilenet_url = MODEL_SETTINGS["mobilenet_url"]
-            input_shape = MODEL_SETTINGS["input_shape"]
-            self.base_model = hub.KerasLayer(mobilenet_url, input_shape=input_shape)
+            self.backbone = backbone or MODEL_SETTINGS["backbone"]
+            self._phase = profiler.phase if profiler is not None else _no_phase
+            default_size = MODEL_SETTINGS["input_shape"][0]
+            self.input_size = input_size or default_size
+            self.input_shape = (self.input_size, self.input_size, MODEL_SETTINGS["input_shape"][2])
+            input_shape = self.input_shape
+            
+            # Features of a backbone differ between input sizes, so a trained
+            # head is only valid for the size it was trained at
+            if self.input_size == default_size:
+                self.feature_space = self.backbone
+            else:
+                self.feature_space = f"{self.backbone}-{self.input_size}"
+            
+            if self.backbone == "standin":
+                # Offline stand-in with the same shapes (load tests, benchmarks)
+                with self._phase("backbone"):
+                    logger.info("Building stand-in backbone...")
+                    self.base_model = build_standin_backbone(input_shape)
+                    self.seed = STANDIN_SEED
+            else:
+                # Load the MobileNet model from TensorFlow Hub
+                logger.info("Loading MobileNet model from TensorFlow Hub...")
+                if self.input_size == default_size:
+                    mobilenet_url = MODEL_SETTINGS["mobilenet_url"]
+                elif self.input_size in MODEL_SETTINGS["mobilenet_low_res_urls"]:
+                    mobilenet_url = MODEL_SETTINGS["mobilenet_low_res_urls"][self.input_size]
+                else:
+                    raise ValueError(f"No MobileNet backbone for {self.input_size}px inputs")
+                # Resolving downloads the module on a cold cache; timed
+                # apart from loading it so the two costs can be told apart
+                with self._phase("hub_resolve"):
+                    resolved_path = hub.resolve(mobilenet_url)
+                with self._phase("keras_layer"):
+                    self.base_model = hub.KerasLayer(resolved_path, input_shape=input_shape)
+                self.seed = HEAD_SEED
             
             # Freeze the base model
             self.base_model.trainable = False
@@ -51,7 +169,20 @@ class NimaModel:
             logger.info("Building NIMA model...")
             self._build_model()
             
-            logger.info("NIMA model initialized successfully")
+            # Trained head weights (see train_head.py), if any
+            # Explicitly requested weights must fit; the configured default
+            # is skipped with a warning if it was trained on other features
+            strict = head_weights is not None
+            if head_weights is None and os.path.exists(MODEL_SETTINGS["head_weights"] or ""):
+                head_weights = MODEL_SETTINGS["head_weights"]
+            if head_weights is not None:
+                with self._phase("head_weights"):
+                    self._set_head_weights(head_weights, strict=strict)
+            
+            with self._phase("fingerprint"):
+                self.version = self._fingerprint()
+            
+            logger.info(f"NIMA model initialized successfully (version {self.version})")
         except Exception as e:
             logger.error(f"Failed to initialize NIMA model: {str(e)}")
             raise
@@ -63,41 +194,68 @@ class NimaModel:
         Creates a model that takes an image as input and outputs an aesthetic score.
         """
         try:
-            # Input layer
-            inputs = tf.keras.Input(shape=MODEL_SETTINGS["input_shape"])
-            
-            # Feature extraction with MobileNet
-            x = self.base_model(inputs)
-            
-            # Add dropout to prevent overfitting
-            x = tf.keras.layers.Dropout(0.5)(x)
-            
-            # Add dense layers
-            x = tf.keras.layers.Dense(256, activation="relu")(x)
-            x = tf.keras.layers.Dropout(0.5)(x)
-            x = tf.keras.layers.Dense(128, activation="relu")(x)
-            
-            # Output layer for aesthetic score (1-10)
-            # We use 10 outputs for scores 1-10 and apply softmax
-            x = tf.keras.layers.Dense(10, activation="softmax")(x)
+            with self._phase("build_model"):
+                # Input layer
+                inputs = tf.keras.Input(shape=self.input_shape)
+                
+                # Feature extraction with MobileNet
+                features = self.base_model(inputs)
+                self.feature_dim = int(features.shape[-1])
+                
+                # Scoring head: dense layers and a softmax over the scores 1-10
+                self.head_layers = build_head_layers(self._initializer)
+                x = features
+                for layer in self.head_layers:
+                    x = layer(x)
+                
+                # Create the model
+                self.model = tf.keras.Model(inputs=inputs, outputs=x)
+                
+                # Same layers with the backbone features as a second output, so
+                # scoring and similarity search share one forward pass
+                self.feature_model = tf.keras.Model(inputs=inputs, outputs=[x, features])
             
-            # Create the model
-            self.model = tf.keras.Model(inputs=inputs, outputs=x)
-            
-            # Since we're using a pre-trained model and not training,
-            # we don't need to compile it with loss and optimizer
-            # But we'll do it anyway for completeness
-            self.model.compile(
-                optimizer="adam",
-                loss="categorical_crossentropy",
-                metrics=["accuracy"]
-            )
+            # The model is only used for inference, so it is not compiled:
+            # an optimizer and metrics would only cost start-up time and
+            # memory (train_head.py compiles its own copy of the head)
             
             logger.info("NIMA model built successfully")
         except Exception as e:
             logger.error(f"Failed to build NIMA model: {str(e)}")
             raise
     
+    def _fingerprint(self):
+        """
+        Compute the model version from the backbone and all weights.
+        
+        Stored scores record the version that produced them, so they can be
+        recomputed when the model changes.
+        
+        Returns:
+            str: 16-character hex digest
+        """
+        digest = hashlib.sha256(self.feature_space.encode("utf-8"))
+        for weights in self.model.get_weights():
+            digest.update(str(weights.shape).encode("utf-8"))
+            digest.update(np.ascontiguousarray(weights).tobytes())
+        return digest.hexdigest()[:16]
+    
+    def _initializer(self, offset):
+        """
+        Get the kernel initializer for a dense layer.
+        
+        The head is always seeded, so a model without trained head weights
+        scores, and reports its version, the same in every process (batch
+        scoring workers, re-scoring runs, restarts of the watch folder).
+        
+        Args:
+            offset (int): Layer index added to the seed
+            
+        Returns:
+            tf.keras.initializers.GlorotUniform: Seeded initializer
+        """
+        return tf.keras.initializers.GlorotUniform(seed=self.seed + offset)
+    
     def predict(self, image):
         """
         Predict the aesthetic score for an image.
@@ -117,7 +275,7 @@ class NimaModel:
                 image = np.expand_dims(image, axis=0)
             
             # Get the predicted scores (probabilities for each score from 1-10)
-            predictions = self.model.predict(image)
+            predictions = self.model.predict(image, verbose=0)
             
             # Calculate the mean score
             # The score is a weighted average where the weights are 1-10
@@ -128,12 +286,218 @@ class NimaModel:
             # Round to 2 decimal places
             mean_score = round(float(mean_score), 2)
             
-            logger.info(f"Predicted aesthetic score: {mean_score}")
+            log_event(logger, logging.DEBUG, "model.prediction", "Predicted aesthetic score",
+                      score=mean_score)
             return mean_score
         except Exception as e:
             logger.error(f"Failed to predict aesthetic score: {str(e)}")
             raise
     
+    def predict_batch(self, images):
+        """
+        Predict aesthetic scores for a batch of images in a single call.
+        
+        uint8 batches (raw pixels in [0, 255]) are scaled to [0, 1] inside
+        the TensorFlow graph, so callers can pass decoded frames directly
+        without a float conversion on the host.
+        
+        Args:
+            images (numpy.ndarray): Batch of shape (n, height, width, 3), either
+                uint8 pixels or floats already normalized to [0, 1]
+            
+        Returns:
+            list: Aesthetic scores between 1 and 10, one per image
+            
+        Raises:
+            Exception: If prediction fails
+        """
+        try:
+            predictions = self.model(self._to_inputs(images), training=False).numpy()
+            
+            mean_scores = self._mean_scores(predictions)
+            log_event(logger, logging.DEBUG, "model.prediction", "Predicted aesthetic scores",
+                      batch_size=len(mean_scores))
+            return mean_scores
+        except Exception as e:
+            logger.error(f"Failed to predict aesthetic scores: {str(e)}")
+            raise
+    
+    def predict_with_features(self, images):
+        """
+        Predict aesthetic scores and extract backbone features in one pass.
+        
+        Args:
+            images (numpy.ndarray): Batch of shape (n, height, width, 3), either
+                uint8 pixels or floats already normalized to [0, 1]
+            
+        Returns:
+            tuple: (list of scores between 1 and 10, float32 array of shape
+                (n, feature_dim))
+            
+        Raises:
+            Exception: If prediction fails
+        """
+        try:
+            predictions, features = self.feature_model(self._to_inputs(images), training=False)
+            return self._mean_scores(predictions.numpy()), features.numpy()
+        except Exception as e:
+            logger.error(f"Failed to predict aesthetic scores: {str(e)}")
+            raise
+    
+    def predict_distribution(self, images):
+        """
+        Predict the score distribution for a batch of images.
+        
+        Args:
+            images (numpy.ndarray): Batch of shape (n, height, width, 3), either
+                uint8 pixels or floats already normalized to [0, 1]
+            
+        Returns:
+            numpy.ndarray: Probabilities of the scores 1-10, shape (n, 10)
+            
+        Raises:
+            Exception: If prediction fails
+        """
+        try:
+            return self.model(self._to_inputs(images), training=False).numpy()
+        except Exception as e:
+            logger.error(f"Failed to predict score distributions: {str(e)}")
+            raise
+    
+    def extract_features(self, images):
+        """
+        Extract backbone feature vectors without running the scoring head.
+        
+        Args:
+            images (numpy.ndarray): Batch of shape (n, height, width, 3), either
+                uint8 pixels or floats already normalized to [0, 1]
+            
+        Returns:
+            numpy.ndarray: float32 array of shape (n, feature_dim)
+            
+        Raises:
+            Exception: If feature extraction fails
+        """
+        try:
+            return np.asarray(self.base_model(self._to_inputs(images), training=False), dtype=np.float32)
+        except Exception as e:
+            logger.error(f"Failed to extract features: {str(e)}")
+            raise
+    
+    def _to_inputs(self, images):
+        """
+        Convert an image batch to a float32 tensor in [0, 1].
+        
+        uint8 batches are scaled inside the TensorFlow graph. Batches of
+        another size are resized to the model's input size (bilinear, so
+        callers that care about speed should pass images at that size).
+        
+        Args:
+            images (numpy.ndarray): Image or batch of images
+            
+        Returns:
+            tf.Tensor: Batch of shape (n, height, width, 3)
+        """
+        if len(images.shape) == 3:
+            images = np.expand_dims(images, axis=0)
+        
+        if images.dtype == np.uint8:
+            inputs = tf.cast(tf.convert_to_tensor(images), tf.float32) / 255.0
+        else:
+            inputs = tf.convert_to_tensor(images, dtype=tf.float32)
+        if tuple(images.shape[1:3]) != self.input_shape[:2]:
+            inputs = tf.image.resize(inputs, self.input_shape[:2])
+        return inputs
+    
+    def _mean_scores(self, predictions):
+        """
+        Reduce predicted score distributions to mean scores.
+        
+        Args:
+            predictions (numpy.ndarray): Probabilities of shape (n, 10)
+            
+        Returns:
+            list: Mean scores rounded to 2 decimal places
+        """
+        # Weighted average of the 1-10 score distribution for each image
+        score_weights = np.arange(1, 11, dtype=np.float32)
+        return [round(float(score), 2) for score in predictions @ score_weights]
+    
+    def warm_up(self, batch_size=1):
+        """
+        Run dummy batches through the model so the first real request is fast.
+
+        The first call traces the graph; the second is timed and reflects
+        steady-state inference latency.
+
+        Args:
+            batch_size (int): Number of dummy images per batch
+
+        Returns:
+            float: Latency of the timed warm-up call in milliseconds
+        """
+        dummy_batch = np.zeros((batch_size,) + self.input_shape, dtype=np.float32)
+        self.model.predict(dummy_batch, verbose=0)
+
+        start = time.perf_counter()
+        self.model.predict(dummy_batch, verbose=0)
+        return (time.perf_counter() - start) * 1000.0
+    
+    def load_head_weights(self, path):
+        """
+        Load trained scoring head weights saved by train_head.py.
+        
+        Args:
+            path (str): Path to the .npz weights file
+            
+        Returns:
+            bool: True if the weights were loaded, False if they were trained
+                on another backbone's features
+            
+        Raises:
+            Exception: If loading weights fails
+        """
+        loaded = self._set_head_weights(path)
+        if loaded:
+            self.version = self._fingerprint()
+            logger.info(f"Head weights loaded successfully (version {self.version})")
+        return loaded
+    
+    def _set_head_weights(self, path, strict=False):
+        """
+        Copy head weights from a file into the dense layers of the head.
+        
+        Args:
+            path (str): Path to the .npz weights file
+            strict (bool): Raise instead of skipping weights trained on
+                another feature space
+            
+        Returns:
+            bool: True if the weights were loaded
+            
+        Raises:
+            ValueError: If `strict` and the weights were trained on other features
+        """
+        try:
+            with np.load(path) as data:
+                backbone = str(data["backbone"])
+                if backbone != self.feature_space:
+                    if strict:
+                        raise ValueError(f"Head weights in {path} were trained on {backbone} features, "
+                                         f"model uses {self.feature_space}")
+                    logger.warning(f"Ignoring head weights in {path}: trained on {backbone} features, "
+                                   f"model uses {self.feature_space}")
+                    return False
+                
+                dense_layers = [layer for layer in self.head_layers if isinstance(layer, tf.keras.layers.Dense)]
+                for index, layer in enumerate(dense_layers):
+                    layer.set_weights([data[f"dense{index}_{slot}"] for slot in range(len(layer.weights))])
+            logger.info(f"Loaded head weights from {path}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to load head weights: {str(e)}")
+            raise
+    
     def _load_weights(self, weights_path):
         """
         Load pre-trained weights for the NIMA model.
@@ -148,7 +512,8 @@ class NimaModel:
             if os.path.exists(weights_path):
                 logger.info(f"Loading weights from {weights_path}")
                 self.model.load_weights(weights_path)
-                logger.info("Weights loaded successfully")
+                self.version = self._fingerprint()
+                logger.info(f"Weights loaded successfully (version {self.version})")
             else:
                 logger.warning(f"Weights file not found at {weights_path}")
         except Exception as e:
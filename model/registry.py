@@ -0,0 +1,205 @@
+"""
+Local registry of versioned model artifacts.
+
+This module keeps trained scoring heads (see train_head.py) as named
+versions in a directory, together with a `CURRENT` file naming the version
+the application serves. Activating a version rewrites `CURRENT` atomically;
+every application process polls the file and hot-swaps its model when the
+name changes, so one command or admin request deploys a version to all
+workers without a restart.
+
+Layout:
+    data/models/<version>.npz   head weights saved by save_head_weights
+    data/models/CURRENT         name of the active version
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import os
+import re
+import shutil
+import logging
+import tempfile
+import threading
+
+import numpy as np
+
+# Import configuration settings
+from config import MODEL_REGISTRY_DIR, MODEL_REGISTRY_SETTINGS, MODEL_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+# Version names are used as file names
+VERSION_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$")
+
+
+class ModelRegistry:
+    """
+    Directory of named scoring head versions with an active pointer.
+    """
+
+    def __init__(self, directory=MODEL_REGISTRY_DIR, feature_space=None):
+        """
+        Initialize the registry.
+
+        Args:
+            directory (str): Registry directory, created if missing
+            feature_space (str): Features the served model's head is applied
+                to; versions trained on others are rejected. Defaults to
+                MODEL_SETTINGS["backbone"].
+        """
+        self.directory = directory
+        self.feature_space = feature_space or MODEL_SETTINGS["backbone"]
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, name):
+        """
+        Get the artifact path of a version.
+
+        Args:
+            name (str): Version name
+
+        Returns:
+            str: Path to the version's weights file
+
+        Raises:
+            ValueError: If the name is not a valid version name
+        """
+        if not VERSION_PATTERN.match(name or ""):
+            raise ValueError(f"Invalid model version name: {name!r}")
+        return os.path.join(self.directory, f"{name}.npz")
+
+    def check_artifact(self, path):
+        """
+        Check that a weights file can be served by the application's model.
+
+        Args:
+            path (str): Weights file saved by save_head_weights
+
+        Raises:
+            ValueError: If the file is not head weights or was trained on
+                another feature space
+        """
+        try:
+            with np.load(path) as data:
+                feature_space = str(data["backbone"])
+        except (OSError, KeyError, ValueError) as e:
+            raise ValueError(f"{os.path.basename(path)} is not a head weights file: {str(e)}")
+        if feature_space != self.feature_space:
+            raise ValueError(f"{os.path.basename(path)} was trained on {feature_space} features, "
+                             f"the served model uses {self.feature_space}")
+
+    def versions(self):
+        """
+        List the registered versions.
+
+        Returns:
+            list: Dicts with "name", "size" and "created" (mtime), oldest first,
+                and "active" for the version in CURRENT
+        """
+        active = self.active()
+        versions = []
+        for filename in os.listdir(self.directory):
+            name, ext = os.path.splitext(filename)
+            if ext == ".npz" and VERSION_PATTERN.match(name):
+                stat = os.stat(os.path.join(self.directory, filename))
+                versions.append({"name": name, "size": stat.st_size, "created": stat.st_mtime,
+                                 "active": name == active})
+        return sorted(versions, key=lambda version: version["created"])
+
+    def publish(self, name, source_path):
+        """
+        Add a version by copying a weights file into the registry.
+
+        Args:
+            name (str): New version name
+            source_path (str): Weights file saved by save_head_weights
+
+        Returns:
+            str: Path of the registered artifact
+
+        Raises:
+            FileExistsError: If the version already exists; versions are immutable
+            ValueError: If the name is invalid or the weights do not fit the served model
+        """
+        target = self.path(name)
+        self.check_artifact(source_path)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(source_path, temp_path)
+            # A hard link fails if the name is taken, so a version is never overwritten
+            os.link(temp_path, target)
+        finally:
+            os.remove(temp_path)
+        logger.info(f"Published model version {name}")
+        return target
+
+    def active(self):
+        """
+        Get the active version.
+
+        Returns:
+            str: Name in CURRENT, or None if no version was activated
+        """
+        try:
+            with open(os.path.join(self.directory, "CURRENT"), "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def activate(self, name):
+        """
+        Make a version the active one.
+
+        Args:
+            name (str): Version name
+
+        Raises:
+            FileNotFoundError: If the version is not registered
+            ValueError: If the name is invalid or the version does not fit the served model
+        """
+        if not os.path.exists(self.path(name)):
+            raise FileNotFoundError(f"Model version {name} is not registered")
+        self.check_artifact(self.path(name))
+
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(name + "\n")
+        os.replace(temp_path, os.path.join(self.directory, "CURRENT"))
+        logger.info(f"Activated model version {name}")
+
+    def watch(self, on_change, poll_interval=None, stop_event=None):
+        """
+        Call `on_change(name)` from a daemon thread whenever CURRENT changes.
+
+        If the callback raises, the change is retried at the next poll.
+
+        Args:
+            on_change (callable): Called with the newly active version name
+            poll_interval (float): Seconds between checks (default from config)
+            stop_event (threading.Event): Set to stop watching
+
+        Returns:
+            threading.Thread: The watcher thread
+        """
+        poll_interval = poll_interval or MODEL_REGISTRY_SETTINGS["poll_interval"]
+        stop_event = stop_event or threading.Event()
+        seen = [self.active()]
+
+        def run():
+            while not stop_event.wait(poll_interval):
+                name = self.active()
+                if name is None or name == seen[0]:
+                    continue
+                try:
+                    on_change(name)
+                    seen[0] = name
+                except Exception as e:
+                    logger.warning(f"Could not switch to model version {name}: {str(e)}")
+
+        thread = threading.Thread(target=run, name="model-registry", daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,51 @@
+"""
+Offline stand-in for the MobileNet feature extractor.
+
+This module builds a small deterministic backbone with the same input and
+output shapes as the TensorFlow Hub MobileNet V2 feature vector. It lets the
+application, load tests and benchmarks run without downloading the real
+model. Scores produced with it are repeatable but meaningless.
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import tensorflow as tf
+
+# Size of the MobileNet V2 feature vector produced by the real backbone
+FEATURE_DIM = 1280
+
+# Seed for all stand-in weights, so every process builds the same model
+STANDIN_SEED = 1234
+
+
+def build_standin_backbone(input_shape, feature_dim=FEATURE_DIM, seed=STANDIN_SEED):
+    """
+    Build a deterministic stand-in for the MobileNet feature extractor.
+    
+    The network downsamples the image, applies two seeded convolutions and
+    projects the pooled activations to `feature_dim` features. It does real
+    convolution work so load tests exercise a non-trivial inference path.
+    
+    Args:
+        input_shape (tuple): Image input shape (height, width, channels)
+        feature_dim (int): Size of the output feature vector
+        seed (int): Seed for the weight initializers
+        
+    Returns:
+        tf.keras.Model: Frozen model mapping images to feature vectors
+    """
+    backbone = tf.keras.Sequential([
+        tf.keras.Input(shape=input_shape),
+        tf.keras.layers.AveragePooling2D(pool_size=4),
+        tf.keras.layers.Conv2D(32, 3, strides=2, activation="relu",
+                               kernel_initializer=tf.keras.initializers.GlorotUniform(seed=seed)),
+        tf.keras.layers.Conv2D(64, 3, strides=2, activation="relu",
+                               kernel_initializer=tf.keras.initializers.GlorotUniform(seed=seed + 1)),
+        tf.keras.layers.GlobalAveragePooling2D(),
+        tf.keras.layers.Dense(feature_dim, activation="relu",
+                              kernel_initializer=tf.keras.initializers.GlorotUniform(seed=seed + 2)),
+    ], name="standin_backbone")
+    backbone.trainable = False
+    return backbone
@@ -10,15 +10,24 @@ https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scori
 """
 
 import logging
+import struct
 import numpy as np
 from PIL import Image
 import tensorflow as tf
 
 # Import configuration settings
 from config import MODEL_SETTINGS
+from logging_utils import log_event
 
 logger = logging.getLogger(__name__)
 
+# Header for raw pre-resized frame payloads (see decode_raw_frames; clients
+# encode them with aesthetic_lens_client.frames.encode_raw_frames):
+# magic, version, channels, height, width, reserved, frame count
+RAW_FRAME_MAGIC = b"ALRW"
+RAW_FRAME_VERSION = 1
+RAW_FRAME_HEADER = struct.Struct("<4sBBHHHI")
+
 def preprocess_image(image_path, target_size=None):
     """
     Preprocess an image for the NIMA model.
@@ -39,7 +48,7 @@ def preprocess_image(image_path, target_size=None):
             target_size = MODEL_SETTINGS["input_shape"][:2]  # Get height and width from input_shape
         
         # Load the image
-        logger.info(f"Loading image from {image_path}")
+        log_event(logger, logging.DEBUG, "image.loading", "Loading image", path=image_path)
         img = Image.open(image_path).convert("RGB")
         
         # Resize the image
@@ -55,12 +64,85 @@ def preprocess_image(image_path, target_size=None):
         if len(img_array.shape) != 3:
             raise ValueError(f"Invalid image shape: {img_array.shape}")
         
-        logger.info(f"Image preprocessed successfully: {img_array.shape}")
+        log_event(logger, logging.DEBUG, "image.preprocessed", "Image preprocessed successfully",
+                  path=image_path, shape=img_array.shape)
         return img_array
     except Exception as e:
         logger.error(f"Failed to preprocess image: {str(e)}")
         raise
 
+def preprocess_image_sizes(image_path, target_sizes):
+    """
+    Preprocess an image at several sizes, decoding the file once.
+    
+    Each size after the first is resized from the previous one, so sizes
+    should be given largest first (e.g. the full model's input, then a
+    low-resolution model's).
+    
+    Args:
+        image_path (str): Path to the image file
+        target_sizes (list): Target sizes (height, width), largest first
+        
+    Returns:
+        list: Preprocessed images as numpy arrays, one per size
+        
+    Raises:
+        Exception: If image preprocessing fails
+    """
+    try:
+        img = Image.open(image_path).convert("RGB")
+        
+        arrays = []
+        for target_size in target_sizes:
+            img = img.resize(target_size, Image.LANCZOS)
+            arrays.append(np.array(img) / 255.0)
+        return arrays
+    except Exception as e:
+        logger.error(f"Failed to preprocess image: {str(e)}")
+        raise
+
+def decode_raw_frames(payload, max_frames=None):
+    """
+    Decode a raw frame payload into a uint8 array without copying.
+    
+    The payload is a 16-byte little-endian header (magic "ALRW", version,
+    channels, height, width, reserved, frame count) followed by the frames
+    as uint8 pixels in (n, height, width, channels) order. The frame size
+    must match MODEL_SETTINGS["input_shape"]. The returned array is a
+    read-only view over `payload`.
+    
+    Args:
+        payload (bytes): Request body
+        max_frames (int): Maximum number of frames accepted, if any
+        
+    Returns:
+        numpy.ndarray: uint8 array of shape (n, height, width, channels)
+        
+    Raises:
+        ValueError: If the header or payload size is invalid
+    """
+    if len(payload) < RAW_FRAME_HEADER.size:
+        raise ValueError("Payload is shorter than the frame header")
+    
+    magic, version, channels, height, width, _, count = RAW_FRAME_HEADER.unpack_from(payload)
+    if magic != RAW_FRAME_MAGIC:
+        raise ValueError("Invalid frame header magic")
+    if version != RAW_FRAME_VERSION:
+        raise ValueError(f"Unsupported frame format version: {version}")
+    if (height, width, channels) != tuple(MODEL_SETTINGS["input_shape"]):
+        raise ValueError(f"Frames must be {MODEL_SETTINGS['input_shape']}, got {(height, width, channels)}")
+    if count == 0:
+        raise ValueError("Payload contains no frames")
+    if max_frames is not None and count > max_frames:
+        raise ValueError(f"Too many frames: {count} (maximum {max_frames})")
+    
+    expected_size = RAW_FRAME_HEADER.size + count * height * width * channels
+    if len(payload) != expected_size:
+        raise ValueError(f"Payload size {len(payload)} does not match header ({expected_size} bytes expected)")
+    
+    frames = np.frombuffer(payload, dtype=np.uint8, offset=RAW_FRAME_HEADER.size)
+    return frames.reshape(count, height, width, channels)
+
 def get_feedback_from_score(score):
     """
     Generate feedback based on the aesthetic score.
@@ -10,12 +10,24 @@ https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scori
 """
 
 import os
-import json
+import queue
 import shutil
 import tkinter as tk
 from tkinter import ttk, messagebox
-from PIL import Image, ImageTk
-import datetime
+from PIL import ImageTk
+
+# Import the examples catalog from the main application
+from config import EXAMPLES_DIR
+from examples_catalog import open_catalog
+from duplicates import DuplicateIndex
+from previews import PreviewCache
+
+# Neighbouring images whose previews are prepared ahead of time
+PRELOAD_AHEAD = 3
+PRELOAD_BEHIND = 1
+
+# Milliseconds between checks for previews from the background workers
+POLL_INTERVAL_MS = 30
 
 class ExampleOrganizerApp:
     def __init__(self, root):
@@ -24,17 +36,11 @@ class ExampleOrganizerApp:
         self.root.geometry("900x700")
         
         # Set up paths
-        self.examples_dir = os.path.join("static", "images", "examples")
-        self.metadata_file = os.path.join(self.examples_dir, "examples_metadata.json")
+        self.examples_dir = EXAMPLES_DIR
         
-        # Load existing metadata if available
-        self.metadata = {}
-        if os.path.exists(self.metadata_file):
-            try:
-                with open(self.metadata_file, "r") as f:
-                    self.metadata = json.load(f)
-            except json.JSONDecodeError:
-                self.metadata = {}
+        # Open the examples catalog
+        self.catalog = open_catalog()
+        self.duplicates = DuplicateIndex(self.catalog, self.examples_dir)
         
         # Get list of image files
         self.image_files = self.get_image_files()
@@ -43,6 +49,16 @@ class ExampleOrganizerApp:
         # Set up the UI
         self.setup_ui()
         
+        # Previews are generated in the background; workers hand them to the
+        # Tk thread through this queue
+        self.events = queue.Queue()
+        self.previews = PreviewCache(
+            self.examples_dir,
+            notify=lambda *args: self.events.put(args),
+            convert=ImageTk.PhotoImage
+        )
+        self.root.after(POLL_INTERVAL_MS, self.process_events)
+        
         # Load the first image if available
         if self.image_files:
             self.load_current_image()
@@ -155,8 +171,27 @@ class ExampleOrganizerApp:
         else:
             self.category_var.set("excellent")
     
+    def process_events(self):
+        """Cache previews finished by the background workers and show the current one."""
+        while True:
+            try:
+                filename, image, error = self.events.get_nowait()
+            except queue.Empty:
+                break
+            
+            is_current = bool(self.image_files) and self.image_files[self.current_index] == filename
+            if error is not None:
+                if is_current:
+                    self.status_var.set(f"Error loading image: {error}")
+                continue
+            
+            photo = self.previews.put(filename, image)
+            if is_current:
+                self.show_preview(filename, photo)
+        self.root.after(POLL_INTERVAL_MS, self.process_events)
+    
     def load_current_image(self):
-        """Load and display the current image."""
+        """Show the current image and prepare previews of its neighbours."""
         if not self.image_files:
             return
         
@@ -166,38 +201,29 @@ class ExampleOrganizerApp:
             self.current_index = len(self.image_files) - 1
         
         filename = self.image_files[self.current_index]
-        file_path = os.path.join(self.examples_dir, filename)
         
         # Update file info
         self.file_label.config(text=filename)
         
-        # Load and resize image
-        try:
-            img = Image.open(file_path)
-            
-            # Calculate new dimensions to fit in the window
-            max_width = 800
-            max_height = 400
-            img_width, img_height = img.size
-            
-            # Calculate scaling factor
-            scale = min(max_width / img_width, max_height / img_height)
-            new_width = int(img_width * scale)
-            new_height = int(img_height * scale)
-            
-            # Resize image
-            img = img.resize((new_width, new_height), Image.LANCZOS)
-            
-            # Convert to PhotoImage and display
-            photo = ImageTk.PhotoImage(img)
-            self.image_label.config(image=photo)
-            self.image_label.image = photo  # Keep a reference
-            
-            # Update status
-            self.status_var.set(f"Viewing image {self.current_index + 1} of {len(self.image_files)}: {filename}")
-            
-        except Exception as e:
-            self.status_var.set(f"Error loading image: {str(e)}")
+        photo = self.previews.get(filename)
+        if photo is not None:
+            self.show_preview(filename, photo)
+        else:
+            self.status_var.set(f"Loading image {self.current_index + 1} of {len(self.image_files)}: {filename}")
+        
+        # Current image first, then the next few, then the previous ones
+        start = max(0, self.current_index - PRELOAD_BEHIND)
+        neighbours = self.image_files[self.current_index:self.current_index + PRELOAD_AHEAD + 1]
+        neighbours += self.image_files[start:self.current_index][::-1]
+        self.previews.preload(neighbours)
+    
+    def show_preview(self, filename, photo):
+        """Display a ready preview."""
+        self.image_label.config(image=photo)
+        self.image_label.image = photo  # Keep a reference
+        
+        # Update status
+        self.status_var.set(f"Viewing image {self.current_index + 1} of {len(self.image_files)}: {filename}")
     
     def previous_image(self):
         """Go to the previous image."""
@@ -235,30 +261,22 @@ class ExampleOrganizerApp:
             old_filename = self.image_files[self.current_index]
             old_path = os.path.join(self.examples_dir, old_filename)
             
-            # Count existing examples in this category
-            existing_files = [f for f in os.listdir(self.examples_dir) 
-                             if f.startswith(f"{category}_score_") and f.endswith((".jpg", ".jpeg", ".png"))]
-            next_number = len(existing_files) + 1
+            # Refuse near-duplicates of existing examples
+            phash, matches = self.duplicates.check(old_path)
+            if matches:
+                messagebox.showwarning("Duplicate", f"{old_filename} is a near-duplicate of {matches[0][1]}.")
+                return False
             
-            # Create new filename
+            # Reserve a new filename in this category
             file_ext = os.path.splitext(old_filename)[1].lower()
-            new_filename = f"{category}_score_{next_number}{file_ext}"
+            new_filename = self.catalog.allocate_filename(category, file_ext, self.examples_dir)
             new_path = os.path.join(self.examples_dir, new_filename)
             
             # Rename the file
             shutil.copy2(old_path, new_path)
             
             # Add metadata
-            self.metadata[new_filename] = {
-                "score": score,
-                "contributor": contributor,
-                "description": description,
-                "date_added": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-            
-            # Save metadata
-            with open(self.metadata_file, "w") as f:
-                json.dump(self.metadata, f, indent=4)
+            self.catalog.add(new_filename, category, score, contributor, description, phash=phash)
             
             # Update status
             self.status_var.set(f"Saved {old_filename} as {new_filename}")
@@ -274,6 +292,7 @@ class ExampleOrganizerApp:
         if self.save_current_image():
             # Remove the current file from the list
             old_filename = self.image_files.pop(self.current_index)
+            self.previews.discard(old_filename)
             
             # Delete the original file
             old_path = os.path.join(self.examples_dir, old_filename)
@@ -308,26 +327,23 @@ class ExampleOrganizerApp:
             old_filename = self.image_files[self.current_index]
             old_path = os.path.join(self.examples_dir, old_filename)
             
-            # Count existing examples in this category
-            existing_files = [f for f in os.listdir(self.examples_dir) 
-                             if f.startswith(f"{category}_score_") and f.endswith((".jpg", ".jpeg", ".png"))]
-            next_number = len(existing_files) + 1
+            # Skip near-duplicates of existing examples
+            phash, matches = self.duplicates.check(old_path)
+            if matches:
+                print(f"Skipping {old_filename}: near-duplicate of {matches[0][1]}")
+                self.current_index += 1
+                continue
             
-            # Create new filename
+            # Reserve a new filename in this category
             file_ext = os.path.splitext(old_filename)[1].lower()
-            new_filename = f"{category}_score_{next_number}{file_ext}"
+            new_filename = self.catalog.allocate_filename(category, file_ext, self.examples_dir)
             new_path = os.path.join(self.examples_dir, new_filename)
             
             # Rename the file
             shutil.copy2(old_path, new_path)
             
             # Add metadata
-            self.metadata[new_filename] = {
-                "score": score,
-                "contributor": contributor,
-                "description": description,
-                "date_added": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
+            self.catalog.add(new_filename, category, score, contributor, description, phash=phash)
             
             # Delete the original file
             try:
@@ -339,11 +355,8 @@ class ExampleOrganizerApp:
             self.image_files.pop(self.current_index)
             processed += 1
         
-        # Save metadata
-        with open(self.metadata_file, "w") as f:
-            json.dump(self.metadata, f, indent=4)
-        
         messagebox.showinfo("Complete", f"Processed {processed} images!")
+        self.previews.shutdown()
         self.root.quit()
 
 def main():
@@ -0,0 +1,176 @@
+"""
+Display previews for the example curation tools.
+
+This module creates window-sized previews of example images for the Tk
+curation tools. Previews are decoded at reduced resolution where the format
+allows it, generated on background threads ahead of time, and kept in a
+bounded LRU cache so paging back and forth does not decode anything again.
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import os
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Area the preview must fit in (width, height)
+PREVIEW_SIZE = (800, 400)
+
+# Number of ready previews kept
+PREVIEW_CACHE_SIZE = 32
+
+# Threads generating previews
+PREVIEW_WORKERS = 2
+
+
+def load_preview(path, max_size=PREVIEW_SIZE):
+    """
+    Load an image scaled to fit an area.
+
+    JPEGs are decoded directly at the smallest power-of-two reduction that
+    is still at least the preview size, which skips most of the decoding
+    work for large photos.
+
+    Args:
+        path (str): Path to the image file
+        max_size (tuple): (width, height) to fit
+
+    Returns:
+        PIL.Image.Image: RGB preview image
+    """
+    with Image.open(path) as img:
+        # Calculate scaling factor from the full-resolution size
+        max_width, max_height = max_size
+        scale = min(max_width / img.width, max_height / img.height)
+        new_size = (max(1, int(img.width * scale)), max(1, int(img.height * scale)))
+
+        # Let the JPEG decoder downscale while decoding
+        img.draft("RGB", new_size)
+        return img.convert("RGB").resize(new_size, Image.LANCZOS)
+
+
+class PreviewCache:
+    """
+    LRU cache of display-ready previews with background preloading.
+
+    Previews are generated on worker threads. `notify(filename, image,
+    error)` is called from a worker when one is done; the caller passes the
+    image back to `put` on its UI thread, where it is converted for display
+    (e.g. to an ImageTk.PhotoImage, which must be created on the Tk thread)
+    and cached. An image stays pending until then, so it is not generated
+    twice.
+    """
+
+    def __init__(self, directory, notify, convert=None, capacity=PREVIEW_CACHE_SIZE, max_size=PREVIEW_SIZE,
+                 workers=PREVIEW_WORKERS):
+        """
+        Initialize the cache.
+
+        Args:
+            directory (str): Directory holding the images
+            notify (callable): Called as notify(filename, image, error) from a
+                worker thread when a preview is ready or failed
+            convert (callable): Converts a PIL image for display; identity if None
+            capacity (int): Number of previews kept
+            max_size (tuple): (width, height) previews must fit
+            workers (int): Preview generation threads
+        """
+        self.directory = directory
+        self.notify = notify
+        self.convert = convert or (lambda image: image)
+        self.capacity = capacity
+        self.max_size = max_size
+        self._previews = OrderedDict()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="previews")
+
+    def get(self, filename):
+        """
+        Get a cached preview, marking it recently used.
+
+        Args:
+            filename (str): Image filename
+
+        Returns:
+            The converted preview, or None if it is not cached
+        """
+        with self._lock:
+            preview = self._previews.get(filename)
+            if preview is not None:
+                self._previews.move_to_end(filename)
+            return preview
+
+    def put(self, filename, image):
+        """
+        Convert and cache a preview produced by a worker. Call on the UI thread.
+
+        Args:
+            filename (str): Image filename
+            image (PIL.Image.Image): Preview from the notify callback
+
+        Returns:
+            The converted preview
+        """
+        preview = self.convert(image)
+        with self._lock:
+            self._pending.discard(filename)
+            self._previews[filename] = preview
+            self._previews.move_to_end(filename)
+            while len(self._previews) > self.capacity:
+                self._previews.popitem(last=False)
+        return preview
+
+    def preload(self, filenames):
+        """
+        Generate previews that are neither cached nor already being generated.
+
+        Args:
+            filenames (list): Images in priority order (the current one first)
+        """
+        with self._lock:
+            wanted = [f for f in filenames if f not in self._previews and f not in self._pending]
+            self._pending.update(wanted)
+        for filename in wanted:
+            self._executor.submit(self._load, filename)
+
+    def discard(self, filename):
+        """
+        Drop the preview of an image that was moved or deleted.
+
+        Args:
+            filename (str): Image filename
+        """
+        with self._lock:
+            self._previews.pop(filename, None)
+
+    def shutdown(self):
+        """
+        Stop the workers, abandoning queued previews.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _load(self, filename):
+        """
+        Generate one preview and hand it to the notify callback. Runs on a worker.
+
+        Args:
+            filename (str): Image filename
+        """
+        image, error = None, None
+        try:
+            image = load_preview(os.path.join(self.directory, filename), self.max_size)
+        except Exception as e:
+            error = str(e)
+            logger.warning(f"Could not load preview of {filename}: {error}")
+            with self._lock:
+                self._pending.discard(filename)
+        self.notify(filename, image, error)
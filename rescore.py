@@ -0,0 +1,208 @@
+"""
+Incremental re-scoring of the examples library.
+
+This module re-scores example images after the model changes. The catalog
+keeps a manifest recording, for every example, the content hash of the
+image and the version of the model that scored it. A run re-scores only the
+examples whose image or model version differs from the manifest, in batches,
+and writes each batch of scores back in a single transaction. Files whose
+size and modification time match the manifest are not re-hashed, so a run
+over an up-to-date library only stats the files.
+
+Usage:
+    python rescore.py [--force] [--dry-run] [--batch-size 32]
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import os
+import time
+import hashlib
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Import configuration settings
+from config import EXAMPLES_DB, EXAMPLES_DIR, RESCORE_SETTINGS
+from examples_catalog import open_catalog
+from model.nima_model import NimaModel
+from model.utils import preprocess_image
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(path):
+    """
+    Get the SHA-256 hash of a file's content.
+
+    Args:
+        path (str): Path to the file
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_stale(catalog, examples_dir, model_version, force=False):
+    """
+    Compare the examples against the score manifest.
+
+    Args:
+        catalog (ExamplesCatalog): Catalog holding the examples and manifest
+        examples_dir (str): Directory holding the example images
+        model_version (str): Version of the model that would score them
+        force (bool): Treat every example as stale
+
+    Returns:
+        tuple: (stale, touched) lists of manifest entries. Stale examples need
+            a new score; touched examples have a new modification time but
+            unchanged content and only need their manifest entry refreshed.
+            Missing image files are skipped.
+    """
+    manifest = catalog.score_manifest()
+    stale, touched = [], []
+
+    for example in catalog.list_examples():
+        filename = example["filename"]
+        path = os.path.join(examples_dir, filename)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            logger.warning(f"Skipping example without an image file: {filename}")
+            continue
+
+        entry = manifest.get(filename)
+        same_file = entry is not None and (entry["size"], entry["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns)
+        current = {
+            "filename": filename,
+            "score": example["score"],
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "content_hash": entry["content_hash"] if same_file else content_hash(path),
+            "model_version": model_version,
+        }
+
+        if force or entry is None or entry["model_version"] != model_version \
+                or entry["content_hash"] != current["content_hash"]:
+            stale.append(current)
+        elif not same_file:
+            touched.append(current)
+
+    return stale, touched
+
+
+def _load(path):
+    """
+    Preprocess an image for the model, returning None if it cannot be read.
+
+    Args:
+        path (str): Path to the image file
+
+    Returns:
+        numpy.ndarray: Preprocessed image, or None
+    """
+    try:
+        return preprocess_image(path)
+    except Exception:
+        return None
+
+
+def rescore(catalog, model, examples_dir=EXAMPLES_DIR, batch_size=None, decode_workers=None,
+            force=False, dry_run=False):
+    """
+    Re-score the examples whose image or model version changed.
+
+    Images for the next batch are decoded on worker threads while the model
+    scores the current one. Each batch is written back as soon as it is
+    scored, so an interrupted run keeps its progress.
+
+    Args:
+        catalog (ExamplesCatalog): Catalog holding the examples and manifest
+        model: Model with a `version` attribute and `predict_batch(images)`
+        examples_dir (str): Directory holding the example images
+        batch_size (int): Images per model call (default from config)
+        decode_workers (int): Image decoding threads (default from config)
+        force (bool): Re-score every example
+        dry_run (bool): Score but do not write anything back
+
+    Returns:
+        dict: Counts of examples "checked", "rescored", "changed" (score
+            differs from the stored one) and "failed" (unreadable images)
+    """
+    batch_size = batch_size or RESCORE_SETTINGS["batch_size"]
+    decode_workers = decode_workers or RESCORE_SETTINGS["decode_workers"]
+
+    stale, touched = find_stale(catalog, examples_dir, model.version, force)
+    summary = {"checked": catalog.count(), "rescored": 0, "changed": 0, "failed": 0}
+    logger.info(f"{len(stale)} of {summary['checked']} examples need re-scoring with model {model.version}")
+
+    if touched and not dry_run:
+        catalog.update_scores(touched)
+
+    batches = [stale[start:start + batch_size] for start in range(0, len(stale), batch_size)]
+    with ThreadPoolExecutor(max_workers=decode_workers, thread_name_prefix="rescore") as pool:
+        def decode(batch):
+            return [pool.submit(_load, os.path.join(examples_dir, entry["filename"])) for entry in batch]
+
+        pending = decode(batches[0]) if batches else []
+        for index, batch in enumerate(batches):
+            images = [future.result() for future in pending]
+            # Start decoding the next batch before running the model
+            pending = decode(batches[index + 1]) if index + 1 < len(batches) else []
+
+            entries = [entry for entry, image in zip(batch, images) if image is not None]
+            summary["failed"] += len(batch) - len(entries)
+            if not entries:
+                continue
+
+            scores = model.predict_batch(np.stack([image for image in images if image is not None]))
+            results = []
+            for entry, score in zip(entries, scores):
+                if round(float(score), 2) != round(entry["score"], 2):
+                    summary["changed"] += 1
+                results.append(dict(entry, score=score))
+
+            if not dry_run:
+                catalog.update_scores(results)
+            summary["rescored"] += len(results)
+
+    return summary
+
+
+def main():
+    """
+    Command-line entry point for re-scoring the examples library.
+    """
+    parser = argparse.ArgumentParser(description="Re-score examples whose image or model changed")
+    parser.add_argument("--force", action="store_true", help="Re-score every example")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    parser.add_argument("--batch-size", type=int, default=RESCORE_SETTINGS["batch_size"], help="Images per model call")
+    parser.add_argument("--dir", type=str, default=EXAMPLES_DIR, help="Directory of example images")
+    parser.add_argument("--db", type=str, default=EXAMPLES_DB, help="Path to the catalog database")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    catalog = open_catalog(args.db)
+    model = NimaModel()
+
+    start = time.perf_counter()
+    summary = rescore(catalog, model, args.dir, batch_size=args.batch_size, force=args.force, dry_run=args.dry_run)
+    elapsed = time.perf_counter() - start
+
+    action = "would change" if args.dry_run else "changed"
+    print(f"Checked {summary['checked']} examples in {elapsed:.1f}s: re-scored {summary['rescored']}, "
+          f"{action} {summary['changed']}, {summary['failed']} unreadable")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Streaming score distribution for percentile ranks.
+
+This module keeps a fixed-bin histogram of every score the application has
+produced. Scores are rounded to 0.01 on the 1-10 scale, so 901 bins hold the
+distribution exactly. Each worker counts scores in memory and periodically
+merges its counts into a shared SQLite table, then reloads the merged totals,
+so every worker ranks against the scores of all workers. A percentile query
+is one lookup in a prefix-sum array.
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import time
+import sqlite3
+import logging
+import threading
+import numpy as np
+
+# Import configuration settings
+from config import SCORES_DB, SCORE_HISTOGRAM_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS score_histogram (
+    bin INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+"""
+
+# Score range and resolution of the histogram
+MIN_SCORE = 1.0
+MAX_SCORE = 10.0
+BINS_PER_POINT = 100
+NUM_BINS = int((MAX_SCORE - MIN_SCORE) * BINS_PER_POINT) + 1
+
+
+def score_to_bin(score):
+    """
+    Map a score to its histogram bin.
+
+    Args:
+        score (float): Aesthetic score; values outside 1-10 are clamped
+
+    Returns:
+        int: Bin index in [0, NUM_BINS)
+    """
+    index = int(round((score - MIN_SCORE) * BINS_PER_POINT))
+    return min(max(index, 0), NUM_BINS - 1)
+
+
+class ScoreHistogram:
+    """
+    Score histogram shared across workers through SQLite.
+
+    Recording a score is an in-memory increment. Pending counts are merged
+    into the database at most every `flush_interval` seconds, by the request
+    that finds the interval has passed.
+    """
+
+    def __init__(self, db_path=SCORES_DB, flush_interval=None, min_samples=None):
+        """
+        Open (and if needed create) the histogram database.
+
+        Args:
+            db_path (str): Path to the SQLite database file
+            flush_interval (float): Seconds between merges with the database
+            min_samples (int): Scores needed before percentiles are reported
+        """
+        self.db_path = db_path
+        self.flush_interval = flush_interval if flush_interval is not None else SCORE_HISTOGRAM_SETTINGS["flush_interval"]
+        self.min_samples = min_samples if min_samples is not None else SCORE_HISTOGRAM_SETTINGS["min_samples"]
+
+        self._pending = np.zeros(NUM_BINS, dtype=np.int64)
+        self._counts = np.zeros(NUM_BINS, dtype=np.int64)
+        self._cumulative = np.zeros(NUM_BINS + 1, dtype=np.int64)
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+        self.flush()
+
+    def _connect(self):
+        """
+        Open a connection to the histogram database.
+
+        Returns:
+            sqlite3.Connection: New connection
+        """
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def record(self, scores):
+        """
+        Add scores to the distribution.
+
+        Args:
+            scores: A score or an iterable of scores
+        """
+        if isinstance(scores, (int, float)):
+            scores = [scores]
+
+        with self._lock:
+            for score in scores:
+                index = score_to_bin(score)
+                self._pending[index] += 1
+                self._counts[index] += 1
+            self._cumulative[1:] = np.cumsum(self._counts)
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+
+        if due:
+            self.flush()
+
+    def percentile(self, score):
+        """
+        Get the percentage of recorded scores below a score.
+
+        Ties count half, so the median score ranks at 50.
+
+        Args:
+            score (float): Aesthetic score
+
+        Returns:
+            float: Percentile in [0, 100] rounded to 1 decimal place, or None
+                if fewer than `min_samples` scores have been recorded
+        """
+        index = score_to_bin(score)
+        with self._lock:
+            total = int(self._cumulative[-1])
+            if total < self.min_samples:
+                return None
+            below = int(self._cumulative[index])
+            equal = int(self._counts[index])
+        return round(100.0 * (below + equal / 2.0) / total, 1)
+
+    def total(self):
+        """
+        Count the recorded scores.
+
+        Returns:
+            int: Number of scores across all workers (as of the last merge)
+                plus this worker's pending ones
+        """
+        with self._lock:
+            return int(self._cumulative[-1])
+
+    def flush(self):
+        """
+        Merge this worker's pending counts into the database and reload the
+        merged totals of all workers.
+        """
+        with self._lock:
+            pending = self._pending
+            self._pending = np.zeros(NUM_BINS, dtype=np.int64)
+            self._last_flush = time.monotonic()
+
+        rows = [(int(index), int(pending[index])) for index in np.flatnonzero(pending)]
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT INTO score_histogram (bin, count) VALUES (?, ?) "
+                    "ON CONFLICT(bin) DO UPDATE SET count = count + excluded.count",
+                    rows
+                )
+                merged = conn.execute("SELECT bin, count FROM score_histogram").fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not merge score histogram: {str(e)}")
+            with self._lock:
+                self._pending += pending
+            return
+
+        counts = np.zeros(NUM_BINS, dtype=np.int64)
+        for index, count in merged:
+            if 0 <= index < NUM_BINS:
+                counts[index] = count
+
+        with self._lock:
+            # Scores recorded while the merge ran are still pending; keep them
+            self._counts = counts + self._pending
+            self._cumulative[1:] = np.cumsum(self._counts)
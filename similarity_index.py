@@ -0,0 +1,267 @@
+"""
+Nearest-neighbour index of example image embeddings.
+
+This module keeps the L2-normalized backbone feature vector of every example
+in one contiguous matrix, so finding the examples most similar to an upload
+is a single matrix-vector product. The index follows the examples catalog
+incrementally through its change log and is persisted between runs.
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import os
+import logging
+import tempfile
+import threading
+import numpy as np
+
+# Import configuration settings
+from config import SIMILARITY_INDEX_FILE
+
+logger = logging.getLogger(__name__)
+
+# Number of images embedded per model call while syncing
+EMBED_BATCH_SIZE = 32
+
+
+class SimilarityIndex:
+    """
+    Cosine-similarity index over example embeddings.
+
+    Vectors are stored row by row in a preallocated matrix that doubles in
+    capacity when full. Adding an example writes one row; deleting one moves
+    the last row into its place. The matrix is persisted as float16, which
+    halves the file size, and held as float32 in memory because numpy only
+    has BLAS-accelerated matrix products for float32 and float64.
+    """
+
+    def __init__(self, backbone, dim=None):
+        """
+        Initialize an empty index.
+
+        Args:
+            backbone (str): Model backbone the embeddings come from; a saved
+                index built with another backbone is discarded on load
+            dim (int): Embedding size; taken from the first vector if None
+        """
+        self.backbone = backbone
+        self.catalog_version = None
+        self._vectors = np.zeros((0, dim or 0), dtype=np.float32)
+        self._filenames = []
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._filenames)
+
+    def __contains__(self, filename):
+        return filename in self._rows
+
+    def add(self, filename, vector):
+        """
+        Add or replace the embedding of an example.
+
+        Args:
+            filename (str): Example filename
+            vector (numpy.ndarray): Feature vector of shape (dim,)
+        """
+        vector = _normalize(np.asarray(vector, dtype=np.float32).reshape(-1))
+
+        with self._lock:
+            if self._vectors.shape[1] != vector.shape[0]:
+                if self._filenames:
+                    raise ValueError(f"Expected a vector of size {self._vectors.shape[1]}, got {vector.shape[0]}")
+                self._vectors = np.zeros((0, vector.shape[0]), dtype=np.float32)
+
+            row = self._rows.get(filename)
+            if row is None:
+                row = len(self._filenames)
+                if row == len(self._vectors):
+                    self._grow()
+                self._filenames.append(filename)
+                self._rows[filename] = row
+            self._vectors[row] = vector
+
+    def remove(self, filename):
+        """
+        Remove an example from the index.
+
+        Args:
+            filename (str): Example filename
+
+        Returns:
+            bool: True if the example was indexed
+        """
+        with self._lock:
+            row = self._rows.pop(filename, None)
+            if row is None:
+                return False
+
+            last = len(self._filenames) - 1
+            if row != last:
+                moved = self._filenames[last]
+                self._vectors[row] = self._vectors[last]
+                self._filenames[row] = moved
+                self._rows[moved] = row
+            self._filenames.pop()
+            return True
+
+    def query(self, vector, k=4, exclude=()):
+        """
+        Find the examples most similar to a feature vector.
+
+        Args:
+            vector (numpy.ndarray): Query feature vector of shape (dim,)
+            k (int): Number of results
+            exclude (iterable): Filenames to leave out of the results
+
+        Returns:
+            list: (filename, cosine similarity) tuples, most similar first
+        """
+        query = _normalize(np.asarray(vector, dtype=np.float32).reshape(-1))
+        exclude = set(exclude)
+
+        with self._lock:
+            count = len(self._filenames)
+            if count == 0 or k <= 0:
+                return []
+            similarities = self._vectors[:count] @ query
+
+            # Partial sort: only the top candidates are ordered
+            wanted = min(count, k + len(exclude))
+            top = np.argpartition(-similarities, wanted - 1)[:wanted]
+            top = top[np.argsort(-similarities[top])]
+            results = [(self._filenames[i], float(similarities[i])) for i in top]
+
+        return [(filename, similarity) for filename, similarity in results if filename not in exclude][:k]
+
+    def sync(self, catalog, examples_dir, embed):
+        """
+        Bring the index up to date with the examples catalog.
+
+        Only examples changed since the last sync are embedded; if the change
+        log no longer reaches back that far, the index is reconciled against
+        the whole catalog, still embedding only examples it does not hold.
+
+        Args:
+            catalog (ExamplesCatalog): Catalog to follow
+            examples_dir (str): Directory holding the example images
+            embed (callable): Maps a list of image paths to one feature vector
+                per path, or None for images that cannot be read
+
+        Returns:
+            int: Number of examples added or removed
+        """
+        version = catalog.version()
+        if version == self.catalog_version:
+            return 0
+
+        changes = None
+        if self.catalog_version is not None and self.catalog_version < version:
+            changes = catalog.changes_since(self.catalog_version)
+
+        if changes is None or any(op == "reset" for _, op, _ in changes):
+            wanted = {example["filename"] for example in catalog.list_examples()}
+            stale = [filename for filename in list(self._filenames) if filename not in wanted]
+            missing = [filename for filename in sorted(wanted) if filename not in self]
+        else:
+            changed = dict.fromkeys(filename for _, _, filename in changes if filename)
+            stale = [filename for filename in changed if catalog.get(filename) is None]
+            missing = [filename for filename in changed if filename not in stale and filename not in self]
+
+        for filename in stale:
+            self.remove(filename)
+
+        missing = [f for f in missing if os.path.exists(os.path.join(examples_dir, f))]
+        for start in range(0, len(missing), EMBED_BATCH_SIZE):
+            batch = missing[start:start + EMBED_BATCH_SIZE]
+            vectors = embed([os.path.join(examples_dir, filename) for filename in batch])
+            for filename, vector in zip(batch, vectors):
+                if vector is not None:
+                    self.add(filename, vector)
+
+        self.catalog_version = version
+        if stale or missing:
+            logger.info(f"Similarity index synced: {len(missing)} added, {len(stale)} removed, {len(self)} total")
+        return len(stale) + len(missing)
+
+    def save(self, path=SIMILARITY_INDEX_FILE):
+        """
+        Write the index to disk atomically.
+
+        Args:
+            path (str): Destination .npz file
+        """
+        with self._lock:
+            vectors = self._vectors[:len(self._filenames)].astype(np.float16)
+            filenames = np.array(self._filenames, dtype=str)
+
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, vectors=vectors, filenames=filenames, backbone=np.array(self.backbone),
+                         catalog_version=np.array(-1 if self.catalog_version is None else self.catalog_version))
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, backbone, path=SIMILARITY_INDEX_FILE):
+        """
+        Load a saved index, or create an empty one.
+
+        Args:
+            backbone (str): Model backbone in use
+            path (str): Saved .npz file
+
+        Returns:
+            SimilarityIndex: The loaded index, or an empty index if the file
+                is missing, unreadable or was built with another backbone
+        """
+        index = cls(backbone)
+        if not os.path.exists(path):
+            return index
+
+        try:
+            with np.load(path) as data:
+                if str(data["backbone"]) != backbone:
+                    logger.info("Similarity index was built with another backbone; rebuilding")
+                    return index
+                vectors = data["vectors"].astype(np.float32)
+                filenames = [str(filename) for filename in data["filenames"]]
+                version = int(data["catalog_version"])
+        except Exception as e:
+            logger.warning(f"Could not load similarity index from {path}: {str(e)}")
+            return index
+
+        index._vectors = vectors
+        index._filenames = filenames
+        index._rows = {filename: row for row, filename in enumerate(filenames)}
+        index.catalog_version = None if version < 0 else version
+        return index
+
+    def _grow(self):
+        """
+        Double the matrix capacity. Called with the lock held.
+        """
+        capacity = max(16, 2 * len(self._vectors))
+        vectors = np.zeros((capacity, self._vectors.shape[1]), dtype=np.float32)
+        vectors[:len(self._vectors)] = self._vectors
+        self._vectors = vectors
+
+
+def _normalize(vector):
+    """
+    Scale a vector to unit L2 norm.
+
+    Args:
+        vector (numpy.ndarray): Vector to normalize
+
+    Returns:
+        numpy.ndarray: Unit vector (zero vectors are returned unchanged)
+    """
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
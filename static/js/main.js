@@ -2,7 +2,8 @@
  * Aesthetic Lens - Main JavaScript
  * 
  * This file handles the interactive elements of the Aesthetic Lens application,
- * including file uploads, drag and drop functionality, and form submissions.
+ * including file uploads, drag and drop functionality, form submissions, and
+ * infinite scrolling of the example galleries.
  */
 
 document.addEventListener("DOMContentLoaded", function() {
@@ -118,4 +119,142 @@ document.addEventListener("DOMContentLoaded", function() {
             scoreValue.parentElement.style.backgroundColor = "#28a745"; // Success/green
         }
     }
+    
+    // Load further gallery pages from /api/examples as the user scrolls
+    document.querySelectorAll("[data-infinite-scroll]").forEach(setupInfiniteScroll);
 });
+
+/**
+ * Create an element with optional class names and text content.
+ */
+function createElement(tag, className, text) {
+    const element = document.createElement(tag);
+    if (className) {
+        element.className = className;
+    }
+    if (text !== undefined) {
+        element.textContent = text;
+    }
+    return element;
+}
+
+/**
+ * Build a gallery card, matching the server-rendered markup in examples.html.
+ */
+function renderExampleCard(example, container) {
+    const column = createElement("div", "col-md-4 mb-3");
+    const card = createElement("div", "example-image-card");
+    
+    const img = createElement("img", "img-fluid rounded");
+    img.src = example.thumbnail_url;
+    img.srcset = example.thumbnail_srcset;
+    img.sizes = "(min-width: 768px) 33vw, 100vw";
+    img.alt = container.dataset.alt || "Example image";
+    img.loading = "lazy";
+    
+    card.append(
+        img,
+        createElement("div", "score-badge", `Score: ${example.score.toFixed(1)}`),
+        createElement("p", "text-muted mt-2", example.description),
+        createElement("p", "text-muted small", `Contributed by: ${example.contributor}`)
+    );
+    column.appendChild(card);
+    return column;
+}
+
+/**
+ * Build an admin table row, matching the server-rendered markup in admin_examples.html.
+ */
+function renderExampleRow(example, container) {
+    const row = document.createElement("tr");
+    
+    const img = createElement("img", "img-thumbnail");
+    img.src = example.thumbnail_url;
+    img.srcset = example.thumbnail_srcset;
+    img.sizes = "100px";
+    img.alt = "Example image";
+    img.style.maxWidth = "100px";
+    img.loading = "lazy";
+    const imageCell = document.createElement("td");
+    imageCell.appendChild(img);
+    
+    const category = example.category.charAt(0).toUpperCase() + example.category.slice(1);
+    
+    const form = createElement("form", "d-inline");
+    form.action = container.dataset.deleteUrl;
+    form.method = "post";
+    const input = document.createElement("input");
+    input.type = "hidden";
+    input.name = "filename";
+    input.value = example.filename;
+    const button = createElement("button", "btn btn-sm btn-danger");
+    button.type = "submit";
+    button.appendChild(createElement("i", "fas fa-trash"));
+    button.addEventListener("click", function(e) {
+        if (!confirm("Are you sure you want to delete this example?")) {
+            e.preventDefault();
+        }
+    });
+    form.append(input, button);
+    const actionCell = document.createElement("td");
+    actionCell.appendChild(form);
+    
+    row.append(
+        imageCell,
+        createElement("td", null, category),
+        createElement("td", null, example.score.toFixed(1)),
+        createElement("td", null, example.description),
+        createElement("td", null, example.contributor),
+        actionCell
+    );
+    return row;
+}
+
+/**
+ * Append pages from /api/examples to a container when its end scrolls into view.
+ *
+ * The container carries the API URL, the optional category and the cursor of
+ * the next page in data attributes; an empty cursor means there are no more pages.
+ */
+function setupInfiniteScroll(container) {
+    if (!container.dataset.nextCursor || !("IntersectionObserver" in window)) {
+        return;
+    }
+    
+    const render = container.dataset.infiniteScroll === "row" ? renderExampleRow : renderExampleCard;
+    const sentinel = container.tagName === "TBODY"
+        ? container.closest("table").parentElement.appendChild(document.createElement("div"))
+        : container.parentElement.appendChild(document.createElement("div"));
+    let loading = false;
+    
+    const observer = new IntersectionObserver(function(entries) {
+        if (!entries.some(entry => entry.isIntersecting) || loading) {
+            return;
+        }
+        loading = true;
+        
+        const params = new URLSearchParams({cursor: container.dataset.nextCursor});
+        if (container.dataset.category) {
+            params.set("category", container.dataset.category);
+        }
+        
+        fetch(`${container.dataset.apiUrl}?${params}`)
+            .then(response => response.ok ? response.json() : Promise.reject(response.status))
+            .then(page => {
+                page.examples.forEach(example => container.appendChild(render(example, container)));
+                container.dataset.nextCursor = page.next_cursor || "";
+                if (!page.next_cursor) {
+                    observer.disconnect();
+                    sentinel.remove();
+                } else {
+                    // Re-observe so a sentinel that is still visible triggers the next page
+                    observer.unobserve(sentinel);
+                    observer.observe(sentinel);
+                }
+            })
+            .catch(error => console.error("Error loading examples:", error))
+            .finally(() => { loading = false; });
+    }, {rootMargin: "400px"});
+    
+    observer.observe(sentinel);
+}
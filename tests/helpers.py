@@ -0,0 +1,33 @@
+"""
+Shared test helpers
+
+This module contains stand-ins used by several test modules.
+"""
+
+
+class FakeModel:
+    """
+    Model stand-in that gives every image the same score and records batch sizes.
+    """
+
+    def __init__(self, version="v1", score=6.0):
+        self.version = version
+        self.score = score
+        self.batches = []
+
+    @property
+    def scored(self):
+        """
+        Number of images scored so far.
+        """
+        return sum(self.batches)
+
+    def warm_up(self, batch_size=1):
+        return 1.0
+
+    def predict(self, image):
+        return self.predict_batch([image])[0]
+
+    def predict_batch(self, images):
+        self.batches.append(len(images))
+        return [self.score] * len(images)
@@ -0,0 +1,96 @@
+"""
+Unit tests for the example analyzer's background prefetcher
+
+This module contains unit tests for loading and scoring images ahead of the
+one being reviewed, without a display.
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+from PIL import Image
+
+from analyze_examples import ImagePrefetcher
+
+
+class FakeModel:
+    """
+    Model stand-in that records the thread each prediction runs on.
+    """
+
+    def __init__(self):
+        self.threads = set()
+
+    def predict(self, image):
+        self.threads.add(threading.current_thread().name)
+        return 7.5
+
+
+class TestImagePrefetcher(unittest.TestCase):
+    """
+    Test cases for the image prefetcher.
+    """
+
+    def setUp(self):
+        """
+        Create five images and a prefetcher over them.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.filenames = [f"photo_{i}.jpg" for i in range(5)]
+        for filename in self.filenames:
+            Image.new("RGB", (1600, 1200), color="teal").save(os.path.join(self.temp_dir.name, filename))
+
+        self.model = FakeModel()
+        self.ready = threading.Semaphore(0)
+        self.prefetcher = ImagePrefetcher(
+            self.model, self.temp_dir.name, notify=lambda filename: self.ready.release(), depth=2
+        )
+
+    def tearDown(self):
+        """
+        Stop the prefetcher and remove the temporary directory.
+        """
+        self.prefetcher.shutdown()
+        self.temp_dir.cleanup()
+
+    def wait_for(self, count):
+        """
+        Wait until `count` more images are ready.
+        """
+        for _ in range(count):
+            self.assertTrue(self.ready.acquire(timeout=10))
+
+    def test_prefetches_current_and_next_images(self):
+        """
+        Test that the current image and `depth` more are loaded, resized and scored off the caller's thread.
+        """
+        self.prefetcher.prefetch(self.filenames)
+        self.wait_for(3)
+
+        result = self.prefetcher.get(self.filenames[0])
+        self.assertEqual(result["score"], 7.5)
+        self.assertEqual(result["image"].size, (533, 400))
+        self.assertIsNotNone(self.prefetcher.get(self.filenames[2]))
+        self.assertIsNone(self.prefetcher.get(self.filenames[3]))
+        self.assertNotIn(threading.current_thread().name, self.model.threads)
+
+    def test_moving_on_drops_old_results(self):
+        """
+        Test that results behind the window are released and unreadable images report an error.
+        """
+        with open(os.path.join(self.temp_dir.name, self.filenames[3]), "w") as f:
+            f.write("not an image")
+
+        self.prefetcher.prefetch(self.filenames)
+        self.wait_for(3)
+        self.prefetcher.prefetch(self.filenames[2:])
+        self.wait_for(2)
+
+        self.assertIsNone(self.prefetcher.get(self.filenames[0]))
+        self.assertIsNotNone(self.prefetcher.get(self.filenames[4]))
+        self.assertIsNotNone(self.prefetcher.get(self.filenames[3])["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
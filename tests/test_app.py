@@ -0,0 +1,132 @@
+"""
+Unit tests for the Flask routes
+
+This module contains unit tests for the JSON scoring API routes and
+versioned thumbnail URLs.
+"""
+
+import io
+import os
+import tempfile
+import unittest
+
+from unittest import mock
+from PIL import Image
+
+import app as app_module
+from derivatives import DerivativeCache
+from model.loader import ModelLoader
+from score_stats import ScoreHistogram
+from tests.helpers import FakeModel
+
+
+class TestApiScore(unittest.TestCase):
+    """
+    Test cases for the /api/score route.
+    """
+
+    def setUp(self):
+        """
+        Point the app at a ready stand-in model and an empty score histogram.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+        self.original_loader = app_module.model_loader
+        self.original_histogram = app_module.score_histogram
+        loader = ModelLoader(FakeModel)
+        loader.load()
+        app_module.model_loader = loader
+        app_module.score_histogram = ScoreHistogram(os.path.join(self.temp_dir.name, "scores.db"), min_samples=0)
+        self.client = app_module.app.test_client()
+
+    def tearDown(self):
+        """
+        Restore the app's model loader and score histogram.
+        """
+        app_module.model_loader = self.original_loader
+        app_module.score_histogram = self.original_histogram
+
+    def post_image(self):
+        buffer = io.BytesIO()
+        Image.new("RGB", (64, 48), color=(90, 120, 30)).save(buffer, format="JPEG")
+        buffer.seek(0)
+        return self.client.post("/api/score", data={"file": (buffer, "photo.jpg")},
+                                content_type="multipart/form-data")
+
+    def test_scores_ranks_and_records_once(self):
+        """
+        Test that a scored image gets feedback and a percentile and is counted once.
+        """
+        app_module.score_histogram.record([2.0, 9.0])
+
+        response = self.post_image()
+
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.addCleanup(os.remove, os.path.join(app_module.app.config["UPLOAD_FOLDER"], body["filename"]))
+        self.assertEqual(body["score"], 6.0)
+        self.assertEqual(body["percentile"], 50.0)
+        self.assertIsInstance(body["feedback"], str)
+        self.assertTrue(body["feedback"])
+        self.assertEqual(app_module.score_histogram.total(), 3)
+
+
+class TestThumbnails(unittest.TestCase):
+    """
+    Test cases for thumbnail URLs and caching headers.
+    """
+
+    def setUp(self):
+        """
+        Serve examples and variants from a temporary directory.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.examples_dir = os.path.join(self.temp_dir.name, "examples")
+        os.makedirs(self.examples_dir)
+
+        for name, value in (("EXAMPLES_DIR", self.examples_dir),
+                            ("derivative_cache", DerivativeCache(os.path.join(self.temp_dir.name, "derivatives")))):
+            patcher = mock.patch.object(app_module, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = app_module.app.test_client()
+
+    def write_example(self, color, mtime):
+        path = os.path.join(self.examples_dir, "high_score_1.jpg")
+        Image.new("RGB", (400, 300), color=color).save(path)
+        os.utime(path, ns=(mtime, mtime))
+
+    def url(self):
+        with app_module.app.test_request_context():
+            return app_module.thumbnail_url("examples", 320, "high_score_1.jpg")
+
+    def test_replacing_example_changes_url(self):
+        """
+        Test that a replaced example gets a new immutable URL and old URLs revalidate.
+        """
+        self.write_example((200, 40, 40), 1_000_000_000)
+        old_url = self.url()
+        self.assertIn("?v=", old_url)
+        self.assertEqual(self.url(), old_url)
+
+        response = self.client.get(old_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.cache_control.immutable)
+        self.assertEqual(response.cache_control.max_age, app_module.DERIVATIVE_SETTINGS["max_age"])
+
+        self.write_example((40, 40, 200), 2_000_000_000)
+        new_url = self.url()
+        self.assertNotEqual(new_url, old_url)
+        self.assertTrue(self.client.get(new_url).cache_control.immutable)
+
+        stale = self.client.get(old_url)
+        self.assertEqual(stale.status_code, 200)
+        self.assertFalse(stale.cache_control.immutable)
+        self.assertTrue(stale.cache_control.no_cache)
+        self.assertNotEqual(stale.headers["ETag"], response.headers["ETag"])
+
+
+if __name__ == "__main__":
+    unittest.main()
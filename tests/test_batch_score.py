@@ -0,0 +1,125 @@
+"""
+Unit tests for the batch scorer
+
+This module contains unit tests for finding images, writing results in each
+output format and resuming an interrupted run.
+"""
+
+import os
+import csv
+import json
+import tempfile
+import unittest
+from PIL import Image
+
+from batch_score import _LineWriter, find_images, score_directory
+from tests.helpers import FakeModel
+
+
+class TestBatchScore(unittest.TestCase):
+    """
+    Test cases for batch scoring a directory tree.
+    """
+
+    def setUp(self):
+        """
+        Create a directory tree with four images, one unreadable file and one non-image.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, "images")
+        os.makedirs(os.path.join(self.root, "trip", "day1"))
+
+        for path in ("a.jpg", "b.png", "trip/c.JPG", "trip/day1/d.jpeg"):
+            Image.new("RGB", (32, 32), color="gray").save(os.path.join(self.root, path), format="PNG")
+        with open(os.path.join(self.root, "trip", "broken.jpg"), "w") as f:
+            f.write("not an image")
+        with open(os.path.join(self.root, "notes.txt"), "w") as f:
+            f.write("ignored")
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        self.temp_dir.cleanup()
+
+    def test_find_images(self):
+        """
+        Test that images are found recursively, by extension, in sorted order.
+        """
+        self.assertEqual(
+            find_images(self.root),
+            ["a.jpg", "b.png", "trip/broken.jpg", "trip/c.JPG", "trip/day1/d.jpeg"]
+        )
+
+    def test_jsonl_output_and_errors(self):
+        """
+        Test that every image gets a record and unreadable ones get an error.
+        """
+        output = os.path.join(self.temp_dir.name, "out.jsonl")
+        summary = score_directory(self.root, output, model=FakeModel(), batch_size=2)
+
+        self.assertEqual(summary, {"found": 5, "skipped": 0, "scored": 4, "failed": 1})
+        with open(output) as f:
+            records = {record["path"]: record for record in map(json.loads, f)}
+        self.assertEqual(records["trip/c.JPG"]["score"], 6.0)
+        self.assertIsNone(records["trip/broken.jpg"]["score"])
+        self.assertTrue(records["trip/broken.jpg"]["error"])
+
+    def test_resume_skips_finished_files(self):
+        """
+        Test that a rerun after a crash mid-line only scores the missing files.
+        """
+        output = os.path.join(self.temp_dir.name, "out.jsonl")
+        score_directory(self.root, output, model=FakeModel(), batch_size=2)
+
+        # Simulate a run killed while writing the last record
+        with open(output) as f:
+            lines = f.readlines()
+        with open(output, "w") as f:
+            f.writelines(lines[:-1])
+            f.write(lines[-1][:10])
+
+        model = FakeModel()
+        summary = score_directory(self.root, output, model=model, batch_size=2)
+
+        # The cut-off file and the unreadable one are tried again
+        self.assertEqual(summary["skipped"], 3)
+        self.assertEqual((summary["scored"], summary["failed"]), (1, 1))
+        with open(output) as f:
+            paths = [json.loads(line)["path"] for line in f]
+        self.assertEqual(sorted(set(paths)), find_images(self.root))
+        self.assertEqual(len(paths), 6)
+
+    def test_csv_output_resumes(self):
+        """
+        Test that CSV output has one header and a rerun only retries the file that failed.
+        """
+        output = os.path.join(self.temp_dir.name, "out.csv")
+        score_directory(self.root, output, model=FakeModel())
+
+        # The unreadable file was still being copied
+        Image.new("RGB", (32, 32), color="gray").save(os.path.join(self.root, "trip", "broken.jpg"), format="PNG")
+        model = FakeModel()
+        score_directory(self.root, output, model=model)
+
+        self.assertEqual(model.scored, 1)
+        with open(output, newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(set(rows[0]), {"path", "score", "model_version", "error"})
+        self.assertEqual((rows[-1]["path"], rows[-1]["error"]), ("trip/broken.jpg", ""))
+
+        model = FakeModel()
+        score_directory(self.root, output, model=model)
+        self.assertEqual(model.scored, 0)
+
+    def test_line_writer_is_abstract(self):
+        """
+        Test that the line writer base class cannot be used directly.
+        """
+        with self.assertRaises(TypeError):
+            _LineWriter(os.path.join(self.temp_dir.name, "out.txt"))
+
+
+if __name__ == "__main__":
+    unittest.main()
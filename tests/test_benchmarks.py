@@ -0,0 +1,86 @@
+"""
+Unit tests for the benchmarking helpers
+
+This module contains unit tests for latency statistics and benchmark
+regression comparison.
+"""
+
+import os
+import unittest
+from unittest import mock
+
+from benchmarks.stats import percentile, summarize_latencies
+from benchmarks.microbench import compare_results, run_benchmarks
+from benchmarks.startup import StartupProfiler, rss_mb
+
+
+class TestBenchmarkHelpers(unittest.TestCase):
+    """
+    Test cases for the benchmarking helpers.
+    """
+
+    def test_percentile_nearest_rank(self):
+        """
+        Test nearest-rank percentiles.
+        """
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertEqual(percentile([7], 90), 7)
+        self.assertIsNone(percentile([], 50))
+
+    def test_summarize_latencies(self):
+        """
+        Test that summaries include count, mean and percentiles.
+        """
+        summary = summarize_latencies([4.0, 1.0, 3.0, 2.0])
+        self.assertEqual(summary["count"], 4)
+        self.assertEqual(summary["mean_ms"], 2.5)
+        self.assertEqual(summary["p50_ms"], 2.0)
+        self.assertEqual(summary["max_ms"], 4.0)
+        self.assertEqual(summarize_latencies([]), {"count": 0})
+
+    def test_compare_results_flags_regressions(self):
+        """
+        Test that slowdowns beyond the threshold are flagged.
+        """
+        baseline = {"results": {"a": {"p50_ms": 10.0}, "b": {"p50_ms": 10.0}, "c": {"p50_ms": 10.0}}}
+        current = {"results": {"a": {"p50_ms": 10.5}, "b": {"p50_ms": 12.0}, "c": {"p50_ms": 5.0},
+                               "d": {"p50_ms": 1.0}}}
+
+        statuses = {name: status for name, *_, status in compare_results(baseline, current, 0.1)}
+
+        self.assertEqual(statuses, {"a": "ok", "b": "REGRESSION", "c": "improved", "d": "missing"})
+
+    def test_heatmap_group_does_not_build_nima_model(self):
+        """
+        Test that running only the heatmap case skips building the NIMA model.
+        """
+        with mock.patch.dict(os.environ), mock.patch("model.nima_model.NimaModel") as nima_model:
+            results = run_benchmarks("standin", repeat=1, only={"heatmap"})
+
+        nima_model.assert_not_called()
+        self.assertEqual(list(results), ["create_heatmap"])
+
+    def test_startup_profiler_records_phases(self):
+        """
+        Test that phases record time and memory, and repeated phases are summed.
+        """
+        profiler = StartupProfiler()
+        with profiler.phase("allocate"):
+            block = b"\x01" * (32 * 1024 * 1024)
+        with profiler.phase("twice"):
+            pass
+        with profiler.phase("twice"):
+            pass
+
+        self.assertEqual(list(profiler.phases), ["allocate", "twice"])
+        self.assertGreater(profiler.phases["allocate"]["rss_delta_mb"], 16)
+        self.assertGreaterEqual(profiler.phases["twice"]["wall_ms"], 0.0)
+        self.assertGreater(rss_mb(), 0)
+        del block
+
+
+if __name__ == "__main__":
+    unittest.main()
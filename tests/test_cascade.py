@@ -0,0 +1,142 @@
+"""
+Unit tests for cascaded scoring
+
+This module contains unit tests for escalating uncertain screening scores,
+measuring agreement and scoring with a low-resolution model.
+"""
+
+import os
+import json
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from cascade import CascadeScorer, cascade_directory, distribution_stats
+from model.nima_model import NimaModel, save_head_weights
+
+
+class FakeModel:
+    """
+    Model whose mean score is 1 + 9 x the image's mean pixel value, plus an offset.
+    """
+
+    def __init__(self, version, offset=0.0, spread=False):
+        self.version = version
+        self.offset = offset
+        self.spread = spread
+        self.seen = 0
+
+    def predict_distribution(self, images):
+        self.seen += len(images)
+        means = np.clip(1.0 + 9.0 * images.mean(axis=(1, 2, 3)) + self.offset, 1.0, 10.0)
+        distributions = np.zeros((len(images), 10), dtype=np.float32)
+        for row, mean in enumerate(means):
+            if self.spread:
+                # All the mass on 1 and 10, split so the mean is kept
+                distributions[row, [0, 9]] = [(10.0 - mean) / 9.0, (mean - 1.0) / 9.0]
+            else:
+                low = min(int(np.floor(mean)), 9)
+                distributions[row, low - 1] = 1.0 - (mean - low)
+                distributions[row, min(low, 9)] += mean - low
+        return distributions
+
+
+def batch(*scores):
+    """
+    Build a batch of flat images whose FakeModel scores are the given values.
+    """
+    return np.stack([np.full((4, 4, 3), (score - 1.0) / 9.0, dtype=np.float32) for score in scores])
+
+
+class TestCascade(unittest.TestCase):
+    """
+    Test cases for cascaded scoring.
+    """
+
+    def test_escalates_near_thresholds_and_uncertain(self):
+        """
+        Test that only scores near a threshold or with a wide distribution reach the full model.
+        """
+        fast, full = FakeModel("fast", offset=0.3), FakeModel("full")
+        scorer = CascadeScorer(fast, full, thresholds=(5.0,), margin=0.5, max_std=2.0, audit_fraction=0.0)
+
+        results = scorer.score(batch(2.0, 4.8, 8.0))
+        self.assertEqual([result["stage"] for result in results], ["fast", "full", "fast"])
+        self.assertEqual([result["model_version"] for result in results], ["fast", "full", "fast"])
+        self.assertAlmostEqual(results[0]["score"], 2.3, places=2)
+        self.assertAlmostEqual(results[1]["score"], 4.8, places=2)
+        self.assertEqual(full.seen, 1)
+
+        scorer.fast_model = FakeModel("fast", spread=True)
+        self.assertEqual([result["stage"] for result in scorer.score(batch(2.0))], ["full"])
+        self.assertIsNone(scorer.summary()["agreement"])
+
+        means, stds = distribution_stats(FakeModel("x", spread=True).predict_distribution(batch(5.5)))
+        self.assertAlmostEqual(float(means[0]), 5.5, places=4)
+        self.assertAlmostEqual(float(stds[0]), 4.5, places=4)
+
+    def test_audit_measures_agreement(self):
+        """
+        Test that audited batches compare cascade decisions with the full model.
+        """
+        # Screening reads 0.8 high: 4.3 and 4.0 land near the threshold and are
+        # escalated, 2.0 is kept on the right side and 4.5 is kept on the wrong one
+        scorer = CascadeScorer(FakeModel("fast", offset=0.8), FakeModel("full"), thresholds=(5.0,), margin=0.25,
+                               max_std=2.0, audit_fraction=0.5)
+        self.assertEqual([result["stage"] for result in scorer.score(batch(4.3, 4.0, 4.5, 2.0))],
+                         ["full", "full", "fast", "fast"])
+        scorer.score(batch(2.0, 2.0))
+        scorer.score(batch(2.0, 9.0))
+
+        summary = scorer.summary()
+        self.assertEqual(summary["images"], 8)
+        self.assertEqual(summary["audited"], 6)
+        self.assertAlmostEqual(summary["agreement"], 5 / 6)
+        self.assertAlmostEqual(summary["mean_abs_difference"], 4 * 0.8 / 6, places=4)
+        self.assertEqual(summary["escalated"], 2)
+        self.assertIsNotNone(summary["speedup"])
+
+    def test_low_resolution_model(self):
+        """
+        Test that a low-resolution model scores full-size images and needs a head trained at its size.
+        """
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+
+        full = NimaModel("standin")
+        fast = NimaModel("standin", input_size=160)
+        self.assertEqual(fast.feature_space, "standin-160")
+        self.assertNotEqual(fast.version, full.version)
+        self.assertEqual((fast.feature_dim, full.feature_dim), (1280, 1280))
+
+        images = np.random.default_rng(0).random((2, 224, 224, 3), dtype=np.float32)
+        self.assertEqual(fast.predict_distribution(images).shape, (2, 10))
+        self.assertEqual(len(fast.predict_batch(images)), 2)
+
+        # Head weights trained on full-size features do not fit
+        path = os.path.join(temp_dir.name, "head.npz")
+        save_head_weights(path, full.head_layers, "standin")
+        self.assertFalse(fast.load_head_weights(path))
+
+        root = os.path.join(temp_dir.name, "images")
+        os.makedirs(root)
+        for value in (40, 200):
+            Image.new("RGB", (64, 48), color=(value, 90, 30)).save(os.path.join(root, f"{value}.png"))
+        with open(os.path.join(root, "broken.jpg"), "w") as f:
+            f.write("not an image")
+        output = os.path.join(temp_dir.name, "results.jsonl")
+
+        scorer = CascadeScorer(fast, full, thresholds=(5.0,), audit_fraction=1.0)
+        counts = cascade_directory(scorer, root, output, batch_size=8)
+        self.assertEqual((counts["scored"], counts["failed"]), (2, 1))
+        with open(output) as f:
+            records = [json.loads(line) for line in f]
+        versions = {record["model_version"] for record in records if record["error"] is None}
+        self.assertTrue(versions <= {fast.version, full.version})
+        self.assertEqual(scorer.summary()["audited"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,219 @@
+"""
+Unit tests for the Python client library
+
+This module tests the synchronous and asyncio clients against the Flask
+application in-process, with a lightweight stand-in for the NIMA model.
+"""
+
+import io
+import sys
+import asyncio
+import unittest
+import subprocess
+from urllib.parse import urlsplit
+
+import numpy as np
+import requests
+from PIL import Image
+from requests.adapters import BaseAdapter
+
+import app as app_module
+from model.loader import ModelLoader
+from aesthetic_lens_client import AestheticLensClient, AsyncAestheticLensClient, ScoringError
+
+
+class FakeModel:
+    """
+    Stand-in model whose score is derived from the mean pixel value.
+    """
+
+    def warm_up(self, batch_size=1):
+        return 1.0
+
+    def predict(self, image):
+        return self.predict_batch(image[np.newaxis])[0]
+
+    def predict_batch(self, images):
+        images = np.asarray(images, dtype=np.float32)
+        if images.max() > 1.0:
+            images = images / 255.0
+        return [round(1.0 + 9.0 * float(image.mean()), 2) for image in images]
+
+
+class FlaskAdapter(BaseAdapter):
+    """
+    Transport adapter that sends requests to a Flask app in-process.
+
+    Attributes:
+        calls (list): Paths of the requests sent
+        fail_first (int): Number of initial requests answered with 503
+    """
+
+    def __init__(self, flask_app, fail_first=0):
+        super().__init__()
+        self.test_client = flask_app.test_client()
+        self.fail_first = fail_first
+        self.calls = []
+
+    def send(self, request, **kwargs):
+        self.calls.append(urlsplit(request.url).path)
+
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+
+        if self.fail_first > 0:
+            self.fail_first -= 1
+            response.status_code = 503
+            response.headers["Retry-After"] = "0"
+            response._content = b'{"error": "busy"}'
+            return response
+
+        parts = urlsplit(request.url)
+        result = self.test_client.open(
+            parts.path,
+            method=request.method,
+            query_string=parts.query,
+            data=request.body,
+            headers=dict(request.headers)
+        )
+        response.status_code = result.status_code
+        response.headers.update(result.headers)
+        response._content = result.get_data()
+        return response
+
+    def close(self):
+        pass
+
+
+def make_image(value):
+    """
+    Create an in-memory JPEG filled with a single grey level.
+
+    Args:
+        value (int): Grey level in [0, 255]
+
+    Returns:
+        tuple: (filename, bytes)
+    """
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), color=(value, value, value)).save(buffer, format="JPEG")
+    return f"grey_{value}.jpg", buffer.getvalue()
+
+
+class TestClient(unittest.TestCase):
+    """
+    Test cases for the client library.
+    """
+
+    def setUp(self):
+        """
+        Point the app at a ready stand-in model and mount the in-process adapter.
+        """
+        self.original_loader = app_module.model_loader
+        loader = ModelLoader(FakeModel)
+        loader.load()
+        app_module.model_loader = loader
+
+    def tearDown(self):
+        """
+        Restore the app's model loader.
+        """
+        app_module.model_loader = self.original_loader
+
+    def make_client(self, client_class=AestheticLensClient, fail_first=0, **kwargs):
+        adapter = FlaskAdapter(app_module.app, fail_first=fail_first)
+        client = client_class("http://testserver", backoff_factor=0, **kwargs)
+        session = client.client.session if client_class is AsyncAestheticLensClient else client.session
+        session.mount("http://", adapter)
+        return client, adapter
+
+    def test_score_many_batches_requests(self):
+        """
+        Test that images are grouped into batch calls and returned in order.
+        """
+        client, adapter = self.make_client(batch_size=2)
+        images = [make_image(value) for value in (0, 128, 255)] + [("notes.txt", b"text")]
+
+        results = client.score_many(images)
+
+        self.assertEqual(adapter.calls, ["/api/score/batch", "/api/score/batch"])
+        self.assertEqual([r["filename"] for r in results], [name for name, _ in images])
+        self.assertLess(results[0]["score"], results[1]["score"])
+        self.assertLess(results[1]["score"], results[2]["score"])
+        self.assertIn("error", results[3])
+
+    def test_score_frames(self):
+        """
+        Test that raw frames are scored through /api/score/raw.
+        """
+        client, adapter = self.make_client()
+        frames = np.full((2, 224, 224, 3), 255, dtype=np.uint8)
+
+        results = client.score_frames(frames)
+
+        self.assertEqual(adapter.calls, ["/api/score/raw"])
+        self.assertEqual([r["score"] for r in results], [10.0, 10.0])
+
+    def test_retries_unavailable(self):
+        """
+        Test that 503 responses are retried and then succeed.
+        """
+        client, adapter = self.make_client(fail_first=2, max_retries=3)
+
+        results = client.score_batch([make_image(0)])
+
+        self.assertEqual(len(adapter.calls), 3)
+        self.assertEqual(results[0]["score"], 1.0)
+
+    def test_gives_up_after_retries(self):
+        """
+        Test that a persistent 503 raises ScoringError.
+        """
+        client, _ = self.make_client(fail_first=10, max_retries=2)
+
+        with self.assertRaises(ScoringError) as context:
+            client.score_batch([make_image(0)])
+        self.assertEqual(context.exception.status_code, 503)
+
+    def test_backoff_is_capped(self):
+        """
+        Test that exponential delays and Retry-After values are capped.
+        """
+        client = AestheticLensClient("http://testserver", backoff_factor=1, max_backoff=5)
+        self.assertEqual(client._backoff(1), 2)
+        self.assertEqual(client._backoff(10), 5)
+        self.assertEqual(client._backoff(0, "3600"), 5)
+        self.assertEqual(client._backoff(0, "0.5"), 0.5)
+
+    def test_client_does_not_load_server_code(self):
+        """
+        Test that importing the client and encoding frames loads neither TensorFlow nor the server config.
+        """
+        code = ("import sys, numpy as np\n"
+                "from aesthetic_lens_client.frames import encode_raw_frames\n"
+                "import aesthetic_lens_client\n"
+                "encode_raw_frames(np.zeros((1, 2, 2, 3), dtype=np.uint8))\n"
+                "print(sorted({'tensorflow', 'config', 'model'} & set(sys.modules)))")
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), "[]")
+
+    def test_async_score_many(self):
+        """
+        Test the asyncio client end to end.
+        """
+        client, adapter = self.make_client(AsyncAestheticLensClient, batch_size=1, pool_maxsize=1)
+        images = [make_image(value) for value in (0, 255)]
+
+        async def run():
+            async with client:
+                return await client.score_many(images)
+
+        results = asyncio.run(run())
+
+        self.assertEqual(len(adapter.calls), 2)
+        self.assertEqual([r["score"] for r in results], [1.0, 10.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Unit tests for the image derivative cache
+
+This module contains unit tests for generating, caching and invalidating
+resized image variants.
+"""
+
+import os
+import tempfile
+import unittest
+
+from unittest import mock
+from PIL import Image
+
+from derivatives import DerivativeCache
+
+
+class TestDerivativeCache(unittest.TestCase):
+    """
+    Test cases for the derivative cache.
+    """
+
+    def setUp(self):
+        """
+        Create a source image and an empty cache.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.source_path = os.path.join(self.temp_dir.name, "photo.jpg")
+        Image.new("RGB", (800, 600), color=(200, 100, 50)).save(self.source_path, format="JPEG")
+        self.cache = DerivativeCache(os.path.join(self.temp_dir.name, "cache"), widths=(320, 1280), quality=80)
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        self.temp_dir.cleanup()
+
+    def test_generates_resized_variants(self):
+        """
+        Test that variants are resized, keep their aspect ratio and are not upscaled.
+        """
+        path, _, mimetype = self.cache.get(self.source_path, 320, "webp")
+        with Image.open(path) as img:
+            self.assertEqual((img.format, img.size), ("WEBP", (320, 240)))
+        self.assertEqual(mimetype, "image/webp")
+
+        path, _, _ = self.cache.get(self.source_path, 1280, "jpeg")
+        with Image.open(path) as img:
+            self.assertEqual((img.format, img.size), ("JPEG", (800, 600)))
+
+    def test_cached_variant_is_not_regenerated(self):
+        """
+        Test that a second request is served from disk.
+        """
+        first = self.cache.get(self.source_path, 320, "jpeg")
+
+        with mock.patch.object(self.cache, "_generate") as generate:
+            second = self.cache.get(self.source_path, 320, "jpeg")
+
+        generate.assert_not_called()
+        self.assertEqual(first, second)
+
+    def test_changed_source_gets_new_etag(self):
+        """
+        Test that replacing the source image produces a new variant and ETag.
+        """
+        _, first_etag, _ = self.cache.get(self.source_path, 320, "webp")
+
+        Image.new("RGB", (640, 640), color=(0, 0, 255)).save(self.source_path, format="JPEG")
+        os.utime(self.source_path, ns=(0, 0))
+        path, second_etag, _ = self.cache.get(self.source_path, 320, "webp")
+
+        self.assertNotEqual(first_etag, second_etag)
+        with Image.open(path) as img:
+            self.assertEqual(img.size, (320, 320))
+
+    def test_pregenerate_and_rejects_unknown_sizes(self):
+        """
+        Test that every allowed variant is pre-generated and others are rejected.
+        """
+        self.assertEqual(self.cache.pregenerate(self.source_path), 4)
+
+        with self.assertRaises(ValueError):
+            self.cache.get(self.source_path, 500, "webp")
+        with self.assertRaises(ValueError):
+            self.cache.get(self.source_path, 320, "gif")
+
+
+if __name__ == "__main__":
+    unittest.main()
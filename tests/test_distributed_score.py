@@ -0,0 +1,106 @@
+"""
+Unit tests for distributed scoring
+
+This module contains unit tests for claiming, reclaiming and merging the work
+units of a scoring job shared by several nodes.
+"""
+
+import os
+import json
+import tempfile
+import threading
+import unittest
+from PIL import Image
+
+from distributed_score import ScoringJob, run_node
+from tests.helpers import FakeModel
+
+
+class TestScoringJob(unittest.TestCase):
+    """
+    Test cases for a scoring job in a shared directory.
+    """
+
+    def setUp(self):
+        """
+        Create seven images and a job with units of two images.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, "archive")
+        os.makedirs(os.path.join(self.root, "2024"))
+        for i in range(7):
+            path = os.path.join(self.root, "2024" if i % 2 else "", f"img_{i}.jpg")
+            Image.new("RGB", (32, 32), color="teal").save(path)
+
+        self.job_dir = os.path.join(self.temp_dir.name, "job")
+        self.job = ScoringJob.create(self.job_dir, self.root, unit_size=2, lease_seconds=60)
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        self.temp_dir.cleanup()
+
+    def test_nodes_share_the_work(self):
+        """
+        Test that concurrent nodes score every unit once and the merge holds every image.
+        """
+        self.assertEqual(self.job.units, 4)
+        models = [FakeModel() for _ in range(3)]
+        threads = [
+            threading.Thread(target=run_node, args=(ScoringJob(self.job_dir), model, f"node-{i}"),
+                             kwargs={"poll_interval": 0.05})
+            for i, model in enumerate(models)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=30)
+
+        self.assertEqual(sum(model.scored for model in models), 7)
+        self.assertEqual(self.job.status(), {"units": 4, "finished": 4, "leased": 0, "images": 7})
+
+        output = os.path.join(self.temp_dir.name, "results.jsonl")
+        self.assertEqual(self.job.merge(output), 7)
+        self.assertEqual(self.job.merge(output), 0)
+        with open(output) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([record["path"] for record in records], self.job.paths)
+        self.assertTrue(all(record["score"] == 6.0 for record in records))
+
+    def test_expired_lease_is_reclaimed(self):
+        """
+        Test that a live lease blocks a unit and an expired one is taken over.
+        """
+        dead = [self.job.claim("dead-node") for _ in range(2)]
+        alive = [self.job.claim("other") for _ in range(2)]
+        self.assertIsNone(self.job.claim("other"))
+        for unit in alive:
+            self.job.complete(unit, [], "other")
+
+        # The dead node stopped renewing its leases long ago
+        for unit in dead:
+            os.utime(os.path.join(self.job_dir, "leases", f"unit-{unit:05d}"), (0, 0))
+        model = FakeModel()
+        self.assertEqual(run_node(self.job, model, "rescuer", poll_interval=0), 2)
+
+        self.assertEqual(model.scored, sum(len(self.job.unit_paths(unit)) for unit in dead))
+        self.assertEqual(self.job.status()["finished"], 4)
+        self.assertFalse(self.job.renew(dead[0], "dead-node"))
+
+    def test_merge_requires_all_units(self):
+        """
+        Test that merging an unfinished job fails and the manifest is not rebuilt.
+        """
+        unit = self.job.claim("node")
+        self.job.complete(unit, [], "node")
+
+        with self.assertRaises(RuntimeError):
+            self.job.merge(os.path.join(self.temp_dir.name, "results.csv"))
+
+        Image.new("RGB", (32, 32)).save(os.path.join(self.root, "late.jpg"))
+        self.assertEqual(len(ScoringJob.create(self.job_dir, self.root).paths), 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+"""
+Unit tests for near-duplicate detection
+
+This module contains unit tests for perceptual hashing, the BK-tree and the
+duplicate index over the examples catalog.
+"""
+
+import io
+import os
+import random
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import numpy as np
+from PIL import Image
+
+from examples_catalog import ExamplesCatalog
+from duplicates import BKTree, DuplicateIndex, phash, hamming_distance
+
+
+def make_photo(seed, size=(400, 300)):
+    """
+    Create a smooth random image that survives resizing like a photo does.
+    """
+    rng = np.random.RandomState(seed)
+    small = rng.randint(0, 256, size=(6, 8, 3)).astype(np.uint8)
+    return Image.fromarray(small).resize(size, Image.BICUBIC)
+
+
+class TestPerceptualHash(unittest.TestCase):
+    """
+    Test cases for perceptual hashing and the BK-tree.
+    """
+
+    def test_hash_survives_resize_and_reencode(self):
+        """
+        Test that a resized JPEG copy is close and a different image is far.
+        """
+        original = make_photo(0)
+        buffer = io.BytesIO()
+        original.resize((200, 150)).save(buffer, format="JPEG", quality=50)
+        buffer.seek(0)
+
+        self.assertLessEqual(hamming_distance(phash(original), phash(buffer)), 4)
+        self.assertGreater(hamming_distance(phash(original), phash(make_photo(1))), 10)
+        self.assertLess(phash(original), 1 << 64)
+
+    def test_bk_tree_matches_brute_force(self):
+        """
+        Test that radius searches return exactly the brute-force matches.
+        """
+        rng = random.Random(0)
+        values = [rng.getrandbits(64) for _ in range(300)]
+        values += [value ^ (1 << rng.randrange(64)) for value in values[:50]]
+        tree = BKTree()
+        for i, value in enumerate(values):
+            tree.add(value, i)
+
+        for query in values[:20] + [rng.getrandbits(64) for _ in range(5)]:
+            expected = sorted((hamming_distance(query, v), i) for i, v in enumerate(values)
+                              if hamming_distance(query, v) <= 8)
+            self.assertEqual(sorted(tree.search(query, 8)), expected)
+
+        self.assertTrue(tree.remove(values[0], 0))
+        self.assertFalse(tree.remove(values[0], 0))
+        self.assertNotIn(0, [key for _, key in tree.search(values[0], 0)])
+        self.assertEqual(len(tree), len(values) - 1)
+
+
+class TestDuplicateIndex(unittest.TestCase):
+    """
+    Test cases for the duplicate index.
+    """
+
+    def setUp(self):
+        """
+        Create a catalog with one example whose hash is not stored yet.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.examples_dir = os.path.join(self.temp_dir.name, "examples")
+        os.makedirs(self.examples_dir)
+        self.catalog = ExamplesCatalog(os.path.join(self.temp_dir.name, "examples.db"))
+
+        make_photo(0).save(os.path.join(self.examples_dir, "high_score_1.jpg"))
+        self.catalog.add("high_score_1.jpg", "high", 7.5)
+        self.index = DuplicateIndex(self.catalog, self.examples_dir, max_distance=6)
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        self.temp_dir.cleanup()
+
+    def test_backfills_and_stores_missing_hashes(self):
+        """
+        Test that unhashed examples are hashed once and the hash is stored.
+        """
+        _, matches = self.index.check(make_photo(0).resize((300, 225)))
+
+        self.assertEqual([filename for _, filename in matches], ["high_score_1.jpg"])
+        self.assertEqual(self.catalog.phashes(), {"high_score_1.jpg": phash(make_photo(0))})
+
+    def test_follows_catalog_changes(self):
+        """
+        Test that added and deleted examples are reflected in lookups.
+        """
+        other = make_photo(1)
+        value, matches = self.index.check(other)
+        self.assertEqual(matches, [])
+
+        other.save(os.path.join(self.examples_dir, "low_score_1.jpg"))
+        self.catalog.add("low_score_1.jpg", "low", 2.0, phash=value)
+        self.assertEqual(self.index.find(value), [(0, "low_score_1.jpg")])
+
+        self.catalog.delete("low_score_1.jpg")
+        self.assertEqual(self.index.find(value), [])
+
+    def test_refresh_reads_only_changed_hashes(self):
+        """
+        Test that a catalog change looks up the changed example's hash, not all hashes.
+        """
+        self.index.refresh()
+        value = phash(make_photo(1))
+        self.catalog.add("low_score_1.jpg", "low", 2.0, phash=value)
+
+        with mock.patch.object(self.catalog, "phashes", wraps=self.catalog.phashes) as phashes:
+            self.assertEqual(self.index.find(value), [(0, "low_score_1.jpg")])
+        phashes.assert_called_once_with(["low_score_1.jpg"])
+        self.assertEqual(self.catalog.phashes(["low_score_1.jpg", "missing.jpg"]), {"low_score_1.jpg": value})
+
+    def test_concurrent_admits_add_one_copy(self):
+        """
+        Test that concurrent contributions of the same photo add it only once.
+        """
+        value = phash(make_photo(1))
+        barrier = threading.Barrier(4)
+        results = []
+
+        def contribute(i):
+            def add():
+                self.catalog.add(f"low_score_{i}.jpg", "low", 2.0, phash=value)
+                return i
+
+            barrier.wait()
+            results.append(self.index.admit(value, add))
+
+        threads = [threading.Thread(target=contribute, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        added = [result for matches, result in results if not matches]
+        self.assertEqual(len(added), 1)
+        self.assertEqual(len(self.catalog.phashes()), 2)
+        for matches, result in results:
+            if matches:
+                self.assertIsNone(result)
+                self.assertEqual(matches, [(0, f"low_score_{added[0]}.jpg")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,303 @@
+"""
+Unit tests for the SQLite examples catalog
+
+This module contains unit tests for adding, deleting and listing examples,
+concurrent writes, and migration from the legacy JSON metadata file.
+"""
+
+import os
+import json
+import tempfile
+import unittest
+import threading
+
+from unittest import mock
+
+from examples_catalog import ExamplesCatalog, GalleryIndex, open_catalog, category_for_filename
+
+
+class TestExamplesCatalog(unittest.TestCase):
+    """
+    Test cases for the examples catalog.
+    """
+
+    def setUp(self):
+        """
+        Create a catalog in a temporary directory.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "examples.db")
+        self.catalog = ExamplesCatalog(self.db_path)
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        self.temp_dir.cleanup()
+
+    def test_add_get_delete(self):
+        """
+        Test the basic example lifecycle.
+        """
+        self.catalog.add("high_score_1.jpg", "high", 7.5, "Admin", "A lake")
+
+        example = self.catalog.get("high_score_1.jpg")
+        self.assertEqual(example["score"], 7.5)
+        self.assertEqual(example["category"], "high")
+        self.assertEqual(example["description"], "A lake")
+
+        self.assertTrue(self.catalog.delete("high_score_1.jpg"))
+        self.assertIsNone(self.catalog.get("high_score_1.jpg"))
+        self.assertFalse(self.catalog.delete("high_score_1.jpg"))
+
+    def test_rejects_duplicates_and_bad_categories(self):
+        """
+        Test that duplicate filenames and unknown categories are rejected.
+        """
+        self.catalog.add("low_score_1.jpg", "low", 2.0)
+        with self.assertRaises(ValueError):
+            self.catalog.add("low_score_1.jpg", "low", 2.5)
+        with self.assertRaises(ValueError):
+            self.catalog.add("bad_score_1.jpg", "bad", 5.0)
+
+    def test_grouped_sorted_by_score(self):
+        """
+        Test that examples are grouped by category and sorted by score.
+        """
+        self.catalog.add("average_score_1.jpg", "average", 6.0)
+        self.catalog.add("average_score_2.jpg", "average", 4.5)
+        self.catalog.add("excellent_score_1.jpg", "excellent", 9.2)
+
+        groups = self.catalog.grouped()
+
+        self.assertEqual(set(groups), {"low", "average", "high", "excellent"})
+        self.assertEqual([e["filename"] for e in groups["average"]],
+                         ["average_score_2.jpg", "average_score_1.jpg"])
+        self.assertEqual(groups["low"], [])
+
+    def test_concurrent_adds_are_not_lost(self):
+        """
+        Test that concurrent writers from several threads all persist.
+        """
+        def add_many(offset):
+            for i in range(20):
+                self.catalog.add(f"average_score_{offset + i}.jpg", "average", 5.0)
+
+        threads = [threading.Thread(target=add_many, args=(n * 100,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.catalog.count(), 80)
+
+    def test_allocate_filename_seeds_and_increments(self):
+        """
+        Test that numbering continues after existing files and never reuses numbers.
+        """
+        examples_dir = os.path.join(self.temp_dir.name, "examples")
+        os.makedirs(examples_dir)
+        for filename in ("high_score_2.jpg", "high_score_7.png", "low_score_9.jpg"):
+            open(os.path.join(examples_dir, filename), "wb").close()
+
+        first = self.catalog.allocate_filename("high", ".jpg", examples_dir)
+        self.catalog.add(first, "high", 7.5)
+        self.catalog.delete(first)
+        second = self.catalog.allocate_filename("high", ".png", examples_dir)
+
+        self.assertEqual(first, "high_score_8.jpg")
+        self.assertEqual(second, "high_score_9.png")
+        self.assertEqual(self.catalog.allocate_filename("average", ".jpg", examples_dir), "average_score_1.jpg")
+        with self.assertRaises(ValueError):
+            self.catalog.allocate_filename("bogus", ".jpg", examples_dir)
+
+    def test_concurrent_allocations_are_unique(self):
+        """
+        Test that threads allocating at the same time never share a number.
+        """
+        examples_dir = os.path.join(self.temp_dir.name, "examples")
+        filenames = []
+        lock = threading.Lock()
+
+        def allocate_many():
+            for _ in range(25):
+                filename = self.catalog.allocate_filename("excellent", ".jpg", examples_dir)
+                with lock:
+                    filenames.append(filename)
+
+        threads = [threading.Thread(target=allocate_many) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(set(filenames)), 100)
+        self.assertEqual(max(int(f.split("_")[-1].split(".")[0]) for f in filenames), 100)
+
+    def test_migrate_from_json(self):
+        """
+        Test that the legacy JSON file is imported once, skipping unprefixed names.
+        """
+        json_path = os.path.join(self.temp_dir.name, "examples_metadata.json")
+        with open(json_path, "w") as f:
+            json.dump({
+                "high_score_1.jpg": {"score": 7.1, "contributor": "Admin", "description": "",
+                                     "date_added": "2025-03-20 19:09:14"},
+                "low_score_1.jpg": {"score": 2.4},
+                "uncategorized.jpg": {"score": 5.0},
+            }, f)
+
+        catalog = open_catalog(os.path.join(self.temp_dir.name, "migrated.db"), json_path)
+
+        self.assertEqual(catalog.count(), 2)
+        self.assertEqual(catalog.get("high_score_1.jpg")["date_added"], "2025-03-20 19:09:14")
+        self.assertEqual(catalog.get("low_score_1.jpg")["contributor"], "Anonymous")
+        self.assertEqual(catalog.migrate_from_json(json_path), 0)
+
+    def test_category_for_filename(self):
+        """
+        Test category detection from filename prefixes.
+        """
+        self.assertEqual(category_for_filename("excellent_score_3.png"), "excellent")
+        self.assertIsNone(category_for_filename("photo.jpg"))
+
+
+class TestGalleryIndex(unittest.TestCase):
+    """
+    Test cases for the in-memory gallery index.
+    """
+
+    def setUp(self):
+        """
+        Create a catalog and an examples directory.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.examples_dir = os.path.join(self.temp_dir.name, "examples")
+        os.makedirs(self.examples_dir)
+        self.catalog = ExamplesCatalog(os.path.join(self.temp_dir.name, "examples.db"))
+        self.index = GalleryIndex(self.catalog, self.examples_dir)
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        self.temp_dir.cleanup()
+
+    def add_example(self, filename, category, score):
+        with open(os.path.join(self.examples_dir, filename), "wb") as f:
+            f.write(b"image")
+        self.catalog.add(filename, category, score)
+
+    def touch_dir(self, offset):
+        """
+        Give the directory a distinct mtime regardless of timestamp resolution.
+        """
+        mtime_ns = os.stat(self.examples_dir).st_mtime_ns + offset
+        os.utime(self.examples_dir, ns=(mtime_ns, mtime_ns))
+
+    def test_serves_sorted_groups(self):
+        """
+        Test that the index groups examples and skips missing files.
+        """
+        self.add_example("high_score_1.jpg", "high", 8.0)
+        self.add_example("high_score_2.jpg", "high", 7.2)
+        self.catalog.add("high_score_3.jpg", "high", 7.5)  # No file on disk
+
+        groups = self.index.groups()
+
+        self.assertEqual([e["filename"] for e in groups["high"]], ["high_score_2.jpg", "high_score_1.jpg"])
+
+    def test_unchanged_index_makes_no_per_example_calls(self):
+        """
+        Test that serving an unchanged index does not touch the examples.
+        """
+        for i in range(5):
+            self.add_example(f"average_score_{i}.jpg", "average", 5.0 + i / 10)
+        self.index.groups()
+
+        with mock.patch("examples_catalog.os.path.exists") as exists, \
+                mock.patch("examples_catalog.os.listdir") as listdir:
+            groups = self.index.groups()
+
+        exists.assert_not_called()
+        listdir.assert_not_called()
+        self.assertEqual(len(groups["average"]), 5)
+
+    def test_incremental_add_and_delete(self):
+        """
+        Test that catalog changes are applied without a full rebuild.
+        """
+        self.add_example("low_score_1.jpg", "low", 2.0)
+        first = self.index.groups()
+
+        with mock.patch.object(self.index, "_rebuild") as rebuild:
+            self.add_example("low_score_2.jpg", "low", 1.5)
+            self.catalog.delete("low_score_1.jpg")
+            groups = self.index.groups()
+
+        rebuild.assert_not_called()
+        self.assertEqual([e["filename"] for e in groups["low"]], ["low_score_2.jpg"])
+        self.assertEqual([e["filename"] for e in first["low"]], ["low_score_1.jpg"])
+
+    def test_directory_change_triggers_rebuild(self):
+        """
+        Test that files removed outside the catalog are noticed.
+        """
+        self.add_example("excellent_score_1.jpg", "excellent", 9.5)
+        self.assertEqual(len(self.index.groups()["excellent"]), 1)
+
+        os.remove(os.path.join(self.examples_dir, "excellent_score_1.jpg"))
+        self.touch_dir(1000)
+
+        self.assertEqual(self.index.groups()["excellent"], [])
+
+    def test_keyset_pages_cover_gallery(self):
+        """
+        Test that pages across categories return every example exactly once.
+        """
+        for i in range(5):
+            self.add_example(f"low_score_{i}.jpg", "low", 1.0 + i / 10)
+            self.add_example(f"high_score_{i}.jpg", "high", 7.0 + i / 10)
+
+        seen, cursor = [], None
+        while True:
+            examples, cursor = self.index.page(cursor=cursor, limit=3)
+            seen.extend(e["filename"] for e in examples)
+            if cursor is None:
+                break
+
+        expected = [f"low_score_{i}.jpg" for i in range(5)] + [f"high_score_{i}.jpg" for i in range(5)]
+        self.assertEqual(seen, expected)
+
+    def test_page_is_stable_across_inserts(self):
+        """
+        Test that an insert before the cursor does not repeat or skip examples.
+        """
+        for i in range(4):
+            self.add_example(f"average_score_{i}.jpg", "average", 5.0 + i / 10)
+
+        first, cursor = self.index.page("average", limit=2)
+        self.add_example("average_score_9.jpg", "average", 4.0)
+        second, cursor = self.index.page("average", cursor, limit=2)
+
+        self.assertEqual([e["filename"] for e in first + second], [f"average_score_{i}.jpg" for i in range(4)])
+        self.assertIsNone(cursor)
+
+    def test_page_rejects_bad_arguments(self):
+        """
+        Test that invalid categories and cursors raise ValueError.
+        """
+        self.add_example("low_score_1.jpg", "low", 2.0)
+        self.add_example("low_score_2.jpg", "low", 2.5)
+        _, cursor = self.index.page("low", limit=1)
+
+        with self.assertRaises(ValueError):
+            self.index.page("bogus")
+        with self.assertRaises(ValueError):
+            self.index.page("low", cursor="not-a-cursor")
+        with self.assertRaises(ValueError):
+            self.index.page("high", cursor=cursor)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""
+Unit tests for the inference-only export
+
+This module contains unit tests for exporting the NIMA model and serving
+predictions from the export.
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from config import MODEL_SETTINGS
+from model.export import ServingModel, export_serving
+from model.nima_model import NimaModel
+
+
+class TestExport(unittest.TestCase):
+    """
+    Test cases for the serving export.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Build the stand-in model and export it once for all tests.
+        """
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.model = NimaModel("standin")
+        cls.path = os.path.join(cls.temp_dir.name, "export")
+        export_serving(cls.model, cls.path)
+        cls.exported = ServingModel(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Remove the temporary directory.
+        """
+        cls.temp_dir.cleanup()
+
+    def test_export_matches_model(self):
+        """
+        Test that the export gives the model's scores, features and version.
+        """
+        rng = np.random.default_rng(0)
+        images = rng.random((3,) + tuple(MODEL_SETTINGS["input_shape"]), dtype=np.float32)
+
+        self.assertEqual(self.exported.version, self.model.version)
+        self.assertEqual(self.exported.predict_batch(images), self.model.predict_batch(images))
+        scores, features = self.exported.predict_with_features(images)
+        np.testing.assert_allclose(features, self.model.extract_features(images), rtol=1e-5, atol=1e-6)
+        self.assertEqual(self.exported.predict(images[0]), scores[0])
+
+        pixels = (images * 255).astype(np.uint8)
+        self.assertEqual(self.exported.predict_batch(pixels), self.model.predict_batch(pixels))
+
+    def test_export_replaces_previous(self):
+        """
+        Test that exporting again replaces the export and leaves no temporary directories.
+        """
+        export_serving(self.model, self.path)
+        self.assertGreater(self.exported.warm_up(batch_size=2), 0)
+        self.assertEqual([name for name in os.listdir(self.temp_dir.name)], ["export"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Unit tests for the asynchronous logging utilities
+
+This module contains unit tests for event sampling, structured formatting
+and the non-blocking queue handler.
+"""
+
+import json
+import logging
+import queue
+import unittest
+
+from logging_utils import (
+    should_sample, log_event, StructuredFormatter, DroppingQueueHandler
+)
+
+
+class TestLoggingUtils(unittest.TestCase):
+    """
+    Test cases for the logging utilities.
+    """
+
+    def test_should_sample_bounds(self):
+        """
+        Test that rates of 0 and 1 are deterministic and unknown events are kept.
+        """
+        rates = {"always": 1.0, "never": 0.0}
+        self.assertTrue(all(should_sample("always", rates) for _ in range(100)))
+        self.assertFalse(any(should_sample("never", rates) for _ in range(100)))
+        self.assertTrue(should_sample("unlisted", rates))
+
+    def test_structured_formatter(self):
+        """
+        Test that records are formatted as JSON with event and fields.
+        """
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "Scored %s", ("a.jpg",), None)
+        record.event = "api.scored"
+        record.fields = {"score": 5.5}
+
+        payload = json.loads(StructuredFormatter().format(record))
+
+        self.assertEqual(payload["message"], "Scored a.jpg")
+        self.assertEqual(payload["event"], "api.scored")
+        self.assertEqual(payload["fields"], {"score": 5.5})
+
+    def test_queue_handler_drops_when_full(self):
+        """
+        Test that a full queue drops records instead of blocking.
+        """
+        handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+        logger = logging.getLogger("test_queue_handler_drops_when_full")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+
+        try:
+            logger.info("first")
+            logger.info("second")
+            logger.info("third")
+        finally:
+            logger.removeHandler(handler)
+
+        self.assertEqual(handler.queue.qsize(), 1)
+        self.assertEqual(handler.dropped, 2)
+
+    def test_log_event_respects_level(self):
+        """
+        Test that events below the logger level are not emitted.
+        """
+        handler = DroppingQueueHandler(queue.Queue())
+        logger = logging.getLogger("test_log_event_respects_level")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+
+        try:
+            log_event(logger, logging.DEBUG, "unlisted.event", "hidden")
+            log_event(logger, logging.INFO, "unlisted.event", "shown", value=1)
+        finally:
+            logger.removeHandler(handler)
+
+        self.assertEqual(handler.queue.qsize(), 1)
+        record = handler.queue.get_nowait()
+        self.assertEqual(record.event, "unlisted.event")
+        self.assertEqual(record.fields, {"value": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
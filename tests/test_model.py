@@ -6,13 +6,20 @@ This module contains unit tests for the NIMA model and utility functions.
 
 import os
 import unittest
+from unittest import mock
 import numpy as np
 from PIL import Image
 import tempfile
 
 # Import model-related modules
+from config import MODEL_SETTINGS
 from model.nima_model import NimaModel
-from model.utils import preprocess_image, get_feedback_from_score
+from model.standin import build_standin_backbone
+from model.utils import (
+    preprocess_image, get_feedback_from_score, decode_raw_frames
+)
+from aesthetic_lens_client.frames import encode_raw_frames
+from benchmarks.startup import StartupProfiler
 
 
 class TestNimaModel(unittest.TestCase):
@@ -20,14 +27,21 @@ class TestNimaModel(unittest.TestCase):
     Test cases for the NIMA model.
     """
     
+    @classmethod
+    def setUpClass(cls):
+        """
+        Build the NIMA model once for all tests in this class.
+        """
+        try:
+            cls.model = NimaModel()
+        except Exception as e:
+            raise unittest.SkipTest(f"Failed to initialize NIMA model: {str(e)}")
+    
     def setUp(self):
         """
         Set up the test environment.
         """
         try:
-            # Initialize the NIMA model
-            self.model = NimaModel()
-            
             # Create a temporary test image
             self.temp_dir = tempfile.TemporaryDirectory()
             self.test_image_path = os.path.join(self.temp_dir.name, "test_image.jpg")
@@ -81,6 +95,18 @@ class TestNimaModel(unittest.TestCase):
         self.assertGreaterEqual(score, 1.0)
         self.assertLessEqual(score, 10.0)
     
+    def test_predict_with_features(self):
+        """
+        Test that scoring with features matches plain scoring.
+        """
+        batch = np.stack([preprocess_image(self.test_image_path)] * 2)
+        
+        scores, features = self.model.predict_with_features(batch)
+        
+        self.assertEqual(scores, self.model.predict_batch(batch))
+        self.assertEqual(features.shape, (2, 1280))
+        np.testing.assert_allclose(features, self.model.extract_features(batch), rtol=1e-4, atol=1e-5)
+    
     def test_get_feedback(self):
         """
         Test feedback generation.
@@ -106,5 +132,88 @@ class TestNimaModel(unittest.TestCase):
         self.assertNotEqual(feedback_good, feedback_excellent)
 
 
+
+class TestModelVersion(unittest.TestCase):
+    """
+    Test cases for models on a TensorFlow Hub backbone.
+    """
+    
+    def setUp(self):
+        """
+        Replace the TensorFlow Hub download with the stand-in backbone; only the rest is under test.
+        """
+        for patcher in (
+            mock.patch("model.nima_model.hub.resolve", lambda url: f"/cache/{os.path.basename(url)}"),
+            mock.patch("model.nima_model.hub.KerasLayer",
+                       lambda path, input_shape: build_standin_backbone(input_shape)),
+            mock.patch.dict(MODEL_SETTINGS, {"backbone": "mobilenet", "head_weights": ""}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+    
+    def test_untrained_head_is_repeatable(self):
+        """
+        Test that two default models without head weights report the same version.
+        """
+        first, second = NimaModel(), NimaModel()
+        self.assertEqual(first.version, second.version)
+    
+    def test_startup_phases_split_resolve_and_layer(self):
+        """
+        Test that resolving the TensorFlow Hub module and building its layer are profiled apart.
+        """
+        profiler = StartupProfiler()
+        with mock.patch("model.nima_model.hub.KerasLayer", wraps=lambda path, input_shape:
+                        build_standin_backbone(input_shape)) as keras_layer:
+            NimaModel(profiler=profiler)
+        
+        self.assertEqual(list(profiler.phases)[:2], ["hub_resolve", "keras_layer"])
+        self.assertNotIn("backbone", profiler.phases)
+        self.assertTrue(keras_layer.call_args.args[0].startswith("/cache/"))
+
+
+class TestRawFrames(unittest.TestCase):
+    """
+    Test cases for the raw frame payload format.
+    """
+    
+    def test_round_trip(self):
+        """
+        Test that frames encoded by the client decode to the same pixels without a copy.
+        """
+        frames = np.random.randint(0, 256, size=(3, 224, 224, 3), dtype=np.uint8)
+        payload = encode_raw_frames(frames)
+        
+        decoded = decode_raw_frames(payload)
+        
+        self.assertEqual(decoded.shape, (3, 224, 224, 3))
+        self.assertTrue(np.array_equal(decoded, frames))
+        self.assertFalse(decoded.flags.owndata)
+    
+    def test_single_frame(self):
+        """
+        Test that a single frame is encoded as a batch of one.
+        """
+        frame = np.zeros((224, 224, 3), dtype=np.uint8)
+        self.assertEqual(decode_raw_frames(encode_raw_frames(frame)).shape, (1, 224, 224, 3))
+    
+    def test_invalid_payloads(self):
+        """
+        Test that malformed payloads are rejected.
+        """
+        payload = encode_raw_frames(np.zeros((2, 224, 224, 3), dtype=np.uint8))
+        
+        with self.assertRaises(ValueError):
+            decode_raw_frames(payload[:10])
+        with self.assertRaises(ValueError):
+            decode_raw_frames(b"XXXX" + payload[4:])
+        with self.assertRaises(ValueError):
+            decode_raw_frames(payload[:-1])
+        with self.assertRaises(ValueError):
+            decode_raw_frames(payload, max_frames=1)
+        with self.assertRaises(ValueError):
+            decode_raw_frames(encode_raw_frames(np.zeros((1, 128, 128, 3), dtype=np.uint8)))
+
+
 if __name__ == "__main__":
     unittest.main()
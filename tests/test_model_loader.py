@@ -0,0 +1,182 @@
+"""
+Unit tests for the background model loader
+
+This module contains unit tests for model loading, warm-up and readiness.
+"""
+
+import threading
+import unittest
+
+from model.loader import ModelLoader, ModelNotReadyError
+
+
+class FakeModel:
+    """
+    Minimal model exposing the interface used by ModelLoader.
+    """
+
+    def __init__(self, latency_ms=5.0):
+        self.latency_ms = latency_ms
+        self.warmups = 0
+
+    def warm_up(self, batch_size=1):
+        self.warmups += 1
+        return self.latency_ms
+
+    def predict(self, image):
+        return 5.0
+
+
+class BlockingModel(FakeModel):
+    """
+    Model whose predictions wait until released, to keep a request in flight.
+    """
+
+    def __init__(self, score):
+        super().__init__()
+        self.score = score
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def predict(self, image):
+        self.started.set()
+        self.release.wait(5)
+        return self.score
+
+
+class TestModelLoader(unittest.TestCase):
+    """
+    Test cases for the model loader.
+    """
+
+    def test_ready_after_warm_up(self):
+        """
+        Test that the loader becomes ready once the model has warmed up.
+        """
+        loader = ModelLoader(FakeModel, warmup_batch_size=2, max_latency_ms=100)
+        self.assertFalse(loader.is_ready())
+
+        loader.start()
+        self.assertTrue(loader.wait(timeout=5))
+        self.assertEqual(loader.status()["state"], ModelLoader.STATE_READY)
+        self.assertEqual(loader.model.warmups, 1)
+
+    def test_failed_load_is_not_ready(self):
+        """
+        Test that a failing factory leaves the loader not ready with an error.
+        """
+        def failing_factory():
+            raise RuntimeError("download failed")
+
+        loader = ModelLoader(failing_factory)
+        loader.start()
+
+        self.assertFalse(loader.wait(timeout=5))
+        self.assertEqual(loader.state, ModelLoader.STATE_FAILED)
+        self.assertIn("download failed", loader.status()["error"])
+        with self.assertRaises(ModelNotReadyError):
+            loader.predict(None)
+
+    def test_slow_model_is_not_ready(self):
+        """
+        Test that readiness is gated on the latency threshold.
+        """
+        loader = ModelLoader(lambda: FakeModel(latency_ms=500.0), max_latency_ms=100, remeasure_interval=60)
+        loader.start()
+
+        self.assertFalse(loader.wait(timeout=5))
+        self.assertFalse(loader.check_ready())
+        loader._remeasure_thread.join(timeout=5)
+        self.assertEqual(loader.model.warmups, 2)
+
+        # Further probes within the interval do not measure again
+        self.assertFalse(loader.check_ready())
+        self.assertFalse(loader.check_ready())
+        self.assertEqual(loader.model.warmups, 2)
+
+        # Once the model speeds up the next measurement brings it back into rotation
+        loader.model.latency_ms = 10.0
+        loader.remeasure_interval = 0
+        loader.check_ready()
+        loader._remeasure_thread.join(timeout=5)
+        self.assertTrue(loader.check_ready())
+
+    def test_predict_records_latency(self):
+        """
+        Test that predictions update the latency moving average.
+        """
+        loader = ModelLoader(FakeModel, max_latency_ms=100, latency_alpha=0.5)
+        loader.start()
+        loader.wait(timeout=5)
+
+        self.assertEqual(loader.predict(None), 5.0)
+        self.assertLess(loader.latency_ms, 5.0)
+
+    def test_reload_swaps_after_in_flight_requests(self):
+        """
+        Test that a hot swap lets in-flight requests finish on the old model and then releases it.
+        """
+        old = BlockingModel(score=3.0)
+        loader = ModelLoader(lambda: old, max_latency_ms=100)
+        loader.start()
+        loader.wait(timeout=5)
+
+        results = []
+        request = threading.Thread(target=lambda: results.append(loader.predict(None)))
+        request.start()
+        self.assertTrue(old.started.wait(5))
+
+        loader.reload(FakeModel).join(timeout=5)
+        self.assertIsInstance(loader.model, FakeModel)
+        self.assertEqual(loader.predict(None), 5.0)
+        self.assertEqual(loader.status()["reload"]["draining_models"], 1)
+
+        old.release.set()
+        request.join(timeout=5)
+        self.assertEqual(results, [3.0])
+        self.assertEqual(loader.status()["reload"]["draining_models"], 0)
+
+    def test_slow_initial_load_does_not_replace_reload(self):
+        """
+        Test that a reload finishing before the initial load keeps its model.
+        """
+        initial = BlockingModel(score=3.0)
+
+        def slow_factory():
+            initial.started.set()
+            initial.release.wait(5)
+            return initial
+
+        loader = ModelLoader(slow_factory, max_latency_ms=100)
+        loader.start()
+        self.assertTrue(initial.started.wait(5))
+
+        newer = FakeModel()
+        loader.reload(lambda: newer).join(timeout=5)
+        self.assertIs(loader.model, newer)
+
+        initial.release.set()
+        loader.wait(timeout=5)
+        self.assertIs(loader.model, newer)
+        self.assertTrue(loader.is_ready())
+
+    def test_failed_reload_keeps_model(self):
+        """
+        Test that a reload that fails leaves the current model serving.
+        """
+        loader = ModelLoader(FakeModel, max_latency_ms=100)
+        loader.start()
+        loader.wait(timeout=5)
+        model = loader.model
+
+        def failing_factory():
+            raise RuntimeError("corrupt weights")
+
+        loader.reload(failing_factory).join(timeout=5)
+        self.assertIs(loader.model, model)
+        self.assertTrue(loader.is_ready())
+        self.assertEqual(loader.status()["reload"]["state"], "failed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Unit tests for the model registry
+
+This module contains unit tests for publishing, activating and watching
+model versions.
+"""
+
+import os
+import queue
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+from model.registry import ModelRegistry
+
+
+class TestModelRegistry(unittest.TestCase):
+    """
+    Test cases for the model registry.
+    """
+
+    def setUp(self):
+        """
+        Create a registry and a weights file to publish.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.registry = ModelRegistry(os.path.join(self.temp_dir.name, "models"), feature_space="standin")
+        self.weights = os.path.join(self.temp_dir.name, "head.npz")
+        np.savez(self.weights, backbone=np.array("standin"), dense0_0=np.zeros((2, 2)))
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        self.temp_dir.cleanup()
+
+    def test_publish_and_activate(self):
+        """
+        Test that versions are immutable, listed, and activated only if they exist.
+        """
+        self.registry.publish("v1", self.weights)
+        with self.assertRaises(FileExistsError):
+            self.registry.publish("v1", self.weights)
+        with self.assertRaises(ValueError):
+            self.registry.publish("../v2", self.weights)
+        with self.assertRaises(FileNotFoundError):
+            self.registry.activate("v2")
+
+        self.assertIsNone(self.registry.active())
+        self.registry.activate("v1")
+        self.assertEqual(self.registry.active(), "v1")
+        self.assertEqual([(v["name"], v["active"]) for v in self.registry.versions()], [("v1", True)])
+
+    def test_rejects_other_feature_spaces(self):
+        """
+        Test that weights trained on other features can be neither published nor activated.
+        """
+        other = os.path.join(self.temp_dir.name, "other.npz")
+        np.savez(other, backbone=np.array("mobilenet"))
+        with self.assertRaises(ValueError):
+            self.registry.publish("v1", other)
+        self.assertEqual(self.registry.versions(), [])
+
+        # An artifact copied into the directory by hand
+        os.link(other, self.registry.path("v2"))
+        with self.assertRaises(ValueError):
+            self.registry.activate("v2")
+        self.assertIsNone(self.registry.active())
+
+    def test_watch_reports_activation(self):
+        """
+        Test that the watcher calls back once per change and retries a failed callback.
+        """
+        self.registry.publish("v1", self.weights)
+        changes = queue.Queue()
+        attempts = []
+
+        def on_change(name):
+            attempts.append(name)
+            if len(attempts) == 1:
+                raise RuntimeError("reload in progress")
+            changes.put(name)
+
+        stop = threading.Event()
+        self.registry.watch(on_change, poll_interval=0.01, stop_event=stop)
+        self.registry.activate("v1")
+        try:
+            self.assertEqual(changes.get(timeout=5), "v1")
+        finally:
+            stop.set()
+        self.assertEqual(attempts, ["v1", "v1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
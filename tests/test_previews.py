@@ -0,0 +1,100 @@
+"""
+Unit tests for the curation tool previews
+
+This module contains unit tests for preview generation and the preview LRU
+cache.
+"""
+
+import os
+import queue
+import tempfile
+import unittest
+from PIL import Image
+
+from previews import PreviewCache, load_preview
+
+
+class TestPreviews(unittest.TestCase):
+    """
+    Test cases for previews and the preview cache.
+    """
+
+    def setUp(self):
+        """
+        Create a few large JPEGs.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.filenames = [f"photo_{i}.jpg" for i in range(4)]
+        for filename in self.filenames:
+            Image.new("RGB", (4000, 2000), color="olive").save(os.path.join(self.temp_dir.name, filename))
+
+        self.events = queue.Queue()
+        self.cache = PreviewCache(
+            self.temp_dir.name, notify=lambda *args: self.events.put(args),
+            convert=lambda image: ("converted", image.size), capacity=2
+        )
+
+    def tearDown(self):
+        """
+        Stop the cache workers and remove the temporary directory.
+        """
+        self.cache.shutdown()
+        self.temp_dir.cleanup()
+
+    def deliver(self, count):
+        """
+        Hand `count` finished previews back to the cache, as the UI thread does.
+        """
+        filenames = []
+        for _ in range(count):
+            filename, image, error = self.events.get(timeout=10)
+            self.assertIsNone(error)
+            self.cache.put(filename, image)
+            filenames.append(filename)
+        return filenames
+
+    def test_load_preview_fits_area(self):
+        """
+        Test that previews keep the aspect ratio and fit the requested area.
+        """
+        preview = load_preview(os.path.join(self.temp_dir.name, self.filenames[0]), (800, 400))
+        self.assertEqual((preview.mode, preview.size), ("RGB", (800, 400)))
+
+        preview = load_preview(os.path.join(self.temp_dir.name, self.filenames[0]), (300, 300))
+        self.assertEqual(preview.size, (300, 150))
+
+    def test_preload_converts_and_evicts_least_recent(self):
+        """
+        Test that preloaded previews are converted, reused, and evicted in LRU order.
+        """
+        self.cache.preload(self.filenames[:2])
+        self.cache.preload(self.filenames[:2])
+        self.assertEqual(sorted(self.deliver(2)), self.filenames[:2])
+        self.assertTrue(self.events.empty())
+
+        self.assertEqual(self.cache.get(self.filenames[0]), ("converted", (800, 400)))
+        self.cache.preload(self.filenames[2:3])
+        self.deliver(1)
+
+        self.assertIsNotNone(self.cache.get(self.filenames[0]))
+        self.assertIsNone(self.cache.get(self.filenames[1]))
+        self.assertIsNotNone(self.cache.get(self.filenames[2]))
+
+    def test_unreadable_image_reports_error(self):
+        """
+        Test that a failed preview is reported and can be retried.
+        """
+        with open(os.path.join(self.temp_dir.name, "broken.jpg"), "w") as f:
+            f.write("not an image")
+
+        self.cache.preload(["broken.jpg"])
+        filename, image, error = self.events.get(timeout=10)
+        self.assertEqual((filename, image), ("broken.jpg", None))
+        self.assertTrue(error)
+
+        self.cache.preload(["broken.jpg"])
+        self.assertEqual(self.events.get(timeout=10)[0], "broken.jpg")
+
+
+if __name__ == "__main__":
+    unittest.main()
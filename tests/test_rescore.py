@@ -0,0 +1,92 @@
+"""
+Unit tests for incremental re-scoring
+
+This module contains unit tests for finding stale examples through the
+score manifest and writing new scores back to the catalog.
+"""
+
+import os
+import tempfile
+import unittest
+from PIL import Image
+
+from examples_catalog import ExamplesCatalog
+from rescore import rescore
+from tests.helpers import FakeModel
+
+
+class TestRescore(unittest.TestCase):
+    """
+    Test cases for re-scoring the examples library.
+    """
+
+    def setUp(self):
+        """
+        Create a catalog with three example images.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.examples_dir = self.temp_dir.name
+        self.catalog = ExamplesCatalog(os.path.join(self.temp_dir.name, "examples.db"))
+
+        for number, color in enumerate(["red", "green", "blue"], start=1):
+            filename = f"average_score_{number}.jpg"
+            Image.new("RGB", (64, 48), color=color).save(os.path.join(self.examples_dir, filename))
+            self.catalog.add(filename, "average", 5.0)
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        self.temp_dir.cleanup()
+
+    def test_only_stale_examples_are_rescored(self):
+        """
+        Test that a second run with the same model scores nothing.
+        """
+        model = FakeModel("v1", 6.25)
+        summary = rescore(self.catalog, model, self.examples_dir, batch_size=2)
+
+        self.assertEqual(summary, {"checked": 3, "rescored": 3, "changed": 3, "failed": 0})
+        self.assertEqual([e["score"] for e in self.catalog.list_examples()], [6.25] * 3)
+
+        summary = rescore(self.catalog, model, self.examples_dir, batch_size=2)
+        self.assertEqual(summary["rescored"], 0)
+        self.assertEqual(model.scored, 3)
+
+    def test_model_or_content_change_marks_stale(self):
+        """
+        Test that a new model version re-scores everything and a changed image only itself.
+        """
+        rescore(self.catalog, FakeModel("v1", 6.0), self.examples_dir)
+
+        path = os.path.join(self.examples_dir, "average_score_2.jpg")
+        Image.new("RGB", (64, 48), color="white").save(path)
+        os.utime(path, ns=(0, 0))
+        model = FakeModel("v1", 7.0)
+        self.assertEqual(rescore(self.catalog, model, self.examples_dir)["rescored"], 1)
+        self.assertEqual(self.catalog.get("average_score_2.jpg")["score"], 7.0)
+
+        # Touching a file without changing it does not need a new score
+        os.utime(path, ns=(10 ** 9, 10 ** 9))
+        self.assertEqual(rescore(self.catalog, model, self.examples_dir)["rescored"], 0)
+
+        self.assertEqual(rescore(self.catalog, FakeModel("v2", 7.0), self.examples_dir)["rescored"], 3)
+
+    def test_dry_run_and_change_log(self):
+        """
+        Test that a dry run writes nothing and real changes reach the change log.
+        """
+        version = self.catalog.version()
+        summary = rescore(self.catalog, FakeModel("v1", 8.0), self.examples_dir, dry_run=True)
+
+        self.assertEqual(summary["changed"], 3)
+        self.assertEqual(self.catalog.score_manifest(), {})
+        self.assertEqual(self.catalog.version(), version)
+
+        rescore(self.catalog, FakeModel("v1", 8.0), self.examples_dir)
+        ops = [op for _, op, _ in self.catalog.changes_since(version)]
+        self.assertEqual(ops, ["update"] * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Unit tests for the score distribution
+
+This module contains unit tests for score binning, percentile ranks and
+merging the histogram across workers.
+"""
+
+import os
+import tempfile
+import unittest
+
+from score_stats import ScoreHistogram, score_to_bin, NUM_BINS
+
+
+class TestScoreHistogram(unittest.TestCase):
+    """
+    Test cases for the score histogram.
+    """
+
+    def setUp(self):
+        """
+        Create a temporary database.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "scores.db")
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        self.temp_dir.cleanup()
+
+    def test_score_to_bin_clamps(self):
+        """
+        Test that scores map to 0.01-wide bins and out-of-range scores are clamped.
+        """
+        self.assertEqual(score_to_bin(1.0), 0)
+        self.assertEqual(score_to_bin(5.55), 455)
+        self.assertEqual(score_to_bin(10.0), NUM_BINS - 1)
+        self.assertEqual(score_to_bin(0.2), 0)
+        self.assertEqual(score_to_bin(12.0), NUM_BINS - 1)
+
+    def test_percentile_counts_ties_half(self):
+        """
+        Test percentile ranks, with equal scores counted as half below.
+        """
+        histogram = ScoreHistogram(self.db_path, flush_interval=3600, min_samples=1)
+        histogram.record([2.0, 4.0, 4.0, 6.0])
+
+        self.assertEqual(histogram.percentile(1.5), 0.0)
+        self.assertEqual(histogram.percentile(4.0), 50.0)
+        self.assertEqual(histogram.percentile(5.0), 75.0)
+        self.assertEqual(histogram.percentile(9.0), 100.0)
+
+    def test_percentile_needs_min_samples(self):
+        """
+        Test that no percentile is reported before enough scores are recorded.
+        """
+        histogram = ScoreHistogram(self.db_path, flush_interval=3600, min_samples=3)
+        histogram.record([5.0, 6.0])
+        self.assertIsNone(histogram.percentile(5.5))
+
+        histogram.record(7.0)
+        self.assertEqual(histogram.total(), 3)
+        self.assertEqual(histogram.percentile(6.5), 66.7)
+
+    def test_workers_merge_through_database(self):
+        """
+        Test that two histograms on the same database see each other's scores after a flush.
+        """
+        first = ScoreHistogram(self.db_path, flush_interval=3600, min_samples=1)
+        second = ScoreHistogram(self.db_path, flush_interval=3600, min_samples=1)
+
+        first.record([3.0, 4.0])
+        second.record(8.0)
+        first.flush()
+        second.flush()
+        first.flush()
+
+        self.assertEqual(first.total(), 3)
+        self.assertEqual(second.total(), 3)
+        self.assertEqual(first.percentile(5.0), second.percentile(5.0))
+
+        # Counts are merged once, however often a worker flushes
+        self.assertEqual(ScoreHistogram(self.db_path).total(), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Unit tests for the example similarity index
+
+This module contains unit tests for nearest-neighbour queries, incremental
+updates, persistence and syncing with the examples catalog.
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from examples_catalog import ExamplesCatalog
+from similarity_index import SimilarityIndex
+
+
+def one_hot(position, dim=8):
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[position] = 1.0
+    return vector
+
+
+class TestSimilarityIndex(unittest.TestCase):
+    """
+    Test cases for the similarity index.
+    """
+
+    def setUp(self):
+        """
+        Create an index with a few orthogonal vectors.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.index = SimilarityIndex("standin")
+        for i in range(5):
+            self.index.add(f"high_score_{i}.jpg", one_hot(i) * (i + 1))
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        self.temp_dir.cleanup()
+
+    def test_query_ranks_by_cosine_similarity(self):
+        """
+        Test that results are ordered by cosine similarity, ignoring magnitude.
+        """
+        query = one_hot(3) * 0.1 + one_hot(1) * 0.05
+
+        results = self.index.query(query, k=2)
+
+        self.assertEqual([filename for filename, _ in results], ["high_score_3.jpg", "high_score_1.jpg"])
+        self.assertAlmostEqual(results[0][1], 2 / np.sqrt(5), places=5)
+        self.assertEqual(len(self.index.query(query, k=2, exclude=["high_score_3.jpg"])), 2)
+
+    def test_remove_moves_last_row(self):
+        """
+        Test that removing an example keeps the other rows queryable.
+        """
+        self.assertTrue(self.index.remove("high_score_1.jpg"))
+        self.assertFalse(self.index.remove("high_score_1.jpg"))
+
+        self.assertEqual(len(self.index), 4)
+        self.assertNotIn("high_score_1.jpg", self.index)
+        self.assertEqual(self.index.query(one_hot(4), k=1)[0][0], "high_score_4.jpg")
+        self.assertEqual(self.index.query(one_hot(1), k=1)[0][1], 0.0)
+
+    def test_save_and_load(self):
+        """
+        Test that a saved index round-trips and is discarded for another backbone.
+        """
+        path = os.path.join(self.temp_dir.name, "similarity.npz")
+        self.index.catalog_version = 7
+        self.index.save(path)
+
+        loaded = SimilarityIndex.load("standin", path)
+        self.assertEqual(len(loaded), 5)
+        self.assertEqual(loaded.catalog_version, 7)
+        self.assertEqual(loaded.query(one_hot(2), k=1)[0][0], "high_score_2.jpg")
+        loaded.add("low_score_1.jpg", one_hot(0))
+        self.assertEqual(len(loaded), 6)
+
+        self.assertEqual(len(SimilarityIndex.load("mobilenet", path)), 0)
+
+    def test_sync_follows_catalog(self):
+        """
+        Test that syncing embeds only new examples and drops deleted ones.
+        """
+        examples_dir = os.path.join(self.temp_dir.name, "examples")
+        os.makedirs(examples_dir)
+        catalog = ExamplesCatalog(os.path.join(self.temp_dir.name, "examples.db"))
+        embedded = []
+
+        def embed(paths):
+            embedded.extend(os.path.basename(path) for path in paths)
+            return [one_hot(len(embedded) % 8) for _ in paths]
+
+        for i in range(3):
+            open(os.path.join(examples_dir, f"low_score_{i}.jpg"), "wb").close()
+            catalog.add(f"low_score_{i}.jpg", "low", 2.0)
+
+        index = SimilarityIndex("standin")
+        self.assertEqual(index.sync(catalog, examples_dir, embed), 3)
+        self.assertEqual(index.sync(catalog, examples_dir, embed), 0)
+
+        catalog.delete("low_score_0.jpg")
+        open(os.path.join(examples_dir, "low_score_3.jpg"), "wb").close()
+        catalog.add("low_score_3.jpg", "low", 2.5)
+        index.sync(catalog, examples_dir, embed)
+
+        self.assertEqual(embedded, ["low_score_0.jpg", "low_score_1.jpg", "low_score_2.jpg", "low_score_3.jpg"])
+        self.assertEqual(sorted(index._rows), ["low_score_1.jpg", "low_score_2.jpg", "low_score_3.jpg"])
+
+
+if __name__ == "__main__":
+    unittest.main()
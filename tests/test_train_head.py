@@ -0,0 +1,135 @@
+"""
+Unit tests for head-only training
+
+This module contains unit tests for reading labels, caching backbone
+features and training and loading the scoring head.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+from config import MODEL_SETTINGS
+from model.nima_model import NimaModel, save_head_weights
+from train_head import SCORE_VALUES, emd_loss, extract_features, load_labels, train_head
+
+
+class CountingModel:
+    """
+    Backbone stand-in whose features are the mean pixel value, counting images seen.
+    """
+
+    feature_space = "test"
+    # Narrower than MobileNet's 1280, so the cache must take its width from the model
+    feature_dim = 8
+
+    def __init__(self):
+        self.seen = 0
+
+    def extract_features(self, images):
+        self.seen += len(images)
+        return np.repeat(images.mean(axis=(1, 2, 3))[:, None], self.feature_dim, axis=1)
+
+
+class TestTrainHead(unittest.TestCase):
+    """
+    Test cases for head training.
+    """
+
+    def setUp(self):
+        """
+        Create a temporary directory.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        self.temp_dir.cleanup()
+
+    def test_load_labels(self):
+        """
+        Test that mean scores and vote counts both become distributions with the right mean.
+        """
+        scores = os.path.join(self.temp_dir.name, "scores.csv")
+        with open(scores, "w") as f:
+            f.write("path,score\na.jpg,3.0\nb.jpg,8.5\n")
+        paths, targets = load_labels(scores)
+        self.assertEqual(paths, ["a.jpg", "b.jpg"])
+        np.testing.assert_allclose(targets.sum(axis=1), 1.0, rtol=1e-5)
+        np.testing.assert_allclose(targets @ SCORE_VALUES, [3.0, 8.5], atol=0.2)
+
+        votes = os.path.join(self.temp_dir.name, "votes.csv")
+        with open(votes, "w") as f:
+            f.write("path," + ",".join(f"votes_{i}" for i in range(1, 11)) + "\n")
+            f.write("c.jpg,0,0,0,0,2,2,0,0,0,0\n")
+        paths, targets = load_labels(votes)
+        np.testing.assert_allclose(targets[0][4:6], [0.5, 0.5])
+
+    def test_features_are_cached(self):
+        """
+        Test that features are computed once, unreadable images are masked and a changed image list rebuilds the cache.
+        """
+        root = os.path.join(self.temp_dir.name, "images")
+        os.makedirs(root)
+        paths = []
+        for value in (0, 128, 255):
+            Image.new("RGB", (16, 16), color=(value,) * 3).save(os.path.join(root, f"{value}.png"))
+            paths.append(f"{value}.png")
+        with open(os.path.join(root, "broken.jpg"), "w") as f:
+            f.write("not an image")
+        paths.append("broken.jpg")
+        cache_dir = os.path.join(self.temp_dir.name, "cache")
+
+        model = CountingModel()
+        features, valid = extract_features(model, root, paths, cache_dir, batch_size=2)
+        self.assertEqual(list(valid), [True, True, True, False])
+        self.assertEqual(features.shape, (4, 8))
+        np.testing.assert_allclose(features[:3, 0], [0.0, 128 / 255, 1.0], atol=1e-3)
+
+        features, valid = extract_features(model, root, paths, cache_dir, batch_size=2)
+        self.assertEqual(model.seen, 3)
+        self.assertFalse(valid[3])
+
+        extract_features(model, root, paths[:2], cache_dir)
+        self.assertEqual(model.seen, 5)
+
+    def test_train_and_load_head(self):
+        """
+        Test that training lowers the EMD and the saved head changes the model's scores.
+        """
+        rng = np.random.default_rng(0)
+        features = rng.normal(size=(2000, 32)).astype(np.float32)
+        means = 5.5 + 2.0 * np.tanh(features[:, 0])
+        targets = np.stack([np.exp(-0.5 * (SCORE_VALUES - mean) ** 2) for mean in means])
+        targets /= targets.sum(axis=1, keepdims=True)
+
+        # Predicting the average distribution for every image ignores the features
+        average = np.repeat(targets.mean(axis=0, keepdims=True), len(targets), axis=0)
+        layers, metrics = train_head(features, targets, epochs=20, batch_size=64, patience=20)
+        self.assertLess(metrics["val_emd"], float(np.mean(emd_loss(targets, average))) / 2)
+        self.assertLess(metrics["mean_abs_error"], 0.5)
+
+        features = rng.normal(size=(200, 1280)).astype(np.float32)
+        layers, _ = train_head(features, targets[:200], epochs=1)
+        path = os.path.join(self.temp_dir.name, "head.npz")
+        save_head_weights(path, layers, "standin")
+        default = NimaModel("standin")
+        with mock.patch.dict(MODEL_SETTINGS, {"head_weights": path}):
+            trained = NimaModel("standin")
+        self.assertNotEqual(trained.version, default.version)
+
+        # Weights trained on other features are ignored, or rejected if requested explicitly
+        save_head_weights(path, layers, "mobilenet")
+        self.assertFalse(default.load_head_weights(path))
+        with self.assertRaises(ValueError):
+            NimaModel("standin", head_weights=path)
+
+
+if __name__ == "__main__":
+    unittest.main()
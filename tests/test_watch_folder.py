@@ -0,0 +1,121 @@
+"""
+Unit tests for the watch-folder daemon
+
+This module contains unit tests for settling, batching and resuming the
+watch-folder scorer.
+"""
+
+import os
+import time
+import tempfile
+import unittest
+from unittest import mock
+from PIL import Image
+
+from watch_folder import FolderWatcher, ScoreStore
+from tests.helpers import FakeModel
+
+
+class TestFolderWatcher(unittest.TestCase):
+    """
+    Test cases for the folder watcher.
+    """
+
+    def setUp(self):
+        """
+        Create a watched directory with three settled images, one in a subdirectory.
+        """
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, "incoming")
+        os.makedirs(os.path.join(self.root, "shoot"))
+        self.store = ScoreStore(os.path.join(self.temp_dir.name, "watch.db"))
+
+        for path in ("a.jpg", "b.png", "shoot/c.jpg"):
+            self.add_image(path, age=60)
+        with open(os.path.join(self.root, ".a.jpg.partial"), "w") as f:
+            f.write("temporary file")
+
+    def tearDown(self):
+        """
+        Remove the temporary directory.
+        """
+        self.temp_dir.cleanup()
+
+    def add_image(self, path, age):
+        """
+        Write an image whose mtime is `age` seconds in the past.
+        """
+        full_path = os.path.join(self.root, path)
+        Image.new("RGB", (32, 32), color="navy").save(full_path)
+        mtime = time.time() - age
+        os.utime(full_path, (mtime, mtime))
+        return full_path
+
+    def watcher(self, model):
+        """
+        Create a watcher over the test directory.
+        """
+        return FolderWatcher([self.root], model, self.store, settle_seconds=2.0, batch_size=2)
+
+    def test_scores_settled_images_in_batches(self):
+        """
+        Test that existing images are scored in batches and hidden files are ignored.
+        """
+        model = FakeModel()
+        scored, waiting = self.watcher(model).run_once()
+
+        self.assertEqual((scored, waiting), (3, 0))
+        self.assertEqual(model.batches, [2, 1])
+        result = self.store.get(os.path.join(self.root, "shoot", "c.jpg"))
+        self.assertEqual((result["score"], result["model_version"]), (6.0, "v1"))
+
+    def test_debounces_files_being_written(self):
+        """
+        Test that a recently modified file waits until it has settled.
+        """
+        watcher = self.watcher(FakeModel())
+        watcher.run_once()
+        path = self.add_image("new.jpg", age=0)
+
+        self.assertEqual(watcher.run_once(), (0, 1))
+
+        # Still growing at the next scan
+        with open(path, "ab") as f:
+            f.write(b"\0" * 16)
+        self.assertEqual(watcher.run_once(now=time.time() + 5), (0, 1))
+
+        # Unchanged since the previous scan and quiet for long enough
+        self.assertEqual(watcher.run_once(now=time.time() + 5), (1, 0))
+
+    def test_restart_resumes_from_store(self):
+        """
+        Test that a new watcher skips scored files but re-scores changed ones and other model versions.
+        """
+        self.watcher(FakeModel()).run_once()
+
+        self.add_image("b.png", age=30)
+        os.remove(os.path.join(self.root, "a.jpg"))
+        model = FakeModel()
+        self.assertEqual(self.watcher(model).run_once(), (1, 0))
+        self.assertIsNone(self.store.get(os.path.join(self.root, "a.jpg")))
+
+        self.assertEqual(self.watcher(FakeModel("v2")).run_once(), (2, 0))
+
+    def test_unlistable_root_keeps_scores(self):
+        """
+        Test that a root that cannot be listed (e.g. a stale mount) does not drop its stored scores.
+        """
+        watcher = self.watcher(FakeModel())
+        watcher.run_once()
+
+        with mock.patch("watch_folder.os.scandir", side_effect=OSError("Stale file handle")):
+            self.assertEqual(watcher.run_once(), (0, 0))
+        self.assertIsNotNone(self.store.get(os.path.join(self.root, "a.jpg")))
+
+        # Once the mount is back nothing is re-scored
+        self.assertEqual(watcher.run_once(), (0, 0))
+        self.assertEqual(self.watcher(FakeModel()).run_once(), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
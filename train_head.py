@@ -0,0 +1,327 @@
+"""
+Head-only training of the scoring model on cached backbone features.
+
+The MobileNet backbone is frozen, so only the dense scoring head needs
+training, and the backbone's features for an image never change. This
+script runs the backbone once over a labelled image set and stores the
+features in a memory-mapped array, then trains the head on the cached
+features with the Earth Mover's Distance loss from the NIMA paper. Epochs
+take seconds instead of re-decoding every image, and the features are
+reused for further runs with other settings. The trained weights are saved
+where `NimaModel` loads them at startup.
+
+Labels come from a CSV file with a `path` column (relative to the image
+directory) and either a mean `score` (1-10) or the ten vote counts
+`votes_1` to `votes_10`, as in the AVA dataset.
+
+Usage:
+    python train_head.py labels.csv --images /path/to/images [--epochs 30] [--output data/nima_head.npz]
+    python train_head.py labels.csv --images /path/to/images --publish v2   # add to the model registry
+    python train_head.py labels.csv --images /path/to/images --input-size 160   # screening head for cascade.py
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import os
+import csv
+import json
+import time
+import hashlib
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Import configuration settings
+from config import CASCADE_SETTINGS, FEATURES_DIR, MODEL_SETTINGS, TRAIN_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+# Scores 1-10, the support of every score distribution
+SCORE_VALUES = np.arange(1, 11, dtype=np.float32)
+
+
+def score_distribution(score, sigma=None):
+    """
+    Turn a mean score into a distribution over the scores 1-10.
+
+    Args:
+        score (float): Mean score
+        sigma (float): Spread of the distribution (default from config)
+
+    Returns:
+        numpy.ndarray: float32 probabilities of shape (10,)
+    """
+    sigma = sigma or TRAIN_SETTINGS["label_sigma"]
+    weights = np.exp(-0.5 * ((SCORE_VALUES - score) / sigma) ** 2)
+    return (weights / weights.sum()).astype(np.float32)
+
+
+def load_labels(csv_path, sigma=None):
+    """
+    Read a labels file.
+
+    Args:
+        csv_path (str): CSV with a "path" column and either "score" or
+            "votes_1" to "votes_10"
+        sigma (float): Spread of distributions built from mean scores
+
+    Returns:
+        tuple: (list of relative paths, float32 array of score distributions
+            of shape (n, 10))
+
+    Raises:
+        ValueError: If the file has neither score nor vote columns
+    """
+    vote_columns = [f"votes_{value}" for value in range(1, 11)]
+    paths, targets = [], []
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        columns = set(reader.fieldnames or ())
+        if "path" not in columns or not ("score" in columns or columns.issuperset(vote_columns)):
+            raise ValueError(f"{csv_path} needs a path column and a score or votes_1..votes_10 columns")
+
+        for row in reader:
+            if columns.issuperset(vote_columns):
+                votes = np.array([float(row[column]) for column in vote_columns], dtype=np.float32)
+                if votes.sum() <= 0:
+                    continue
+                targets.append(votes / votes.sum())
+            else:
+                targets.append(score_distribution(float(row["score"]), sigma))
+            paths.append(row["path"])
+
+    return paths, np.stack(targets) if targets else np.zeros((0, 10), dtype=np.float32)
+
+
+def _load(path):
+    """
+    Preprocess an image for the backbone, returning None if it cannot be read.
+
+    Args:
+        path (str): Path to the image file
+
+    Returns:
+        numpy.ndarray: Preprocessed image, or None
+    """
+    # Imported here so label handling does not load TensorFlow
+    from model.utils import preprocess_image
+
+    try:
+        return preprocess_image(path)
+    except Exception:
+        return None
+
+
+def extract_features(model, root, paths, cache_dir=None, batch_size=None, decode_workers=None):
+    """
+    Compute backbone features for a set of images, reusing the cache.
+
+    Features are written to `features.npy` in the cache directory as a
+    memory-mapped array, with progress recorded in `features.json` after
+    every batch, so an interrupted extraction resumes where it stopped and
+    a finished one is not repeated. The cache is rebuilt when the feature
+    space (backbone and input size) or the list of images changes.
+
+    Args:
+        model (NimaModel): Model whose backbone computes the features; its
+            `feature_dim` sets the width of the cache
+        root (str): Directory the paths are relative to
+        paths (list): Relative image paths
+        cache_dir (str): Cache directory (default: FEATURES_DIR/<feature space>)
+        batch_size (int): Images per backbone call (default from config)
+        decode_workers (int): Image decoding threads (default from config)
+
+    Returns:
+        tuple: (memory-mapped float32 array of shape (n, feature_dim),
+            boolean array marking readable images)
+    """
+    cache_dir = cache_dir or os.path.join(FEATURES_DIR, model.feature_space)
+    batch_size = batch_size or TRAIN_SETTINGS["extract_batch_size"]
+    decode_workers = decode_workers or TRAIN_SETTINGS["decode_workers"]
+    os.makedirs(cache_dir, exist_ok=True)
+    array_path = os.path.join(cache_dir, "features.npy")
+    meta_path = os.path.join(cache_dir, "features.json")
+
+    key = hashlib.sha256("\n".join([model.feature_space] + list(paths)).encode("utf-8")).hexdigest()
+    meta = {"key": key, "done": 0, "failed": []}
+    if os.path.exists(meta_path) and os.path.exists(array_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("key") == key:
+            meta = cached
+
+    if meta["done"] == 0:
+        features = np.lib.format.open_memmap(array_path, mode="w+", dtype=np.float32,
+                                             shape=(len(paths), model.feature_dim))
+    else:
+        features = np.load(array_path, mmap_mode="r+")
+
+    if meta["done"] < len(paths):
+        logger.info(f"Extracting features for {len(paths) - meta['done']} of {len(paths)} images...")
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=decode_workers, thread_name_prefix="features") as pool:
+            for offset in range(meta["done"], len(paths), batch_size):
+                batch = paths[offset:offset + batch_size]
+                images = list(pool.map(_load, [os.path.join(root, path) for path in batch]))
+
+                readable = [index for index, image in enumerate(images) if image is not None]
+                meta["failed"].extend(offset + index for index, image in enumerate(images) if image is None)
+                if readable:
+                    rows = model.extract_features(np.stack([images[index] for index in readable]))
+                    features[[offset + index for index in readable]] = rows
+
+                # Record progress only once the rows are on disk
+                features.flush()
+                meta["done"] = offset + len(batch)
+                with open(meta_path, "w", encoding="utf-8") as f:
+                    json.dump(meta, f)
+        logger.info(f"Features extracted in {time.perf_counter() - start:.1f}s")
+    else:
+        logger.info(f"Using cached features for {len(paths)} images from {cache_dir}")
+
+    valid = np.ones(len(paths), dtype=bool)
+    valid[meta["failed"]] = False
+    return np.load(array_path, mmap_mode="r"), valid
+
+
+def emd_loss(y_true, y_pred):
+    """
+    Earth Mover's Distance between score distributions (r = 2).
+
+    Args:
+        y_true (tf.Tensor): Target distributions of shape (n, 10)
+        y_pred (tf.Tensor): Predicted distributions of shape (n, 10)
+
+    Returns:
+        tf.Tensor: Loss per example
+    """
+    import tensorflow as tf
+
+    cdf_true = tf.cumsum(y_true, axis=-1)
+    cdf_pred = tf.cumsum(y_pred, axis=-1)
+    return tf.sqrt(tf.reduce_mean(tf.square(cdf_true - cdf_pred), axis=-1))
+
+
+def train_head(features, targets, epochs=None, batch_size=None, learning_rate=None, validation_fraction=None,
+               patience=None, seed=0):
+    """
+    Train a scoring head on backbone features.
+
+    Training stops early once the validation loss stops improving, and the
+    weights of the best epoch are kept.
+
+    Args:
+        features (numpy.ndarray): Features of shape (n, feature_dim)
+        targets (numpy.ndarray): Score distributions of shape (n, 10)
+        epochs (int): Maximum epochs (default from config)
+        batch_size (int): Feature vectors per step (default from config)
+        learning_rate (float): Adam learning rate (default from config)
+        validation_fraction (float): Share of examples held out (default from config)
+        patience (int): Epochs without improvement before stopping (default from config)
+        seed (int): Seed for the split and initialization
+
+    Returns:
+        tuple: (list of head layers, dict with the best "val_emd" and the
+            validation "mean_abs_error" of the mean score)
+    """
+    import tensorflow as tf
+    from model.nima_model import build_head_layers
+
+    epochs = epochs or TRAIN_SETTINGS["epochs"]
+    batch_size = batch_size or TRAIN_SETTINGS["batch_size"]
+    learning_rate = learning_rate or TRAIN_SETTINGS["learning_rate"]
+    validation_fraction = validation_fraction if validation_fraction is not None else TRAIN_SETTINGS["validation_fraction"]
+    patience = patience or TRAIN_SETTINGS["patience"]
+
+    # Hold out a random share of the examples; reading them in index order
+    # keeps the reads from the memory map sequential
+    order = np.random.default_rng(seed).permutation(len(features))
+    held_out = max(1, int(len(features) * validation_fraction))
+    val_index, train_index = np.sort(order[:held_out]), np.sort(order[held_out:])
+    x_train, y_train = np.asarray(features[train_index]), targets[train_index]
+    x_val, y_val = np.asarray(features[val_index]), targets[val_index]
+
+    tf.keras.utils.set_random_seed(seed)
+    layers = build_head_layers()
+    inputs = tf.keras.Input(shape=(features.shape[1],))
+    x = inputs
+    for layer in layers:
+        x = layer(x)
+    head = tf.keras.Model(inputs=inputs, outputs=x)
+    head.compile(optimizer=tf.keras.optimizers.Adam(learning_rate), loss=emd_loss)
+
+    head.fit(
+        x_train, y_train, validation_data=(x_val, y_val), epochs=epochs, batch_size=batch_size, shuffle=True,
+        callbacks=[tf.keras.callbacks.EarlyStopping(patience=patience, restore_best_weights=True)], verbose=2
+    )
+
+    predictions = head.predict(x_val, batch_size=batch_size, verbose=0)
+    metrics = {
+        "val_emd": float(np.mean(emd_loss(y_val, predictions))),
+        "mean_abs_error": float(np.mean(np.abs(predictions @ SCORE_VALUES - y_val @ SCORE_VALUES))),
+    }
+    return layers, metrics
+
+
+def main():
+    """
+    Command-line entry point for head training.
+    """
+    parser = argparse.ArgumentParser(description="Train the scoring head on cached backbone features")
+    parser.add_argument("labels", type=str, help="CSV with path and score or votes_1..votes_10 columns")
+    parser.add_argument("--images", type=str, help="Directory the label paths are relative to "
+                                                   "(default: the labels file's directory)")
+    parser.add_argument("--output", type=str, help="Weights file to write (default: MODEL_SETTINGS, or "
+                                                   "CASCADE_SETTINGS with --input-size)")
+    parser.add_argument("--cache-dir", type=str, help="Feature cache directory")
+    parser.add_argument("--epochs", type=int, default=TRAIN_SETTINGS["epochs"], help="Maximum epochs")
+    parser.add_argument("--batch-size", type=int, default=TRAIN_SETTINGS["batch_size"], help="Training batch size")
+    parser.add_argument("--learning-rate", type=float, default=TRAIN_SETTINGS["learning_rate"], help="Learning rate")
+    parser.add_argument("--input-size", type=int,
+                        help="Train for a low-resolution model with this input size (see cascade.py)")
+    parser.add_argument("--publish", type=str, metavar="VERSION",
+                        help="Also add the weights to the model registry under this version name")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    from model.nima_model import NimaModel, save_head_weights
+
+    paths, targets = load_labels(args.labels)
+    if len(paths) < 2:
+        parser.error(f"{args.labels} has fewer than two labelled images")
+    root = args.images or os.path.dirname(os.path.abspath(args.labels))
+
+    if args.output is None:
+        args.output = CASCADE_SETTINGS["head_weights"] if args.input_size else MODEL_SETTINGS["head_weights"]
+
+    model = NimaModel(input_size=args.input_size)
+    features, valid = extract_features(model, root, paths, args.cache_dir)
+    if not valid.all():
+        logger.warning(f"Skipping {int((~valid).sum())} unreadable images")
+    index = np.flatnonzero(valid)
+
+    start = time.perf_counter()
+    layers, metrics = train_head(features[index], targets[index], epochs=args.epochs, batch_size=args.batch_size,
+                                 learning_rate=args.learning_rate)
+    elapsed = time.perf_counter() - start
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    save_head_weights(args.output, layers, model.feature_space)
+    print(f"Trained on {len(index)} images in {elapsed:.1f}s: validation EMD {metrics['val_emd']:.4f}, "
+          f"mean score error {metrics['mean_abs_error']:.2f}")
+    print(f"Head weights written to {args.output}; restart the app to load them")
+
+    if args.publish:
+        from model.registry import ModelRegistry
+
+        ModelRegistry().publish(args.publish, args.output)
+        print(f"Published as model version {args.publish}; activate it with POST /admin/model")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+"""
+Watch-folder scoring daemon.
+
+This module watches one or more directory trees and scores images as they
+arrive, without anyone calling the API. Directories are scanned on an
+interval, and when the optional `watchdog` package is installed, filesystem
+events trigger a scan right away. A file is scored only once its size and
+modification time have stopped changing, so partially copied files are
+never read. Images that settle together are scored in batches.
+
+Results go to a SQLite store that also serves as the daemon's cursor: it
+records the size, modification time and model version each file was scored
+with, so after a restart only new, changed or stale files are scored.
+
+Usage:
+    python watch_folder.py /shared/incoming [/shared/other ...] [--once]
+
+Copyright (c) 2025 Nicole LeGuern
+Licensed under MIT License with attribution requirements
+https://github.com/CodeQueenie/Aesthetic-Lens---AI_Powered_Image_Aesthetic_Scoring_Tool
+"""
+
+import os
+import time
+import signal
+import sqlite3
+import logging
+import argparse
+import threading
+
+# Import configuration settings
+from config import ALLOWED_EXTENSIONS, WATCH_SETTINGS, WATCH_STORE
+from batch_score import score_batch
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    score REAL,
+    model_version TEXT NOT NULL,
+    error TEXT,
+    scored_at TEXT NOT NULL
+);
+"""
+
+
+class ScoreStore:
+    """
+    SQLite store of watch-folder scores.
+    """
+
+    def __init__(self, db_path=WATCH_STORE):
+        """
+        Open (and if needed create) the store.
+
+        Args:
+            db_path (str): Path to the SQLite database file
+        """
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        """
+        Open a connection to the store.
+
+        Returns:
+            sqlite3.Connection: Connection in WAL mode with row access by name
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def signatures(self):
+        """
+        Get what every stored file was scored from.
+
+        Returns:
+            dict: Mapping of path to (size, mtime_ns, model_version)
+        """
+        with self._connect() as conn:
+            rows = conn.execute("SELECT path, size, mtime_ns, model_version FROM scores").fetchall()
+        return {row["path"]: (row["size"], row["mtime_ns"], row["model_version"]) for row in rows}
+
+    def record(self, results):
+        """
+        Store scoring results in one transaction.
+
+        Args:
+            results (list): Dicts with "path", "size", "mtime_ns", "score",
+                "model_version" and "error"
+        """
+        scored_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO scores (path, size, mtime_ns, score, model_version, error, scored_at) "
+                "VALUES (:path, :size, :mtime_ns, :score, :model_version, :error, :scored_at)",
+                [dict(result, scored_at=scored_at) for result in results]
+            )
+
+    def remove(self, paths):
+        """
+        Forget files that no longer exist.
+
+        Args:
+            paths (list): Paths to remove
+        """
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM scores WHERE path = ?", [(path,) for path in paths])
+
+    def get(self, path):
+        """
+        Look up the result for one file.
+
+        Args:
+            path (str): Absolute path of the image
+
+        Returns:
+            dict: The stored result, or None
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM scores WHERE path = ?", (os.path.abspath(path),)).fetchone()
+        return dict(row) if row else None
+
+
+class FolderWatcher:
+    """
+    Scores settled new and changed images under a set of directories.
+    """
+
+    def __init__(self, roots, model, store, poll_interval=None, settle_seconds=None, batch_size=None):
+        """
+        Initialize the watcher.
+
+        Args:
+            roots (list): Directories to watch (recursively)
+            model: Model with a `version` attribute and `predict_batch(images)`
+            store (ScoreStore): Results store and cursor
+            poll_interval (float): Seconds between scans (default from config)
+            settle_seconds (float): Quiet time before a file is scored (default from config)
+            batch_size (int): Images per model call (default from config)
+        """
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.model = model
+        self.store = store
+        self.poll_interval = poll_interval if poll_interval is not None else WATCH_SETTINGS["poll_interval"]
+        self.settle_seconds = settle_seconds if settle_seconds is not None else WATCH_SETTINGS["settle_seconds"]
+        self.batch_size = batch_size or WATCH_SETTINGS["batch_size"]
+
+        self._done = store.signatures()
+        self._observed = {}
+        self._wake = threading.Event()
+
+    def scan(self, now=None):
+        """
+        Find files that are ready to be scored.
+
+        A file is ready when it is new, changed or was scored by another
+        model version, it was last modified at least `settle_seconds` ago,
+        and its size and mtime are the same as at the previous scan. Files
+        that appear with an old mtime (moved in, or present at start-up)
+        need no previous scan.
+
+        Args:
+            now (float): Current time; defaults to time.time()
+
+        Returns:
+            tuple: (ready, waiting) where ready is a list of (path, size,
+                mtime_ns) tuples and waiting counts files still settling
+        """
+        now = time.time() if now is None else now
+        seen, ready, waiting, unlisted = {}, [], 0, []
+
+        for root in self.roots:
+            for path, stat in _walk_images(root, unlisted):
+                signature = (stat.st_size, stat.st_mtime_ns)
+                seen[path] = signature
+                if self._done.get(path) == signature + (self.model.version,):
+                    continue
+
+                stable = self._observed.get(path, signature) == signature
+                if stable and now - stat.st_mtime_ns / 1e9 >= self.settle_seconds:
+                    ready.append((path, stat.st_size, stat.st_mtime_ns))
+                else:
+                    waiting += 1
+
+        # Files under a directory that could not be listed (e.g. a stale
+        # network mount) are kept: they are missing from the scan, not deleted
+        if unlisted:
+            logger.warning(f"Could not list {len(unlisted)} paths, keeping their scores: {', '.join(unlisted[:5])}")
+        vanished = [path for path in self._done
+                    if path not in seen and _under(path, self.roots)
+                    and path not in unlisted and not _under(path, unlisted)]
+        if vanished:
+            self.store.remove(vanished)
+            for path in vanished:
+                del self._done[path]
+
+        self._observed = seen
+        return ready, waiting
+
+    def process(self, ready):
+        """
+        Score files in batches and record the results.
+
+        Args:
+            ready (list): (path, size, mtime_ns) tuples from scan
+
+        Returns:
+            int: Number of files scored (including unreadable ones)
+        """
+        for start in range(0, len(ready), self.batch_size):
+            batch = ready[start:start + self.batch_size]
+            records = score_batch(self.model, "", [path for path, _, _ in batch])
+
+            results = []
+            for (path, size, mtime_ns), record in zip(batch, records):
+                results.append(dict(record, size=size, mtime_ns=mtime_ns))
+                if record["error"] is None:
+                    logger.info(f"Scored {path}: {record['score']}")
+                else:
+                    logger.warning(f"Could not score {path}: {record['error']}")
+
+            self.store.record(results)
+            for result in results:
+                self._done[result["path"]] = (result["size"], result["mtime_ns"], result["model_version"])
+        return len(ready)
+
+    def run_once(self, now=None):
+        """
+        Scan once and score everything that is ready.
+
+        Args:
+            now (float): Current time; defaults to time.time()
+
+        Returns:
+            tuple: (number of files scored, number still settling)
+        """
+        ready, waiting = self.scan(now)
+        return self.process(ready), waiting
+
+    def run(self, stop_event):
+        """
+        Scan and score until `stop_event` is set.
+
+        Args:
+            stop_event (threading.Event): Set to stop the loop
+        """
+        observer = self._start_observer()
+        logger.info(f"Watching {', '.join(self.roots)}")
+        try:
+            while not stop_event.is_set():
+                try:
+                    _, waiting = self.run_once()
+                except Exception as e:
+                    logger.error(f"Watch scan failed: {str(e)}")
+                    waiting = 0
+
+                # Files still settling are checked again as soon as they could be ready
+                timeout = min(self.poll_interval, self.settle_seconds) if waiting else self.poll_interval
+                self._wake.wait(timeout)
+                self._wake.clear()
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+
+    def wake(self):
+        """
+        Trigger a scan without waiting for the poll interval.
+        """
+        self._wake.set()
+
+    def _start_observer(self):
+        """
+        Start filesystem event notifications if watchdog is installed.
+
+        Returns:
+            The running watchdog observer, or None when only polling is used
+        """
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            logger.info(f"watchdog is not installed; polling every {self.poll_interval:g}s")
+            return None
+
+        watcher = self
+
+        class WakeHandler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                watcher.wake()
+
+        observer = Observer()
+        for root in self.roots:
+            observer.schedule(WakeHandler(), root, recursive=True)
+        observer.start()
+        return observer
+
+
+def _walk_images(root, unlisted):
+    """
+    Yield the images under a directory tree, skipping hidden files.
+
+    Hidden files include the temporary files that tools such as rsync write
+    before renaming them into place.
+
+    Args:
+        root (str): Directory to walk
+        unlisted (list): Receives the directories (including `root`) and
+            files that could not be read, whose contents are unknown
+
+    Yields:
+        tuple: (absolute path, os.stat_result)
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            unlisted.append(directory)
+            continue
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif "." in entry.name and entry.name.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS:
+                    yield entry.path, entry.stat()
+            except OSError:
+                unlisted.append(entry.path)
+
+
+def _under(path, roots):
+    """
+    Check whether a path is inside one of the watched directories.
+
+    Args:
+        path (str): Absolute path
+        roots (list): Absolute directory paths
+
+    Returns:
+        bool: True if the path is under a root
+    """
+    return any(path.startswith(root.rstrip(os.sep) + os.sep) for root in roots)
+
+
+def main():
+    """
+    Command-line entry point for the watch-folder daemon.
+    """
+    parser = argparse.ArgumentParser(description="Score images as they arrive in watched directories")
+    parser.add_argument("roots", nargs="+", help="Directories to watch (recursively)")
+    parser.add_argument("--store", type=str, default=WATCH_STORE, help="Path to the results database")
+    parser.add_argument("--poll-interval", type=float, default=WATCH_SETTINGS["poll_interval"],
+                        help="Seconds between directory scans")
+    parser.add_argument("--settle", type=float, default=WATCH_SETTINGS["settle_seconds"],
+                        help="Seconds a file must be unchanged before it is scored")
+    parser.add_argument("--batch-size", type=int, default=WATCH_SETTINGS["batch_size"], help="Images per model call")
+    parser.add_argument("--once", action="store_true", help="Score what is ready now and exit")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    for root in args.roots:
+        if not os.path.isdir(root):
+            parser.error(f"Not a directory: {root}")
+
+    from model.nima_model import NimaModel
+
+    watcher = FolderWatcher(args.roots, NimaModel(), ScoreStore(args.store), poll_interval=args.poll_interval,
+                            settle_seconds=args.settle, batch_size=args.batch_size)
+
+    if args.once:
+        scored, waiting = watcher.run_once()
+        print(f"Scored {scored} images ({waiting} still being written)")
+        return
+
+    stop_event = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: (stop_event.set(), watcher.wake()))
+    watcher.run(stop_event)
+
+
+if __name__ == "__main__":
+    main()